@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+
+from Lexer import Lexer, CompiledLexer, Token
+from LRTable import LRTable
+from LLTable import LLTable
+
+# 工作进程中的分析器, 由 _init_worker 在进程启动时设置一次
+_worker = None
+
+
+def _init_worker(lexer: CompiledLexer, method: str, table):
+    global _worker
+    if method == "LL1":
+        _worker = BatchParser(lexer, table, method)
+    else:
+        _worker = BatchParser(lexer, LRTable.from_bytes(table), method)
+
+
+def _run_one(item):
+    return _worker.parse(*item)
+
+
+class BatchParser:
+    """批量分析: 词法分析器和分析表只构造一次, 各输入互不共享状态, 可分发到进程池并行分析
+
+    词法分析使用 CompiledLexer, 语法分析使用 LRTable (LR1 / LALR1) 或 LLTable (LL1);
+    每个输入的结果为 (单词列表, 是否接受, "success" 或错误信息)
+    """
+
+    def __init__(self, lexer: CompiledLexer, table, method: str = "LR1"):
+        self.lexer = lexer
+        self.table = table
+        self.method = method
+
+    @classmethod
+    def build(cls, lexer, G, method: str = "LR1"):
+        """lexer 为 Lexer 或 CompiledLexer, G 为 Grammar, method 为 LR1 / LALR1 / LL1"""
+        if isinstance(lexer, Lexer):
+            lexer = lexer.compile()
+        if method == "LL1":
+            ok, msg = G.isLL1()
+            if not ok:
+                raise Exception(f"Error: {msg}")
+            table = LLTable.build(G)
+        elif method in ("LR1", "LALR1"):
+            table = LRTable.build(G, method == "LALR1")
+        else:
+            raise Exception(f"Error: unknown method {method}")
+        return cls(lexer, table, method)
+
+    def parse(self, text: str, is_file: bool = False) -> tuple[list, bool, str]:
+        """分析单个输入 (is_file 为真时 text 为文件名); 文件无法读取时该输入的结果为未接受, 不影响其他输入"""
+        if is_file:
+            try:
+                with open(text, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                return [], False, f"cannot read {text}: {e}"
+        tokens = []
+        end = 0
+        for type, word in self.lexer.tokens(text):
+            end += len(word)
+            if type != "whitespace":
+                tokens.append((type, word))
+        # 单词首尾相接, 没有覆盖到末尾说明在 end 处遇到了词法错误
+        if end < len(text):
+            return tokens, False, f"lexical error at char {end} '{text[end]}'"
+        tree, msg = self.table.parse(Token(tokens))
+        return tokens, msg == "success", msg
+
+    def run(self, inputs, workers: int = None, chunksize: int = 16, files: bool = False):
+        """按输入顺序惰性产生每个输入的结果; inputs 为字符串 (files 为真时为文件名) 的列表或迭代器
+
+        workers 为 1 时在当前进程中分析; 否则启动 workers 个进程 (默认 CPU 核数),
+        每个进程启动时接收一次词法分析表和 LR 分析表的二进制块 (LL 分析表直接 pickle), 之后只传输输入和结果
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for text in inputs:
+                yield self.parse(text, files)
+            return
+        table = self.table if self.method == "LL1" else self.table.to_bytes()
+        with multiprocessing.Pool(workers, _init_worker, (self.lexer, self.method, table)) as pool:
+            yield from pool.imap(_run_one, ((text, files) for text in inputs), chunksize)
+
+    def run_all(self, inputs, workers: int = None, chunksize: int = 16, files: bool = False) -> list[tuple[list, bool, str]]:
+        return list(self.run(inputs, workers, chunksize, files))
+
+
+if __name__ == "__main__":
+    import json
+
+    from FA import DFA
+    from Grammar import Grammar
+
+    dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
+    with open("./input/Lexer/Expr_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    batch = BatchParser.build(Lexer(dfa, config), Grammar.load("./input/Grammar/Expr_G.txt"))
+    for result in batch.run(["a + b * c", "(a + 1) * 2", "a + * b", "a # b"], workers=2):
+        print(result)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import pickle
+
+from FA import NFA, DFA
+from Lexer import Lexer, CompiledLexer
+from Grammar import Grammar
+
+# 算法或缓存内容格式变化时递增, 旧缓存自动失效
+VERSION = 3
+
+
+class Cache:
+    """按输入文件内容寻址的编译结果缓存
+
+    键为 (VERSION, 类别, 各输入文件内容) 的 sha256, 输入文件修改后自然得到新的键;
+    条目以 pickle 二进制格式保存在 directory 下, 超出 max_entries / max_bytes 时按最近使用时间淘汰
+    """
+
+    def __init__(self, directory: str = "./cache", max_entries: int = 64, max_bytes: int = 64 << 20):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, kind: str, *filenames: str) -> str:
+        h = hashlib.sha256(f"{VERSION}:{kind}".encode())
+        for filename in filenames:
+            with open(filename, "rb") as f:
+                data = f.read()
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # 不存在、写了一半, 或是旧版本代码的 pickle (类或模块已改名) 时重新构造
+            return None
+        # 更新修改时间, 作为 LRU 的使用时间; 条目可能刚被其他进程的 evict 删除, 值已读出, 不影响结果
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def put(self, key: str, value):
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def get_or_build(self, kind: str, filenames: list[str], build):
+        key = self.key(kind, *filenames)
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort(reverse=True)
+        total = 0
+        for i, (_, size, name) in enumerate(entries):
+            total += size
+            if i >= self.max_entries or total > self.max_bytes:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(self.directory, name))
+
+    def load_min_dfa(self, filename: str) -> tuple[DFA, DFA]:
+        """NFA 文件 -> (子集构造得到的 DFA, 最小化 DFA)"""
+
+        def build():
+            dfa, Q, T = NFA.load(filename).subset_construction()
+            min_dfa, PI = dfa.minimize()
+            return [(x.S, x.sigma, x.delta, x.s0, x.A) for x in (dfa, min_dfa)]
+
+        dfa, min_dfa = self.get_or_build("min_dfa", [filename], build)
+        return DFA(*dfa), DFA(*min_dfa)
+
+    def load_lexer(self, dfa_filename: str, config_filename: str) -> CompiledLexer:
+        """DFA 文件 + 配置文件 -> CompiledLexer"""
+
+        def build():
+            with open(config_filename, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            return Lexer(DFA.load(dfa_filename), config).compile()
+
+        return self.get_or_build("lexer", [dfa_filename, config_filename], build)
+
+    def load_grammar(self, filename: str) -> Grammar:
+        """文法文件 -> 已填好 First/Follow/Select 集合、LL(1) 分析表和 LR(1) 项集族与分析表的 Grammar
+
+        编号后的 CompiledGrammar 连同其中已算好的集合与整数分析表一起缓存; LR(1) 分析表存在冲突时不缓存 LR(1) 部分
+        """
+        G = Grammar.load(filename)
+
+        def build():
+            tables = {
+                "FirstSet": G.firstSet(),
+                "FollowSet": G.followSet(),
+                "SelectSet": G.selectSet(),
+                "LL1_TABLE": G.LL1_table(),
+            }
+            try:
+                G.LR1_table()
+                tables.update(CC=G.CC, CC_dict=G.CC_dict, Action=G.Action, Goto=G.Goto)
+            except Exception:
+                pass
+            tables["compiled"] = G.compile()
+            return tables
+
+        for name, value in self.get_or_build("grammar", [filename], build).items():
+            setattr(G, name, value)
+        return G
+
@@ -0,0 +1,382 @@
+import types
+
+from Lexer import CompiledLexer, EOF
+from LRTable import LRTable
+from LLTable import LLTable, EPS
+
+HEADER = '"""由 CodeGen.py 生成, 不依赖本项目的其他模块, 请勿手工修改"""\n'
+
+
+def literal(values, per_line: int = 16) -> str:
+    """把序列写成多行的元组字面量"""
+    values = [repr(v) for v in values]
+    if len(values) <= per_line:
+        return "(" + ", ".join(values) + ("," if len(values) == 1 else "") + ")"
+    lines = [", ".join(values[i : i + per_line]) for i in range(0, len(values), per_line)]
+    return "(\n    " + ",\n    ".join(lines) + ",\n)"
+
+
+def load_module(source: str, name: str = "generated"):
+    """直接执行生成的源码, 返回模块对象"""
+    module = types.ModuleType(name)
+    exec(compile(source, f"<{name}>", "exec"), module.__dict__)
+    return module
+
+
+def write_module(source: str, filename: str):
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+def lexer_module(lexer: CompiledLexer) -> str:
+    """表驱动词法分析器 -> 独立的 Python 模块, 提供 tokens(text) 和 get_token(text), 输出与 CompiledLexer 相同
+
+    字符不再先映射到字符类: 每个状态一个 {字符: 下一状态} 的字典, 只列出与 "其他字符" 转移不同的字符;
+    对自身有循环的状态 (标识符、数字、空白等), 连续的循环字符用一个内层循环跳过
+    """
+    nstates = len(lexer.states)
+    chars = [chr(o) for o in range(128)] + list(lexer.unicode_map)
+    rows, other_next, loops = [], [], []
+    for s in range(nstates):
+        base = s * lexer.ncls
+        other = lexer.trans[base + lexer.other]
+        cls = lambda c: lexer.ascii_map[ord(c)] if ord(c) < 128 else lexer.unicode_map[c]
+        row = {c: lexer.trans[base + cls(c)] for c in chars if lexer.trans[base + cls(c)] != other}
+        rows.append(row)
+        other_next.append(other)
+        loop = "".join(c for c, t in row.items() if t == s)
+        loops.append(loop or None)
+    kind = ["" if k is None else k for k in lexer.kind]
+    return HEADER + f'''
+# 各状态: {{字符: 下一状态}}, 未列出的字符按 OTHER_NEXT 转移, -1 为出错
+ROWS = {literal(rows, 1)}
+OTHER_NEXT = {literal(other_next)}
+ACCEPT = {literal([int(a) for a in lexer.accept])}
+# 接受状态的单词类别, 空串表示以单词本身作为类别
+KIND = {literal(kind, 8)}
+KEYWORD = frozenset({sorted(lexer.keyword)!r})
+# 各状态在自身上循环的字符
+LOOPS = {literal(loops, 2)}
+
+
+def scan(text, pos, n):
+    """从 pos 开始识别一个单词, 返回 (单词末尾, 接受状态); 出错时末尾为 -1"""
+    state, i, last, last_state = 0, pos, -1, -1
+    while True:
+        if ACCEPT[state]:
+            last, last_state = i, state
+        if i >= n:
+            break
+        state = ROWS[state].get(text[i], OTHER_NEXT[state])
+        if state < 0:
+            break
+        i += 1
+        loop = LOOPS[state]
+        if loop is not None:
+            while i < n and text[i] in loop:
+                i += 1
+    return last, last_state
+
+
+def tokens(text, pos=0):
+    """从下标 pos 开始逐个产生 (type, word), 包含空白符号, 遇到词法错误时停止"""
+    n = len(text)
+    while pos < n:
+        last, state = scan(text, pos, n)
+        if last <= pos:
+            return
+        lexem = text[pos:last]
+        kind = KIND[state]
+        if kind and lexem not in KEYWORD:
+            yield kind, lexem
+        else:
+            yield lexem, lexem
+        pos = last
+
+
+def get_token(text):
+    """不含空白符号的单词列表"""
+    result = []
+    append = result.append
+    n = len(text)
+    pos = 0
+    while pos < n:
+        state, i, last, last_state = 0, pos, -1, -1
+        while True:
+            if ACCEPT[state]:
+                last, last_state = i, state
+            if i >= n:
+                break
+            state = ROWS[state].get(text[i], OTHER_NEXT[state])
+            if state < 0:
+                break
+            i += 1
+            loop = LOOPS[state]
+            if loop is not None:
+                while i < n and text[i] in loop:
+                    i += 1
+        if last <= pos:
+            break
+        lexem = text[pos:last]
+        kind = KIND[last_state]
+        if kind and lexem not in KEYWORD:
+            if kind != "whitespace":
+                append((kind, lexem))
+        elif lexem != "whitespace":
+            append((lexem, lexem))
+        pos = last
+    return result
+'''
+
+
+def ll1_module(G) -> str:
+    """LL(1) 文法 -> 递归下降分析器模块, 提供 parse(tokens), 语法树与错误信息同 Grammar.LL1_parse (出错时语法树为 {})
+
+    每个非终结符生成一个函数, 按 LL(1) 分析表 (与 LLTable 相同, 冲突时后面的产生式优先) 选择产生式;
+    形如 A -> α A 的尾递归改写为循环, 右递归的表达式文法不会随输入长度加深调用栈。
+    其他嵌套 (如深层括号) 超出递归深度时, 改用模块中的分析表按 LLTable.parse 的方式以显式栈重新分析
+    """
+    table = LLTable.build(G)
+    terminals = table.terminals
+    m = len(terminals)
+    lines = [
+        HEADER,
+        "import gc",
+        "",
+        f"TERMINALS = {literal(terminals, 8)}",
+        f"NONTERMINALS = {literal(table.nonterminals, 8)}",
+        "TERM_ID = {t: i for i, t in enumerate(TERMINALS)}",
+        f"START = {table.start}",
+        f"TABLE = {literal(table.table)}",
+        f"RHS_REVERSED = {literal(table.rhs_reversed, 8)}",
+        "",
+        "",
+        "class ParseError(Exception):",
+        "    pass",
+        "",
+        "",
+        "class Parser:",
+        "    def __init__(self, tokens):",
+        "        self.tokens = tokens",
+        "        self.pos = 0",
+        f"        self.type = tokens[0][0] if tokens else {EOF!r}",
+        "",
+        "    def error(self, expected):",
+        f"        word = self.tokens[self.pos][1] if self.pos < len(self.tokens) else {EOF!r}",
+        "        return ParseError(f\"syntax error at token {self.pos} '{word}': excepted {' '.join(expected)} but gave {self.type}\")",
+        "",
+        "    def match(self, type):",
+        "        if self.type != type:",
+        "            raise self.error([type])",
+        "        self.pos += 1",
+        f"        self.type = self.tokens[self.pos][0] if self.pos < len(self.tokens) else {EOF!r}",
+        "        return type",
+    ]
+
+    def code(x: int) -> str:
+        if x < 0:
+            return repr(EPS)
+        if x < m:
+            return f"self.match({terminals[x]!r})"
+        return f"self.parse_{x - m}()"
+
+    def test(ts: list[str]) -> str:
+        return f"t == {ts[0]!r}" if len(ts) == 1 else f"t in {{{', '.join(map(repr, ts))}}}"
+
+    for A in range(len(table.nonterminals)):
+        choices = {}
+        for a in range(m):
+            p = table.table[A * m + a]
+            if p >= 0:
+                choices.setdefault(p, []).append(terminals[a])
+        name = repr(table.nonterminals[A])
+        expected = table.expected(A + m)
+        tail = any(table.rhs[p] and table.rhs[p][-1] == A + m for p in choices)
+        lines += ["", f"    def parse_{A}(self):", f"        # {table.nonterminals[A]}"]
+        if not tail:
+            lines.append("        t = self.type")
+            for p, ts in choices.items():
+                lines += [f"        if {test(ts)}:", f"            return {{{name}: [{', '.join(map(code, table.rhs[p]))}]}}"]
+            lines.append(f"        raise self.error({expected!r})")
+            continue
+        lines += ["        kids = []", f"        node = {{{name}: kids}}", "        while True:", "            t = self.type"]
+        for p, ts in choices.items():
+            beta = table.rhs[p]
+            lines.append(f"            if {test(ts)}:")
+            tail_call = bool(beta) and beta[-1] == A + m
+            head = beta[:-1] if tail_call else beta
+            if len(head) == 1:
+                lines.append(f"                kids.append({code(head[0])})")
+            elif head:
+                lines.append(f"                kids.extend([{', '.join(map(code, head))}])")
+            if tail_call:
+                lines += ["                inner = []", f"                kids.append({{{name}: inner}})", "                kids = inner", "                continue"]
+            else:
+                lines.append("                return node")
+        lines.append(f"            raise self.error({expected!r})")
+    lines += [
+        "",
+        "",
+        "def parse(tokens):",
+        '    """tokens 为 (type, word) 的列表, 返回 (语法树, "success" 或错误信息); 与 LLTable.parse 一样, 分析期间暂停循环垃圾回收"""',
+        "    parser = Parser(tokens)",
+        "    gc_enabled = gc.isenabled()",
+        "    gc.disable()",
+        "    try:",
+        f"        tree = parser.parse_{table.start - m}()",
+        f"        parser.match({EOF!r})",
+        "    except ParseError as e:",
+        "        return {}, str(e)",
+        "    except RecursionError:",
+        "        return parse_iterative(tokens)",
+        "    finally:",
+        "        if gc_enabled:",
+        "            gc.enable()",
+        '    return tree, "success"',
+        "",
+        "",
+        "def parse_iterative(tokens):",
+        '    """与 parse 结果相同, 用显式栈按分析表分析 (同 LLTable.parse), 嵌套深度不受递归深度限制"""',
+        "    m = len(TERMINALS)",
+        "    eof = m - 1",
+        "    names = TERMINALS + NONTERMINALS",
+        "    root = []",
+        "    symbols = [eof, START]",
+        "    parents = [None, root]",
+        "    pos = 0",
+        f"    type, word = tokens[0] if tokens else ({EOF!r}, {EOF!r})",
+        "    a = TERM_ID.get(type, -1)",
+        "    while True:",
+        "        x = symbols[-1]",
+        "        if x >= m:",
+        "            p = TABLE[(x - m) * m + a] if a >= 0 else -1",
+        "            if p < 0:",
+        "                break",
+        "            symbols.pop()",
+        "            kids = []",
+        "            parents.pop().append({names[x]: kids})",
+        "            for y in RHS_REVERSED[p]:",
+        "                symbols.append(y)",
+        "                parents.append(kids)",
+        "        elif x >= 0:",
+        "            if x != a:",
+        "                break",
+        "            if x == eof:",
+        '                return root[0], "success"',
+        "            symbols.pop()",
+        "            parents.pop().append(type)",
+        "            pos += 1",
+        f"            type, word = tokens[pos] if pos < len(tokens) else ({EOF!r}, {EOF!r})",
+        "            a = TERM_ID.get(type, -1)",
+        "        else:",
+        "            symbols.pop()",
+        f"            parents.pop().append({EPS!r})",
+        "    if x < m:",
+        "        expected = [TERMINALS[x]]",
+        "    else:",
+        "        expected = [t for b, t in enumerate(TERMINALS) if TABLE[(x - m) * m + b] >= 0]",
+        "    return {}, f\"syntax error at token {pos} '{word}': excepted {' '.join(expected)} but gave {type}\"",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def lr_module(G, lalr: bool = False) -> str:
+    """LR(1) / LALR(1) 分析表 -> 独立的分析器模块, 提供 parse(tokens), 结果与 LRTable.parse (不带语义动作) 相同
+
+    压缩的分析表写成元组常量, 分析循环中不再有语义动作和分析过程记录的分支
+    """
+    table = LRTable.build(G, lalr)
+    return HEADER + f'''
+import gc
+
+TERMINALS = {literal(table.terminals, 8)}
+NONTERMINALS = {literal(table.nonterminals, 8)}
+TERM_ID = {{t: i for i, t in enumerate(TERMINALS)}}
+LHS = {literal(table.lhs)}
+RHS_LEN = {literal(table.rhs_len)}
+DEFAULT = {literal(table.default)}
+GOTO_DEFAULT = {literal(table.goto_default)}
+ACTION_BASE = {literal(table.action_base)}
+GOTO_BASE = {literal(table.goto_base)}
+VALUE = {literal(table.value)}
+CHECK = {literal(table.check)}
+NSTATES = {table.nstates}
+
+
+def expected(s):
+    result = []
+    for a, t in enumerate(TERMINALS):
+        i = ACTION_BASE[s] + a
+        if (VALUE[i] if CHECK[i] == s else DEFAULT[s]) != 0:
+            result.append(t)
+    return result
+
+
+def parse(tokens):
+    """tokens 为 (type, word) 的列表, 返回 (语法树, "success" 或错误信息); 与 LRTable.parse 一样, 分析期间暂停循环垃圾回收"""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return run(tokens)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def run(tokens):
+    values = []
+    states = [0]
+    n = len(tokens)
+    pos = 0
+    type, word = tokens[0] if n else ({EOF!r}, {EOF!r})
+    a = TERM_ID.get(type, -1)
+    while True:
+        s = states[-1]
+        if a >= 0:
+            i = ACTION_BASE[s] + a
+            act = VALUE[i] if CHECK[i] == s else DEFAULT[s]
+        else:
+            act = DEFAULT[s]
+        if act > 0:
+            states.append(act)
+            values.append(type)
+            pos += 1
+            type, word = tokens[pos] if pos < n else ({EOF!r}, {EOF!r})
+            a = TERM_ID.get(type, -1)
+        elif act < -1:
+            p = -act - 1
+            k = RHS_LEN[p]
+            A = LHS[p]
+            if k:
+                children = values[-k:]
+                del values[-k:]
+                del states[-k:]
+            else:
+                children = []
+            values.append({{NONTERMINALS[A]: children}})
+            s = states[-1]
+            i = GOTO_BASE[s] + A
+            states.append(VALUE[i] if CHECK[i] == NSTATES + s else GOTO_DEFAULT[A])
+        elif act == -1:
+            return [{{NONTERMINALS[LHS[0]]: values}}], "success"
+        else:
+            return values, f"syntax error at token {{pos}} '{{word}}': excepted {{' '.join(expected(s))}} but gave {{type}}"
+'''
+
+
+if __name__ == "__main__":
+    import json
+
+    from FA import DFA
+    from Grammar import Grammar
+    from Lexer import Lexer
+
+    dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
+    with open("./input/Lexer/Expr_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    write_module(lexer_module(Lexer(dfa, config).compile()), "./output/expr_lexer.py")
+    write_module(ll1_module(Grammar.load("./input/Grammar/Expr_LL1_G.txt")), "./output/expr_ll1.py")
+    write_module(lr_module(Grammar.load("./input/Grammar/Expr_G.txt")), "./output/expr_lr1.py")
+    lexer = load_module(lexer_module(Lexer(dfa, config).compile()))
+    parser = load_module(ll1_module(Grammar.load("./input/Grammar/Expr_LL1_G.txt")))
+    print(parser.parse(lexer.get_token("a + b * c")))
@@ -0,0 +1,164 @@
+import graphviz
+from graphviz.quoting import quote
+
+from SyntaxTree import SyntaxTree
+
+EPS = "ε"
+# 折叠的子树用一个这样的结点代替
+ELLIPSIS = "…"
+
+
+class DotWriter:
+    """逐行写出 DOT 文本, 不在内存中保留整张图; 输出与 graphviz.Digraph 的 source 格式相同
+
+    out 为文件名或可写的文本流; 用作上下文管理器, 退出时写出结尾的 "}" (并关闭自己打开的文件)
+    """
+
+    def __init__(self, out, name: str = None):
+        self.own = isinstance(out, str)
+        self.out = open(out, "w", encoding="utf-8") if self.own else out
+        self.write = self.out.write
+        # 标签通常只有文法符号等少数几种, 缓存引号处理的结果
+        self.quoted = {}
+        self.write(f"digraph {quote(name)} {{\n" if name else "digraph {\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def q(self, s: str) -> str:
+        r = self.quoted.get(s)
+        if r is None:
+            r = self.quoted[s] = quote(s)
+        return r
+
+    @staticmethod
+    def id(name: str) -> str:
+        # 结点名大多是结点编号, 不需要加引号, 也不缓存
+        return name if name.isdigit() and name.isascii() else quote(name)
+
+    def node(self, name: str, label: str, shape: str = None):
+        """参数与 Digraph.node 相同的子集"""
+        if shape is None:
+            self.write(f"\t{self.id(name)} [label={self.q(label)}]\n")
+        else:
+            self.write(f"\t{self.id(name)} [label={self.q(label)} shape={shape}]\n")
+
+    def edge(self, u: str, v: str, label: str = None):
+        if label is None:
+            self.write(f"\t{self.id(u)} -> {self.id(v)}\n")
+        else:
+            self.write(f"\t{self.id(u)} -> {self.id(v)} [label={self.q(label)}]\n")
+
+    def close(self):
+        if self.out is None:
+            return
+        self.write("}\n")
+        if self.own:
+            self.out.close()
+        self.out = None
+
+
+def _nested_items(tree, max_depth):
+    """旧格式 ({A: [子结点]} 与字符串嵌套) 语法树的先序序列 (深度, 标签, 类别); 类别 0 为叶结点, 1 为内部结点, 2 为折叠的内部结点
+
+    列表只表示子结点序列, 不对应结点; 显式栈中字典的键带有类别, 其余项的类别为 None
+    """
+    stack = [(tree, 0, None)]
+    while stack:
+        x, depth, kind = stack.pop()
+        if kind is not None:
+            yield depth, x, kind
+        elif isinstance(x, str):
+            yield depth, x, 0
+        elif isinstance(x, list):
+            stack.extend((y, depth, None) for y in reversed(x))
+        else:
+            collapse = max_depth is not None and depth >= max_depth
+            for k, v in reversed(list(x.items())):
+                if not collapse:
+                    stack.append((v, depth + 1, None))
+                stack.append((k, depth, 2 if collapse else 1))
+
+
+def _arena_items(tree: SyntaxTree, max_depth):
+    """SyntaxTree 的先序序列, 格式同 _nested_items; 栈中每层只保存下一个兄弟结点, 栈的长度不超过树的深度"""
+    prod, names, symbol, first_child, next_sibling = tree.prod, tree.names, tree.symbol, tree.first_child, tree.next_sibling
+    for root in tree.roots:
+        nodes, depths = [root], [0]
+        while nodes:
+            n = nodes.pop()
+            depth = depths.pop()
+            c = next_sibling[n]
+            if c >= 0 and depth:
+                nodes.append(c)
+                depths.append(depth)
+            x = symbol[n]
+            label = names[x] if x >= 0 else EPS
+            if prod[n] < 0:
+                yield depth, label, 0
+            elif max_depth is not None and depth >= max_depth:
+                yield depth, label, 2
+            else:
+                yield depth, label, 1
+                c = first_child[n]
+                if c >= 0:
+                    nodes.append(c)
+                    depths.append(depth + 1)
+
+
+def emit_syntax_tree(w, tree, max_depth: int = None, max_nodes: int = None) -> int:
+    """把语法树的结点和边逐个交给 w (DotWriter 或 graphviz.Digraph), 返回结点数; 结点编号和形状与原来的递归实现相同
+
+    tree 为 parse 返回的嵌套 dict / list, 或 SyntaxTree。迭代遍历, 不受递归深度限制, 只占用与树的深度成正比的内存。
+    深度达到 max_depth 的内部结点, 其子树折叠为一个 "…" 结点; 写满 max_nodes 个结点后, 其余部分用一个 "…" 结点表示, 接在下一个结点的父结点下
+    """
+    items = _arena_items(tree, max_depth) if isinstance(tree, SyntaxTree) else _nested_items(tree, max_depth)
+    # path[d]: 深度 d 上最近的结点编号
+    path = []
+    idx = 0
+    for depth, label, kind in items:
+        if max_nodes is not None and idx >= max_nodes:
+            w.node(str(idx), ELLIPSIS, shape="box")
+            if depth:
+                w.edge(str(path[depth - 1]), str(idx))
+            idx += 1
+            break
+        del path[depth:]
+        w.node(str(idx), label, shape="circle" if kind else "doublecircle")
+        if depth:
+            w.edge(str(path[-1]), str(idx))
+        path.append(idx)
+        idx += 1
+        if kind == 2:
+            w.node(str(idx), ELLIPSIS, shape="box")
+            w.edge(str(idx - 1), str(idx))
+            idx += 1
+    return idx
+
+
+def write_syntax_tree(out, tree, max_depth: int = None, max_nodes: int = None, name: str = None) -> int:
+    """把语法树直接写成 DOT 文本 (out 为文件名或文本流), 参数和返回值同 emit_syntax_tree"""
+    with DotWriter(out, name) as w:
+        return emit_syntax_tree(w, tree, max_depth, max_nodes)
+
+
+def write_fa(out, fa, name: str = None):
+    """把自动机写成 DOT 文本, 与 FA.dot 构造的 Digraph 相同"""
+    with DotWriter(out, name) as w:
+        for u in fa.S:
+            w.node(u, u, shape="circle")
+        for u in fa.A:
+            w.node(u, u, shape="doublecircle")
+        for u, c, v in fa.delta:
+            w.edge(u, v, label=c)
+
+
+def render(filename: str, view: bool = False, format: str = "pdf") -> str:
+    """调用 graphviz 排版已写出的 DOT 文件, 返回输出文件名"""
+    result = graphviz.render("dot", format, filename)
+    if view:
+        graphviz.view(result)
+    return result
@@ -0,0 +1,427 @@
+import gc
+
+import Profiler
+from Lexer import Token, EOF
+
+EPS = "ε"
+END = -1
+
+
+class Node:
+    """SPPF 结点, 覆盖单词 [start, end)
+
+    符号结点的 label 为符号编号 (终结符结点没有子结点); 中间结点的 label 为 ~core (项目点位取反, 为负数),
+    表示产生式右部的一个前缀。families 为打包结点 (core, left, right) 的列表: core 为点后移之后的点位,
+    left 为前缀的结点 (可为 None), right 为点前最后一个符号的结点; ε 产生式的打包结点为 (core, None, None)
+    """
+
+    __slots__ = ("label", "start", "end", "families", "leo")
+
+    def __init__(self, label: int, start: int, end: int):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.families = []
+        # 尚未展开的 Leo 打包结点 (h, D, w), 见 EarleyParser.expand
+        self.leo = None
+
+    def __repr__(self):
+        return f"Node({self.label}, {self.start}, {self.end})"
+
+
+class Forest:
+    """共享打包语法森林 (SPPF): 所有语法树共用相同的子树, 歧义只在打包结点处分叉, 结点数为输入长度的多项式"""
+
+    def __init__(self, root: Node, cg):
+        self.root = root
+        self.symbols = cg.symbols
+        self.m = cg.m
+
+    def nodes(self):
+        """从根可达的各结点 (含中间结点和终结符结点)"""
+        seen = {id(self.root)}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            for c, left, right in node.families:
+                for x in (left, right):
+                    if x is not None and id(x) not in seen:
+                        seen.add(id(x))
+                        stack.append(x)
+
+    def node_count(self) -> int:
+        return sum(1 for _ in self.nodes())
+
+    def ambiguous(self) -> bool:
+        return any(len(node.families) > 1 for node in self.nodes())
+
+    def count(self):
+        """语法树的数目; 文法有环 (如 A -> A) 导致无穷多棵树时为 float("inf")"""
+        memo = {}
+        # 后序遍历: 第一次弹出时压回自身, 再压入子结点; 在当前路径上的结点标记为 None, 再次遇到说明有环
+        stack = [(self.root, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                total = 0
+                for c, left, right in node.families:
+                    n = 1
+                    for x in (left, right):
+                        if x is not None:
+                            n *= memo[id(x)]
+                    total += n
+                memo[id(node)] = total if node.families else 1
+                continue
+            if id(node) in memo:
+                if memo[id(node)] is None:
+                    return float("inf")
+                continue
+            memo[id(node)] = None
+            stack.append((node, True))
+            for c, left, right in node.families:
+                for x in (left, right):
+                    if x is not None:
+                        if id(x) not in memo:
+                            stack.append((x, False))
+                        elif memo[id(x)] is None:
+                            return float("inf")
+        return memo[id(self.root)]
+
+    def children(self, family: tuple) -> list[Node]:
+        """打包结点对应的产生式右部各符号的结点; 前缀的中间结点取第一种打包方式"""
+        c, left, right = family
+        result = [] if right is None else [right]
+        while left is not None:
+            if left.label >= 0:
+                result.append(left)
+                break
+            c, left, right = left.families[0]
+            result.append(right)
+        result.reverse()
+        return result
+
+    def tree(self) -> dict:
+        """任取一棵语法树 (每处歧义取第一种), 格式同 LR1_parse 的语法树: [forest.tree()] == LR1_parse(...)[0];
+        ε 产生式的子结点与 LL1_parse 一样为 ["ε"]
+
+        用显式栈构造, 不受递归深度限制
+        """
+        holder = []
+        stack = [(self.root, None, holder)]
+        path = set()
+        while stack:
+            node, parent, kids = stack.pop()
+            if node is None:
+                path.discard(id(parent))
+                continue
+            name = self.symbols[node.label]
+            if node.label < self.m:
+                kids.append(name)
+                continue
+            if id(node) in path:
+                raise Exception(f"Error: cyclic derivation of {name}")
+            children = []
+            kids.append({name: children})
+            family = node.families[0]
+            if family[1] is None and family[2] is None:
+                children.append(EPS)
+                continue
+            path.add(id(node))
+            stack.append((None, node, None))
+            stack.extend((x, node, children) for x in reversed(self.children(family)))
+        return holder[0]
+
+    def trees(self, limit: int = None):
+        """逐个产生所有语法树 (最多 limit 棵), 格式同 tree; 递归实现, 用于歧义较少的短输入"""
+        count = 0
+        for t in self._trees(self.root):
+            yield t
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def _trees(self, node: Node):
+        name = self.symbols[node.label]
+        if node.label < self.m:
+            yield name
+            return
+        for family in node.families:
+            for kids in self._sequences(family):
+                yield {name: kids}
+
+    def _sequences(self, family: tuple):
+        """打包结点下各子结点序列的所有组合"""
+        c, left, right = family
+        if left is None and right is None:
+            yield [EPS]
+            return
+        rights = [[t] for t in self._trees(right)]
+        if left is None:
+            yield from rights
+            return
+        for r in rights:
+            if left.label >= 0:
+                for t in self._trees(left):
+                    yield [t] + r
+            else:
+                for f in left.families:
+                    for prefix in self._sequences(f):
+                        yield prefix + r
+
+
+class EarleyParser:
+    """适用于任意上下文无关文法 (包括有歧义、非 LL(1) / LR(1) 的文法) 的 Earley 分析
+
+    在 CompiledGrammar 的 LR 项目点位上进行; 按 Scott (2008) 的方法在识别过程中构造二叉化的 SPPF,
+    ε 产生式在同一个项目集内用 H 集合补全。leo 为真时使用 Leo (1991) 的优化: 项目集 h 中等待 D 的
+    唯一项目形如 A -> α . D 时, D 完成后直接得到该右递归链最顶端的完成项目, 链上的中间结点只在
+    分析成功后为从根可达的部分构造; LR-regular 文法 (包括所有 LR(k) 文法) 的分析时间为线性
+    """
+
+    def __init__(self, G, leo: bool = True):
+        cg = G.compile()
+        cg.first_sets()
+        self.cg = cg
+        self.leo = leo
+
+    @Profiler.timed("Earley_parse")
+    def parse(self, token: Token) -> tuple:
+        """返回 (Forest, "success") 或 (None, 错误信息); 错误信息的格式同 LR1_parse"""
+        types, words = [], []
+        while True:
+            type, word = token.next()
+            if (type, word) == (EOF, EOF):
+                break
+            types.append(type)
+            words.append(word)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.run(types, words)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def run(self, types: list[str], words: list[str]) -> tuple:
+        cg = self.cg
+        core_next, core_dot, core_prod, lhs, starts, kind = cg.core_next, cg.core_dot, cg.core_prod, cg.lhs, cg.starts, cg.kind
+        eps, start, m = cg.eps, cg.start, cg.m
+        n = len(types)
+        # 不是终结符的单词记为 -1, 不能移进
+        tokens = [cg.sym_id.get(t, m) if cg.sym_id.get(t, m) < m else -1 for t in types]
+        # 各项目集中等待非终结符 D 的项目 (core, origin, node), 以及各位置结尾的结点表 {(label, start): Node}
+        # 各次分析的状态都是局部的, 同一个 EarleyParser 可在多个线程中同时使用
+        waiting = [{} for _ in range(n + 1)]
+        V = [{} for _ in range(n + 1)]
+        memo = [{} for _ in range(n + 1)]
+
+        def make_node(cn: int, j: int, i: int, w, v):
+            """项目前进到点位 cn 后的结点 (Scott 的 MAKE_NODE)"""
+            if core_next[cn] == END:
+                label = lhs[core_prod[cn]]
+            elif core_dot[cn] == 1:
+                return v
+            else:
+                label = ~cn
+            table = V[i]
+            y = table.get((label, j))
+            if y is None:
+                y = table[label, j] = Node(label, j, i)
+            family = (cn, w, v)
+            if family not in y.families:
+                y.families.append(family)
+            return y
+
+        # 当前项目集 i 的 {(core, origin)}、工作表 R、可移进 a_{i+1} 的项目 Q 和期望的终结符;
+        # 下一个项目集的相应内容在移进时填入
+        items, R, Q, expected = set(), [], [], set()
+        nxt_items, nxt_R, nxt_Q, nxt_expected = set(), [], [], set()
+
+        def add(c: int, h: int, y, i: int, items: set, R: list, Q: list, expected: set):
+            x = core_next[c]
+            if x >= 0 and kind[x] == 1:
+                if i < n and x == tokens[i]:
+                    if (c, h) not in items:
+                        items.add((c, h))
+                        Q.append((c, h, y))
+                else:
+                    expected.add(x)
+                return
+            if (c, h) in items:
+                return
+            items.add((c, h))
+            R.append((c, h, y))
+            if x >= 0:
+                waiting[i].setdefault(x, []).append((c, h, y))
+
+        def predicted_core(c0: int) -> int:
+            # ε 产生式 A -> ε 的右部为 (ε,), 预测时直接作为完成项目
+            return c0 + 1 if core_next[c0] == eps else c0
+
+        for c0 in starts[start]:
+            add(predicted_core(c0), 0, None, 0, items, R, Q, expected)
+        final = self.final_cores()
+        profile = Profiler.ACTIVE
+        for i in range(n + 1):
+            H = {}
+            predicted = set()
+            table = V[i]
+            while R:
+                c, h, w = R.pop()
+                x = core_next[c]
+                if x >= 0:
+                    if x not in predicted:
+                        predicted.add(x)
+                        for c0 in starts[x]:
+                            add(predicted_core(c0), i, None, i, items, R, Q, expected)
+                    if x in H:
+                        add(c + 1, h, make_node(c + 1, h, i, w, H[x]), i, items, R, Q, expected)
+                    continue
+                D = lhs[core_prod[c]]
+                if w is None:
+                    w = table.get((D, i))
+                    if w is None:
+                        w = table[D, i] = Node(D, i, i)
+                    if (c, None, None) not in w.families:
+                        w.families.append((c, None, None))
+                if h == i:
+                    H[D] = w
+                elif self.leo:
+                    entry = self.leo_item(waiting, memo, h, D)
+                    if entry is not None:
+                        tc, tk = entry[4], entry[5]
+                        A = lhs[core_prod[tc]]
+                        y = table.get((A, tk))
+                        if y is None:
+                            y = table[A, tk] = Node(A, tk, i)
+                        marker = (h, D, w)
+                        if y.leo is None:
+                            y.leo = [marker]
+                        elif marker not in y.leo:
+                            y.leo.append(marker)
+                        add(tc, tk, y, i, items, R, Q, expected)
+                        continue
+                for c2, k, z in list(waiting[h].get(D, ())):
+                    add(c2 + 1, k, make_node(c2 + 1, k, i, z, w), i, items, R, Q, expected)
+
+            if profile is not None:
+                profile.size("Earley.set_items", len(items))
+            accepted = any((c, 0) in items for c in final)
+            if i == n:
+                if not accepted:
+                    return None, self.error(i, types, words, expected)
+                root = table[start, 0]
+                self.expand(V, memo, root)
+                return Forest(root, cg), "success"
+            if not Q:
+                if accepted:
+                    expected.add(cg.eof)
+                return None, self.error(i, types, words, expected)
+            v = Node(tokens[i], i, i + 1)
+            for c, h, w in Q:
+                add(c + 1, h, make_node(c + 1, h, i + 1, w, v), i + 1, nxt_items, nxt_R, nxt_Q, nxt_expected)
+            items, R, Q, expected = nxt_items, nxt_R, nxt_Q, nxt_expected
+            nxt_items, nxt_R, nxt_Q, nxt_expected = set(), [], [], set()
+
+    def final_cores(self) -> list[int]:
+        """开始符号各产生式的完成点位"""
+        cg = self.cg
+        result = []
+        for c0 in cg.starts[cg.start]:
+            c = c0
+            while cg.core_next[c] != END:
+                c += 1
+            result.append(c)
+        return result
+
+    def error(self, i: int, types: list[str], words: list[str], expected: set) -> str:
+        cg = self.cg
+        type, word = (types[i], words[i]) if i < len(types) else (EOF, EOF)
+        names = " ".join(cg.terminals[a] for a in sorted(expected))
+        return f"syntax error at token {i} '{word}': excepted {names} but gave {type}"
+
+    def leo_item(self, waiting: list[dict], memo: list[dict], h: int, D: int):
+        """项目集 h 中 D 的 Leo 项目: (core, origin, node, 上一层, 顶端完成点位, 顶端起点), 不存在时为 None
+
+        条件: 项目集 h 中等待 D 的项目只有一个, 且 D 是其产生式右部的最后一个符号 (不含位置 0 的开始符号)。沿右递归链向上迭代地求出,
+        各项目集的结果都缓存; 单位产生式形成的环在缓存中先标记为 None, 不会无限循环
+        """
+        cg = self.cg
+        core_next, core_prod, lhs = cg.core_next, cg.core_prod, cg.lhs
+        path = []
+        h0, D0 = h, D
+        while True:
+            if D in memo[h]:
+                up = memo[h][D]
+                break
+            memo[h][D] = None
+            waiters = waiting[h].get(D)
+            # 相当于拓广文法的项目 S' -> . S: 开始符号在位置 0 的完成项目总要保留, 用于判断接受
+            if waiters is None or len(waiters) != 1 or (h == 0 and D == cg.start):
+                up = None
+                break
+            c, k, z = waiters[0]
+            if core_next[c + 1] != END:
+                up = None
+                break
+            path.append((h, D, c, k, z))
+            h, D = k, lhs[core_prod[c]]
+        for h, D, c, k, z in reversed(path):
+            if up is None:
+                entry = (c, k, z, None, c + 1, k)
+            else:
+                entry = (c, k, z, up, up[4], up[5])
+            memo[h][D] = entry
+            up = entry
+        return memo[h0][D0]
+
+    def expand(self, V: list[dict], memo: list[dict], root: Node):
+        """展开从根可达的 Leo 打包结点: D 在 [h, i) 完成后, 沿右递归链逐层构造各 A 在 [k, i) 的结点"""
+        lhs, core_prod = self.cg.lhs, self.cg.core_prod
+        seen = {id(root)}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.leo is not None:
+                markers, node.leo = node.leo, None
+                table = V[node.end]
+                for h, D, w in markers:
+                    entry = memo[h][D]
+                    child = w
+                    while entry is not None:
+                        c, k, z, up = entry[0], entry[1], entry[2], entry[3]
+                        A = lhs[core_prod[c]]
+                        y = table.get((A, k))
+                        if y is None:
+                            y = table[A, k] = Node(A, k, node.end)
+                        family = (c + 1, z, child)
+                        if family not in y.families:
+                            y.families.append(family)
+                            if y is not node and id(y) in seen:
+                                # 已访问过的结点有了新的打包结点, 重新检查其子结点
+                                stack.append(y)
+                        child = y
+                        entry = up
+            for c, left, right in node.families:
+                for x in (left, right):
+                    if x is not None and id(x) not in seen:
+                        seen.add(id(x))
+                        stack.append(x)
+
+
+if __name__ == "__main__":
+    from Grammar import Grammar
+
+    # 悬空 else 的歧义文法: 不是 LR(1) 文法, Earley 分析得到含两棵语法树的森林
+    G = Grammar(["if", "then", "else", "e", "a"], ["S"], "S", [
+        ("S", ["if", "e", "then", "S"]),
+        ("S", ["if", "e", "then", "S", "else", "S"]),
+        ("S", ["a"]),
+    ])
+    tokens = [(t, t) for t in "if e then if e then a else a".split()]
+    forest, msg = G.Earley_parse(Token(tokens))
+    print(msg, f"{forest.count()} trees, {forest.node_count()} forest nodes")
+    for tree in forest.trees():
+        print(tree)
+    print(G.Earley_parse(Token(tokens[:-1]))[1])
@@ -1,5 +1,9 @@
+from array import array
+
 import pandas as pd
-from graphviz import Digraph
+
+import DotWriter
+import Profiler
 
 EPS = "ε"
 EOF = "$"
@@ -12,6 +16,7 @@ class FA:
         self.delta = delta
         self.s0 = s0
         self.A = A
+        self.E = None
         self.G = {i: {} for i in S}
         for u, w, v in delta:
             self.G[u].setdefault(w, []).append(v)
@@ -32,103 +37,132 @@ class FA:
     def move(self, s: str, w: str):
         return self.G[s][w] if w in self.G[s] else []
 
-    def dot(self, filename: str, view: bool = False):
-        dot = Digraph(filename)
-        for u in self.S:
-            dot.node(u, u, shape="circle")
-        for u in self.A:
-            dot.node(u, u, shape="doublecircle")
-        for u, w, v in self.delta:
-            dot.edge(u, v, label=w)
-        dot.render(f"./output/{filename}.gv", view=view)
+    def dot(self, filename: str, view: bool = False, render: bool = True) -> str:
+        """把自动机逐行写入 ./output/{filename}.gv, 返回文件名; render 为假时只写 DOT 文本, 不调用 graphviz 排版"""
+        path = f"./output/{filename}.gv"
+        DotWriter.write_fa(path, self, filename)
+        if render:
+            DotWriter.render(path, view)
+        return path
 
 
 class NFA(FA):
 
     def dfs_eps_closure(self):
-        """离线计算 eps_closure"""
-        E = {s: {} for s in self.S}
-
-        def dfs(x):
-            if E[x]:
-                return
-            E[x] = {x}
-            for u, w, v in self.delta:
-                if x == u and v != u and w == EPS:
-                    dfs(v)
-                    E[u] = E[u] | E[v]
+        """离线计算 eps_closure (迭代实现, 同 eps_closure)"""
+        return self.eps_closure()
 
+    def eps_closure(self) -> dict[str, frozenset]:
+        """离线计算 eps_closure: 在 ε 边的强连通分量上传播, ε 环中的状态共享同一个闭包, 结果缓存"""
+        if self.E is not None:
+            return self.E
+        succ = {s: self.G[s].get(EPS, []) for s in self.S}
+        pred = {s: [] for s in self.S}
+        for u in self.S:
+            for v in succ[u]:
+                pred[v].append(u)
+
+        # 第一遍: 正向 ε 边上迭代 DFS, 记录完成顺序
+        order = []
+        visited = set()
         for s in self.S:
-            dfs(s)
-        print(E)
-
-    def eps_closure(self):
-        """离线计算 eps_closure"""
-        E = {s: {s} for s in self.S}
-        worklist = self.S.copy()
-        iter_cnt = 0
-        while worklist:
-            x = worklist.pop(0)
-            t = {x}
-            for u, w, v in self.delta:
-                if u == x and w == EPS:
-                    t = t | E[v]
-            if t != E[x]:
-                E[x] = t
-                for u, w, v in self.delta:
-                    if v == x and w == EPS and u not in worklist:
-                        worklist.append(u)
-            iter_cnt += 1
-        print(E, iter_cnt)
+            if s in visited:
+                continue
+            visited.add(s)
+            stack = [(s, iter(succ[s]))]
+            while stack:
+                x, it = stack[-1]
+                for v in it:
+                    if v not in visited:
+                        visited.add(v)
+                        stack.append((v, iter(succ[v])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(x)
+
+        # 第二遍: 按完成顺序逆序在反向 ε 边上 DFS, 得到的强连通分量按拓扑序排列
+        comp = {}
+        comps = []
+        for s in reversed(order):
+            if s in comp:
+                continue
+            comp[s] = len(comps)
+            members = [s]
+            stack = [s]
+            while stack:
+                x = stack.pop()
+                for u in pred[x]:
+                    if u not in comp:
+                        comp[u] = len(comps)
+                        members.append(u)
+                        stack.append(u)
+            comps.append(members)
+
+        # 逆拓扑序计算, 后继分量的闭包已经算好
+        closure = [frozenset()] * len(comps)
+        for c in range(len(comps) - 1, -1, -1):
+            E = set(comps[c])
+            for x in comps[c]:
+                for v in succ[x]:
+                    if comp[v] != c:
+                        E |= closure[comp[v]]
+            closure[c] = frozenset(E)
+        self.E = {s: closure[comp[s]] for s in self.S}
+        return self.E
 
+    @Profiler.timed("subset_construction")
     def subset_construction(self):
         """子集构造法"""
+        profile = Profiler.ACTIVE
+        # 每个状态的 ε 闭包由 eps_closure 缓存, 子集的闭包只需按状态合并
+        closure = self.eps_closure()
 
-        def get_delta(q: list, c: str) -> list:
-            S = []
+        def eps_closure(S) -> frozenset:
+            E = set()
+            for x in S:
+                E |= closure[x]
+            return frozenset(E)
+
+        def get_delta(q: frozenset, c: str) -> set:
+            S = set()
             for x in q:
-                for u, w, v in self.delta:
-                    if u == x and w == c and v not in S:
-                        S.append(v)
+                S.update(self.G[x].get(c, []))
             return S
 
-        def eps_closure(S: list) -> list:
-            # 不动点计算
-            worklist = S.copy()
-            S = S.copy()
-            while worklist:
-                x = worklist.pop(0)
-                for u, w, v in self.delta:
-                    if u == x and w == EPS and v not in S:
-                        S.append(v)
-                        worklist.append(v)
-            return sorted(S)
-
+        # DFA 状态为 frozenset, 用字典按哈希查找编号
         Q = [eps_closure([self.s0])]
-        worklist = [Q[0]]
+        index = {Q[0]: 0}
         T = {}
         TT = {}
-
-        while worklist:
-            q = worklist.pop(0)
-            T[Q.index(q)] = {}
-            TT[Q.index(q)] = {}
+        i = 0
+        while i < len(Q):
+            q = Q[i]
+            T[i] = {}
+            TT[i] = {}
             for c in self.sigma:
                 t = eps_closure(get_delta(q, c))
-                T[Q.index(q)][c] = t if t not in Q else f"{Q.index(t)}"
-                if t not in Q:
+                if profile is not None:
+                    profile.count("subset_construction.moves", "existing" if t in index else "new")
+                    profile.size("subset_construction.subset_size", len(t))
+                if t not in index:
+                    index[t] = len(Q)
                     Q.append(t)
-                    worklist.append(t)
-                TT[Q.index(q)][c] = Q.index(t)
+                    T[i][c] = sorted(t)
+                else:
+                    T[i][c] = f"{index[t]}"
+                TT[i][c] = index[t]
+            i += 1
+        A = set(self.A)
         delta = [(str(u), str(w), str(v)) for u, items in TT.items() for w, v in items.items()]
         dfa = DFA(
             S=[str(i) for i in T.keys()],
             sigma=self.sigma,
             delta=delta,
             s0=str(0),
-            A=[str(i) for i in range(len(Q)) if set(self.A) & set(Q[i])],
+            A=[str(i) for i in range(len(Q)) if A & Q[i]],
         )
-        return dfa, Q, T
+        return dfa, [sorted(q) for q in Q], T
 
 
 class DFA(NFA):
@@ -188,18 +222,24 @@ class DFA(NFA):
         )
         return min_dfa
 
+    @Profiler.timed("hopcroft1")
     def hopcroft1(self):
+        profile = Profiler.ACTIVE
         partition = [set(self.A), set(self.S) - set(self.A)]
         worklist = [set(self.A), set(self.S) - set(self.A)]
         PI = []
         while worklist:
             s = worklist.pop()
+            if profile is not None:
+                profile.size("hopcroft1.splitter_size", len(s))
             for c in self.sigma:
                 image = {u for u, w, v in self.delta if w == c and v in s}
-                for q in partition:
+                for q in partition.copy():
                     q1 = q & image
                     q2 = q - q1
                     if q1 and q2:
+                        if profile is not None:
+                            profile.count("hopcroft1.splits", c)
                         PI.append((partition, q, c, q1, q2))
                         partition.remove(q)
                         partition.append(q1)
@@ -221,6 +261,283 @@ class DFA(NFA):
         )
         return min_dfa, PI
 
+    def minimize(self, trace: bool = False, label: dict = None):
+        """O(n log n) 的 Hopcroft 算法: 逆转移索引 + 可细分划分 + 较小半块加入工作表
+
+        结果与 hopcroft1 等价, 仅在 trace 为真时记录划分过程 PI; label 为状态到标签的映射, 用于区分不同单词类别的接受状态
+        """
+        n, k = len(self.S), len(self.sigma)
+        index = {s: i for i, s in enumerate(self.S)}
+        symbol = {c: a for a, c in enumerate(self.sigma)}
+        # 逆转移: pred[a][v] 为经 sigma[a] 到达 v 的状态
+        pred = [[[] for _ in range(n)] for _ in range(k)]
+        for u, w, v in self.delta:
+            if w in symbol:
+                pred[symbol[w]][index[v]].append(index[u])
+
+        # 可细分划分: 同一块的状态在 elems 中连续, 块 b 占据 elems[first[b]:end[b]], [first[b], mid[b]) 为已标记部分
+        # 初始划分为 接受/非接受; 给出 label 时按 label 分组, 不同标签的接受状态不会合并
+        A = set(self.A)
+        groups = {}
+        for i, s in enumerate(self.S):
+            key = label.get(s) if label is not None else s not in A
+            groups.setdefault(key, []).append(i)
+        elems = [i for group in groups.values() for i in group]
+        loc = [0] * n
+        for i, e in enumerate(elems):
+            loc[e] = i
+        first, end, mid = [], [], []
+        lo = 0
+        for group in groups.values():
+            first.append(lo)
+            end.append(lo + len(group))
+            mid.append(lo)
+            lo += len(group)
+        blk = [0] * n
+        for b in range(len(first)):
+            for i in range(first[b], end[b]):
+                blk[elems[i]] = b
+
+        # 工作表中的 (块, 符号) 对, inW[b] 为块 b 在工作表中的符号集合
+        worklist = [(b, a) for b in range(len(first)) for a in range(k)]
+        inW = [set(range(k)) for _ in first]
+        PI = [] if trace else None
+        while worklist:
+            B, a = worklist.pop()
+            inW[B].discard(a)
+            touched = []
+            for v in elems[first[B] : end[B]]:
+                for u in pred[a][v]:
+                    b = blk[u]
+                    i, j = loc[u], mid[b]
+                    if i < j:
+                        continue
+                    # 将 u 交换到块 b 的已标记部分
+                    elems[i], elems[j] = elems[j], u
+                    loc[elems[i]], loc[u] = i, j
+                    mid[b] += 1
+                    if j == first[b]:
+                        touched.append(b)
+            for b in touched:
+                if mid[b] == end[b]:
+                    mid[b] = first[b]
+                    continue
+                # 已标记部分成为新块 c, 未标记部分留在 b
+                c = len(first)
+                first.append(first[b])
+                end.append(mid[b])
+                mid.append(first[b])
+                first[b] = mid[b]
+                for i in range(first[c], end[c]):
+                    blk[elems[i]] = c
+                if trace:
+                    q1 = {self.S[e] for e in elems[first[c] : end[c]]}
+                    q2 = {self.S[e] for e in elems[first[b] : end[b]]}
+                    partition = [{self.S[e] for e in elems[first[x] : end[x]]} for x in range(len(first)) if x != c]
+                    PI.append((partition, q1 | q2, self.sigma[a], q1, q2))
+                small = c if end[c] - first[c] <= end[b] - first[b] else b
+                inW.append(set())
+                for x in range(k):
+                    if x in inW[b]:
+                        worklist.append((c, x))
+                        inW[c].add(x)
+                    else:
+                        worklist.append((small, x))
+                        inW[small].add(x)
+        partition = [{self.S[e] for e in elems[first[b] : end[b]]} for b in range(len(first))]
+        if trace:
+            PI.append((partition, {}, None, {}, {}))
+        stateMap = {}
+        for s in partition:
+            name = min(s)
+            for x in s:
+                stateMap[x] = name
+        min_dfa = DFA(
+            S=sorted(set(stateMap.values()), key=lambda x: index[x]),
+            sigma=self.sigma,
+            delta=list({(stateMap[u], c, stateMap[v]) for u, c, v in self.delta}),
+            s0=stateMap[self.s0],
+            A=list({stateMap[i] for i in self.A}),
+        )
+        return min_dfa, PI
+
+
+def bits(mask: int):
+    """依次产生位掩码中为 1 的位的下标"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def csr(n: int, edges) -> tuple[array, array]:
+    """将 (u, v) 边表压缩成下标数组 offset 和目标数组 target, u 的后继为 target[offset[u]:offset[u + 1]]"""
+    count = [0] * (n + 1)
+    edges = sorted(edges)
+    for u, v in edges:
+        count[u + 1] += 1
+    for u in range(n):
+        count[u + 1] += count[u]
+    return array("i", count), array("i", [v for u, v in edges])
+
+
+class BitFA:
+    """紧凑表示的自动机: 状态编号为整数, 状态集合为 int 位掩码, 转移按符号存成整数数组
+
+    trans[a] 与 eps 均为 csr 格式, 状态 u 经 sigma[a] 的后继为 target[offset[u]:offset[u + 1]]
+    """
+
+    def __init__(self, names: list, sigma: list, trans: list[tuple[array, array]], eps: tuple[array, array], s0: int, A: int):
+        self.names = names
+        self.sigma = sigma
+        self.trans = trans
+        self.eps = eps
+        self.s0 = s0
+        self.A = A
+        self.E = None
+
+    @classmethod
+    def from_fa(cls, fa: FA):
+        index = {s: i for i, s in enumerate(fa.S)}
+        symbol = {c: a for a, c in enumerate(fa.sigma)}
+        edges = [[] for _ in fa.sigma]
+        eps = []
+        for u, w, v in fa.delta:
+            (eps if w == EPS else edges[symbol[w]]).append((index[u], index[v]))
+        A = 0
+        for s in fa.A:
+            A |= 1 << index[s]
+        n = len(fa.S)
+        return cls(list(fa.S), list(fa.sigma), [csr(n, e) for e in edges], csr(n, eps), index[fa.s0], A)
+
+    def to_fa(self) -> FA:
+        """转换回 FA: 无 ε 边且每个转移至多一个目标时为 DFA, 否则为 NFA"""
+        names = [str(s) for s in self.names]
+        n = len(names)
+        deterministic = not self.eps[1]
+        delta = []
+        for w, (offset, target) in [(EPS, self.eps)] + list(zip(self.sigma, self.trans)):
+            for u in range(n):
+                if offset[u + 1] - offset[u] > 1:
+                    deterministic = False
+                delta += [(names[u], w, names[v]) for v in target[offset[u] : offset[u + 1]]]
+        cls = DFA if deterministic else NFA
+        return cls(names, self.sigma, delta, names[self.s0], [names[i] for i in bits(self.A)])
+
+    def eps_closure(self) -> dict[int, int]:
+        """有 ε 出边的状态的 ε 闭包位掩码, 其余状态的闭包只含自身; 按 ε 前驱做工作表传播, 结果缓存"""
+        if self.E is not None:
+            return self.E
+        offset, target = self.eps
+        n = len(self.names)
+        pred = {}
+        E = {}
+        for u in range(n):
+            for v in target[offset[u] : offset[u + 1]]:
+                pred.setdefault(v, []).append(u)
+                E[u] = E.get(u, 1 << u) | (1 << v)
+        worklist = list(E)
+        while worklist:
+            x = worklist.pop()
+            t = E[x]
+            for v in target[offset[x] : offset[x + 1]]:
+                if v in E:
+                    t |= E[v]
+            if t != E[x]:
+                E[x] = t
+                worklist.extend(pred.get(x, []))
+        self.E = E
+        return E
+
+    def subset_construction(self):
+        """子集构造法, 状态编号与 NFA.subset_construction 一致"""
+        E = self.eps_closure()
+        eps_states = 0
+        for u in E:
+            eps_states |= 1 << u
+
+        def closure(mask: int) -> int:
+            t = mask
+            for v in bits(mask & eps_states):
+                t |= E[v]
+            return t
+
+        Q = [closure(1 << self.s0)]
+        index = {Q[0]: 0}
+        targets = [array("i") for _ in self.sigma]
+        i = 0
+        while i < len(Q):
+            q = Q[i]
+            for a, (offset, target) in enumerate(self.trans):
+                m = 0
+                for u in bits(q):
+                    for v in target[offset[u] : offset[u + 1]]:
+                        m |= 1 << v
+                t = closure(m)
+                if t not in index:
+                    index[t] = len(Q)
+                    Q.append(t)
+                targets[a].append(index[t])
+            i += 1
+        A = 0
+        for i, q in enumerate(Q):
+            if q & self.A:
+                A |= 1 << i
+        n = len(Q)
+        full = array("i", range(n + 1))
+        return BitFA(list(range(n)), self.sigma, [(full, t) for t in targets], csr(n, []), 0, A)
+
+    def minimize(self):
+        """Hopcroft 算法最小化 (要求为 DFA), 块和逆像均为位掩码"""
+        n = len(self.names)
+        full = (1 << n) - 1
+        inv = [csr(n, [(v, u) for u in range(n) for v in target[offset[u] : offset[u + 1]]]) for offset, target in self.trans]
+        partition = [x for x in (self.A, full & ~self.A) if x]
+        block = [0] * n
+        for i, q in enumerate(partition):
+            for u in bits(q):
+                block[u] = i
+        worklist = set(partition)
+        while worklist:
+            s = worklist.pop()
+            for offset, target in inv:
+                image = 0
+                for v in bits(s):
+                    for u in target[offset[v] : offset[v + 1]]:
+                        image |= 1 << u
+                # 只检查与逆像相交的块
+                for k in {block[u] for u in bits(image)}:
+                    q = partition[k]
+                    q1 = q & image
+                    if q1 == q:
+                        continue
+                    q2 = q ^ q1
+                    small, large = (q1, q2) if q1.bit_count() <= q2.bit_count() else (q2, q1)
+                    partition[k] = large
+                    partition.append(small)
+                    for u in bits(small):
+                        block[u] = len(partition) - 1
+                    if q in worklist:
+                        worklist.remove(q)
+                        worklist |= {q1, q2}
+                    else:
+                        worklist.add(small)
+        # 起始状态所在块编号为 0
+        partition.sort(key=lambda q: not q >> self.s0 & 1)
+        for i, q in enumerate(partition):
+            for u in bits(q):
+                block[u] = i
+        m = len(partition)
+        edges = [set() for _ in self.sigma]
+        A = 0
+        for i, q in enumerate(partition):
+            u = (q & -q).bit_length() - 1
+            for a, (offset, target) in enumerate(self.trans):
+                edges[a].update((i, block[v]) for v in target[offset[u] : offset[u + 1]])
+            if q & self.A:
+                A |= 1 << i
+        return BitFA(list(range(m)), self.sigma, [csr(m, e) for e in edges], csr(m, []), 0, A)
+
 
 if __name__ == "__main__":
     nfa = NFA.load("./input/FA/test1_FA.txt")
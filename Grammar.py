@@ -1,13 +1,444 @@
 import random
+import threading
+from array import array
 from graphviz import Digraph
 import pandas as pd
 
+from DotWriter import emit_syntax_tree
+from Earley import EarleyParser
 from FA import DFA
+import Profiler
 from Lexer import Token
+from LRTable import LRTable
+from LLTable import LLTable
 
 EPS = "ε"
 EOF = "$"
 
+# 惰性构造分析表时加锁, 多个线程同时首次使用同一个 Grammar 时只构造一次
+BUILD_LOCK = threading.RLock()
+
+
+def digraph(R: list[list[int]], F0: list[int]) -> list[int]:
+    """DeRemer–Pennello 的 digraph 算法: F(x) = F0(x) ∪ ∪{F(y) | x R y}
+
+    集合用位掩码表示; 在 R 上做迭代的 Tarjan 强连通分量遍历, 同一分量中的元素共享结果
+    """
+    F = list(F0)
+    N = [0] * len(R)
+    done = len(R) + 1
+    stack = []
+    for root in range(len(R)):
+        if N[root]:
+            continue
+        stack.append(root)
+        N[root] = len(stack)
+        call = [[root, 0, len(stack)]]
+        while call:
+            frame = call[-1]
+            x, i, d = frame
+            if i < len(R[x]):
+                frame[1] += 1
+                y = R[x][i]
+                if not N[y]:
+                    stack.append(y)
+                    N[y] = len(stack)
+                    call.append([y, 0, len(stack)])
+                else:
+                    N[x] = min(N[x], N[y])
+                    F[x] |= F[y]
+                continue
+            call.pop()
+            if N[x] == d:
+                while True:
+                    y = stack.pop()
+                    N[y] = done
+                    F[y] = F[x]
+                    if y == x:
+                        break
+            if call:
+                parent = call[-1][0]
+                N[parent] = min(N[parent], N[x])
+                F[parent] |= F[x]
+    return F
+
+
+TERMINAL = 1
+NONTERMINAL = 2
+END = -1
+
+
+def bit_ids(mask: int):
+    """位掩码中为 1 的位的编号, 从小到大"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CompiledGrammar:
+    """符号和产生式编号后的文法, 各分析表的构造和分析程序都在其上进行, Grammar 的字符串接口是它的视图
+
+    符号编号: 终结符 T 为 0 .. m-2, $ 为 m-1, 非终结符为 m .. m+k-1, 最后一个为 ε, kind[x] 为符号类别;
+    终结符集合用位掩码表示, 终结符 a 对应第 a 位。
+    产生式 i 为 lhs[i] -> rhs[i]; 字符串相同的产生式以第一条为准, prod_id 为产生式字符串 -> 编号。
+    LR 项目按点位 (core) 编号: 产生式 i 的点位依次对应点在 0 .. len(rhs[i]) 处, core_next 为点后符号, 点在末尾时为 END;
+    starts[A] 为 A 的各产生式的首个点位, 点位 0 总是 P[0] 的首个点位
+    """
+
+    def __init__(self, G):
+        self.terminals = G.T + [EOF]
+        self.nonterminals = G.NT
+        self.symbols = self.terminals + self.nonterminals + [EPS]
+        self.sym_id = {x: i for i, x in enumerate(self.symbols)}
+        self.m = len(self.terminals)
+        self.eof = self.m - 1
+        self.eps = len(self.symbols) - 1
+        self.kind = bytearray([TERMINAL] * self.m + [NONTERMINAL] * len(self.nonterminals) + [0])
+        self.start = self.sym_id[G.S]
+        for A, beta in G.P:
+            for x in [A, *beta]:
+                if x not in self.sym_id:
+                    raise Exception(f"Error: undefined symbol {x} in {G.getPstr(A, beta)}")
+        self.lhs = array("i", [self.sym_id[A] for A, beta in G.P])
+        self.rhs = [tuple(self.sym_id[x] for x in beta) for A, beta in G.P]
+        self.prod_id = {}
+        for i, p in enumerate(G.Pstr):
+            self.prod_id.setdefault(p, i)
+
+        core_prod, core_dot, core_next = [], [], []
+        self.starts = [[] for _ in self.symbols]
+        for i in self.prod_id.values():
+            self.starts[self.lhs[i]].append(len(core_prod))
+            for dot in range(len(self.rhs[i]) + 1):
+                core_prod.append(i)
+                core_dot.append(dot)
+                core_next.append(self.rhs[i][dot] if dot < len(self.rhs[i]) else END)
+        self.core_prod = array("i", core_prod)
+        self.core_dot = array("i", core_dot)
+        self.core_next = array("i", core_next)
+
+        self.nullable = None
+        self.first = None
+        self.follow = None
+        self.select = None
+        self.lr0 = None
+        self.lr1 = None
+        self.tables = {}
+
+    def names(self, mask: int) -> list[str]:
+        return [self.terminals[a] for a in bit_ids(mask)]
+
+    def first_of(self, seq) -> tuple[int, bool]:
+        """符号串的 FIRST 集合: (掩码, 是否可空)"""
+        self.first_sets()
+        mask = 0
+        for x in seq:
+            mask |= self.first[x]
+            if not self.nullable[x]:
+                return mask, False
+        return mask, True
+
+    def first_sets(self) -> list[int]:
+        """nullable 与 FIRST: 可空性用计数的工作表求出, FIRST 依赖关系用 digraph 在强连通分量上一次求出"""
+        if self.first is not None:
+            return self.first
+        nullable = bytearray(len(self.symbols))
+        nullable[self.eps] = 1
+        remain = []
+        occurs = [[] for _ in self.symbols]
+        queue = []
+        for i, beta in enumerate(self.rhs):
+            symbols = [x for x in beta if x != self.eps]
+            remain.append(len(symbols))
+            for x in symbols:
+                occurs[x].append(i)
+            if not symbols and not nullable[self.lhs[i]]:
+                nullable[self.lhs[i]] = 1
+                queue.append(self.lhs[i])
+        while queue:
+            for i in occurs[queue.pop()]:
+                remain[i] -= 1
+                A = self.lhs[i]
+                if remain[i] == 0 and not nullable[A]:
+                    nullable[A] = 1
+                    queue.append(A)
+
+        F0 = [1 << x if x < self.m else 0 for x in range(len(self.symbols))]
+        R = [[] for _ in self.symbols]
+        for i, beta in enumerate(self.rhs):
+            for x in beta:
+                R[self.lhs[i]].append(x)
+                if not nullable[x]:
+                    break
+        self.nullable = nullable
+        self.first = digraph(R, F0)
+        return self.first
+
+    def follow_sets(self) -> list[int]:
+        """FOLLOW: A -> α B β 中 FOLLOW(B) ⊇ FIRST(β), β 可空时 B includes A, 在 includes 关系上用 digraph 求解"""
+        if self.follow is not None:
+            return self.follow
+        first = self.first_sets()
+        nullable = self.nullable
+        F0 = [0] * len(self.symbols)
+        F0[self.start] = 1 << self.eof
+        R = [[] for _ in self.symbols]
+        for i, beta in enumerate(self.rhs):
+            # 从右向左扫描, trailer 为当前符号之后的后缀的 FIRST 集合, tail_nullable 表示该后缀可空
+            trailer, tail_nullable = 0, True
+            for x in reversed(beta):
+                if self.kind[x] == NONTERMINAL:
+                    F0[x] |= trailer
+                    if tail_nullable:
+                        R[x].append(self.lhs[i])
+                if nullable[x]:
+                    trailer |= first[x]
+                else:
+                    trailer, tail_nullable = first[x], False
+        self.follow = digraph(R, F0)
+        return self.follow
+
+    def select_sets(self) -> list[tuple[int, bool]]:
+        """各产生式的 SELECT 集合: (掩码, 右部是否可空), 右部可空时掩码包含 FOLLOW(A)"""
+        if self.select is not None:
+            return self.select
+        follow = self.follow_sets()
+        select = []
+        for i, beta in enumerate(self.rhs):
+            mask, nullable = self.first_of(beta)
+            select.append((mask | follow[self.lhs[i]] if nullable else mask, nullable))
+        self.select = select
+        return self.select
+
+    @Profiler.timed("lr1_states")
+    def lr1_states(self) -> tuple[list[frozenset], list[dict[int, int]]]:
+        """LR(1) 项集规范族: 项集为 {core: 向前看掩码} 的 frozenset, 用字典查重; 返回 (项集, 转移)
+
+        点后符号之后的后缀的 FIRST 集合按点位缓存; 各状态的转移按符号编号顺序 (即 T 再 NT) 生成
+        """
+        if self.lr1 is not None:
+            return self.lr1
+        profile = Profiler.ACTIVE
+        core_prod, core_dot, core_next, starts, kind = self.core_prod, self.core_dot, self.core_next, self.starts, self.kind
+        suffix_first = []
+        for c in range(len(core_prod)):
+            if core_next[c] != END and kind[core_next[c]] == NONTERMINAL:
+                suffix_first.append(self.first_of(self.rhs[core_prod[c]][core_dot[c] + 1 :]))
+            else:
+                suffix_first.append((0, False))
+
+        def closure(kernel: dict) -> frozenset:
+            items = dict(kernel)
+            worklist = list(items)
+            while worklist:
+                c = worklist.pop()
+                B = core_next[c]
+                if B == END or not starts[B]:
+                    continue
+                mask, nullable = suffix_first[c]
+                if nullable:
+                    mask |= items[c]
+                for c0 in starts[B]:
+                    old = items.get(c0, 0)
+                    if mask & ~old:
+                        items[c0] = old | mask
+                        worklist.append(c0)
+            if profile is not None:
+                profile.size("lr1_states.closure_items", len(items))
+            return frozenset(items.items())
+
+        states = [closure({0: 1 << self.eof})]
+        index = {states[0]: 0}
+        trans = []
+        i = 0
+        while i < len(states):
+            kernels = {}
+            for c, mask in states[i]:
+                x = core_next[c]
+                if x != END and kind[x]:
+                    kernels.setdefault(x, {})[c + 1] = mask
+            trans.append({})
+            for x in sorted(kernels):
+                s1 = closure(kernels[x])
+                if profile is not None:
+                    profile.count("lr1_states.goto", "existing" if s1 in index else "new")
+                if s1 not in index:
+                    index[s1] = len(states)
+                    states.append(s1)
+                trans[i][x] = index[s1]
+            i += 1
+        self.lr1 = (states, trans)
+        return self.lr1
+
+    @Profiler.timed("lr0_states")
+    def lr0_states(self) -> tuple[list[frozenset], list[dict[int, int]]]:
+        """LR(0) 项集规范族: 项集为点位的 frozenset, 状态编号顺序与 lr1_states 相同"""
+        if self.lr0 is not None:
+            return self.lr0
+        profile = Profiler.ACTIVE
+        core_next, starts, kind = self.core_next, self.starts, self.kind
+
+        def closure(kernel: list) -> frozenset:
+            items = set(kernel)
+            worklist = list(kernel)
+            while worklist:
+                B = core_next[worklist.pop()]
+                if B == END:
+                    continue
+                for c0 in starts[B]:
+                    if c0 not in items:
+                        items.add(c0)
+                        worklist.append(c0)
+            if profile is not None:
+                profile.size("lr0_states.closure_items", len(items))
+            return frozenset(items)
+
+        states = [closure([0])]
+        index = {states[0]: 0}
+        trans = []
+        i = 0
+        while i < len(states):
+            kernels = {}
+            for c in sorted(states[i]):
+                x = core_next[c]
+                if x != END and kind[x]:
+                    kernels.setdefault(x, []).append(c + 1)
+            trans.append({})
+            for x in sorted(kernels):
+                s1 = closure(kernels[x])
+                if profile is not None:
+                    profile.count("lr0_states.goto", "existing" if s1 in index else "new")
+                if s1 not in index:
+                    index[s1] = len(states)
+                    states.append(s1)
+                trans[i][x] = index[s1]
+            i += 1
+        self.lr0 = (states, trans)
+        return self.lr0
+
+    def lalr1_lookaheads(self) -> dict[tuple[int, int], int]:
+        """LR(0) 状态中规约项目的 LALR(1) 向前看集合: (状态, 点位) -> 掩码
+
+        DeRemer–Pennello 方法: 非终结符转移 (p, A) 的 DR 集合经 reads 关系得到 Read 集合, 再经 includes 关系
+        得到 Follow 集合, 规约项目的向前看集合为其 lookback 转移的 Follow 集合之并
+        """
+        states, trans = self.lr0_states()
+        core_next, starts, kind = self.core_next, self.starts, self.kind
+        self.first_sets()
+        nullable = self.nullable
+        # 点后符号之后的后缀是否可空
+        rest_nullable = [False] * len(core_next)
+        for c in range(len(core_next) - 1, -1, -1):
+            if core_next[c] != END:
+                rest_nullable[c] = core_next[c + 1] == END or (nullable[core_next[c + 1]] and rest_nullable[c + 1])
+
+        # 非终结符转移编号; 编号 0 为虚拟的起始转移, 只对应 P[0], 其 DR 集合为 {$}
+        X = [(0, None)]
+        x_id = {}
+        for p in range(len(states)):
+            for A in trans[p]:
+                if kind[A] == NONTERMINAL:
+                    x_id[(p, A)] = len(X)
+                    X.append((p, A))
+        DR = [1 << self.eof] + [0] * (len(X) - 1)
+        reads = [[] for _ in X]
+        for x in range(1, len(X)):
+            p, A = X[x]
+            r = trans[p][A]
+            for t in trans[r]:
+                if kind[t] == TERMINAL:
+                    DR[x] |= 1 << t
+                elif nullable[t]:
+                    reads[x].append(x_id[(r, t)])
+
+        # 沿产生式右部走一遍: 得到 includes 关系和规约项目的 lookback 转移
+        includes = [[] for _ in X]
+        lookback = {}
+        for x in range(len(X)):
+            p, B = X[x]
+            for c in starts[B] if B is not None else [0]:
+                q = p
+                while core_next[c] != END:
+                    Y = core_next[c]
+                    if Y not in trans[q]:
+                        break
+                    if kind[Y] == NONTERMINAL and rest_nullable[c]:
+                        includes[x_id[(q, Y)]].append(x)
+                    q = trans[q][Y]
+                    c += 1
+                else:
+                    lookback.setdefault((q, c), []).append(x)
+        Follow = digraph(includes, digraph(reads, DR))
+        lookaheads = {}
+        for key, xs in lookback.items():
+            mask = 0
+            for x in xs:
+                mask |= Follow[x]
+            lookaheads[key] = mask
+        return lookaheads
+
+    def action_str(self, act: int) -> str:
+        if act == -1:
+            return "acc"
+        return f"s{act}" if act > 0 else f"r{-act - 1}"
+
+    def lr_table(self, lalr: bool = False) -> tuple[list[dict[int, int]], list[dict[int, int]]]:
+        """整数 LR 分析表: (Action 各行 {终结符: 动作}, Goto 各行 {非终结符: 状态})
+
+        动作 v > 0 为移进到状态 v, v < 0 为按产生式 -v-1 规约, -1 为接受; 各行先按符号顺序放移进, 再放规约。
+        LR(1) 的规约按项目 (A, β, δ, a) 的字符串顺序填入, 冲突时报告的表项与逐项填表时相同
+        """
+        if lalr not in self.tables:
+            with BUILD_LOCK:
+                if lalr not in self.tables:
+                    self.tables[lalr] = self.build_table(lalr)
+        return self.tables[lalr]
+
+    def build_table(self, lalr: bool) -> tuple[list[dict[int, int]], list[dict[int, int]]]:
+        if lalr:
+            states, trans = self.lr0_states()
+            lookaheads = self.lalr1_lookaheads()
+            reductions = [
+                [(c, lookaheads.get((u, c), 0)) for c in sorted(states[u]) if self.core_next[c] == END]
+                for u in range(len(states))
+            ]
+        else:
+            states, trans = self.lr1_states()
+            reductions = []
+            for u in range(len(states)):
+                items = []
+                for c, mask in states[u]:
+                    if self.core_next[c] == END:
+                        p = self.core_prod[c]
+                        names = (self.symbols[self.lhs[p]], [self.symbols[x] for x in self.rhs[p]])
+                        items.extend((names, self.terminals[a], c, 1 << a) for a in bit_ids(mask))
+                items.sort(key=lambda item: item[:2])
+                reductions.append([(c, bit) for names, a, c, bit in items])
+
+        action, goto = [], []
+        for u in range(len(states)):
+            row, goto_row = {}, {}
+            for x, v in trans[u].items():
+                if self.kind[x] == TERMINAL:
+                    row[x] = v
+                else:
+                    goto_row[x] = v
+            for c, mask in reductions[u]:
+                p = self.core_prod[c]
+                act = -1 if p == 0 and self.lhs[0] == self.start else -p - 1
+                for a in bit_ids(mask):
+                    if a in row:
+                        old = self.action_str(row[a])
+                        if lalr:
+                            kind = "shift/reduce" if row[a] > 0 else "reduce/reduce"
+                            raise Exception(f"Error: LALR(1) {kind} conflict: Action.at[{u}, {self.terminals[a]}] = {old} but reassgin to r{p}")
+                        raise Exception(f"Error: Action.at[{u}, {self.terminals[a]}] = {old} but reassgin to r{p}")
+                    row[a] = act
+            action.append(row)
+            goto.append(goto_row)
+        return action, goto
+
 
 class Grammar:
     def __init__(self, T: list[str], NT: list[str], S: str, P: list[tuple[str, str]]):
@@ -16,6 +447,7 @@ class Grammar:
         self.S = S
         self.P = P
         self.Pstr = [self.getPstr(A, beta) for A, beta in P]
+        self.compiled = None
         self.FirstSet = None
         self.FollowSet = None
         self.SelectSet = None
@@ -24,12 +456,51 @@ class Grammar:
         self.CC_dict = None
         self.Action = None
         self.Goto = None
+        self.LALR_Action = None
+        self.LALR_Goto = None
+        self.LR_TABLE = {}
+        self.LL_TABLE = None
+        self.EARLEY = None
 
     def getPstr(self, A: str, beta: list):
         return A + " -> " + " ".join(beta)
     
     def getP(self, Pstr: str):
-        return self.P[self.Pstr.index(Pstr)]
+        return self.P[self.compile().prod_id[Pstr]]
+
+    def compile(self) -> CompiledGrammar:
+        if self.compiled is None:
+            with BUILD_LOCK:
+                if self.compiled is None:
+                    self.compiled = CompiledGrammar(self)
+        return self.compiled
+
+    def freeze(self):
+        """一次性构造全部集合与分析表, 之后各分析方法只读取, 可在多个线程间共享同一个 Grammar
+
+        存在冲突的分析表 (非 LL(1) 文法的 LL 表、有冲突的 LR(1) / LALR(1) 表) 不构造, 调用时仍然抛出异常
+        """
+        with BUILD_LOCK:
+            cg = self.compile()
+            self.firstSet()
+            self.followSet()
+            self.selectSet()
+            self.LL1_table()
+            if self.isLL1()[0]:
+                self.LL_TABLE = LLTable.build(self)
+            for lalr in (False, True):
+                try:
+                    cg.lr_table(lalr)
+                except Exception:
+                    continue
+                self.LR_TABLE[lalr] = LRTable.build(self, lalr)
+                if lalr:
+                    self.LALR1_table()
+                else:
+                    self.LR1_table()
+                    self.build_CC()
+            self.EARLEY = EarleyParser(self)
+        return self
 
     @classmethod
     def load(cls, filename: str):
@@ -41,31 +512,24 @@ class Grammar:
             P = [(A, beta.split()) for A, beta in P]
             return cls(T, NT, S, P)
 
+    def nullable(self) -> set[str]:
+        """可推导出空串的非终结符"""
+        cg = self.compile()
+        cg.first_sets()
+        return {A for A in self.NT if cg.nullable[cg.sym_id[A]]}
+
     def firstSet(self) -> dict[str, set]:
         if self.FirstSet:
             return self.FirstSet
+        cg = self.compile()
+        masks = cg.first_sets()
         first = {}
         for r in self.T + [EOF, EPS]:
             first[r] = {r}
-        for r in self.NT:
-            first[r] = set()
-        fixed_point = True
-        while fixed_point:
-            is_changed = False
-            for A, beta in self.P:
-                rhs = set()
-                allHasEPS = True
-                for i in range(len(beta)):
-                    rhs |= first[beta[i]] - {EPS}
-                    if EPS not in first[beta[i]]:
-                        allHasEPS = False
-                        break
-                if allHasEPS:
-                    rhs.add(EPS)
-                if not rhs <= first[A]:
-                    first[A] |= rhs
-                    is_changed = True
-            fixed_point = is_changed
+        for A in self.NT:
+            first[A] = set(cg.names(masks[cg.sym_id[A]]))
+            if cg.nullable[cg.sym_id[A]]:
+                first[A].add(EPS)
         self.FirstSet = first
         return self.FirstSet
 
@@ -85,60 +549,32 @@ class Grammar:
     def followSet(self) -> dict[str, set]:
         if self.FollowSet:
             return self.FollowSet
-
-        first = self.firstSet()
-        follow: dict[str, set] = {}
-        for r in self.NT:
-            follow[r] = set()
-        follow[self.S] = {EOF}
-        fixed_point = True
-        while fixed_point:
-            is_changed = False
-            for A, beta in self.P:
-                trailer = follow[A].copy()
-                for i in range(len(beta) - 1, -1, -1):
-                    if beta[i] in self.NT:
-                        if not trailer <= follow[beta[i]]:
-                            is_changed = True
-                            follow[beta[i]] |= trailer
-                        if EPS in first[beta[i]]:
-                            trailer |= first[A] - {EPS}
-                        else:
-                            trailer = first[beta[i]]
-                    else:
-                        trailer = first[beta[i]].copy()
-            fixed_point = is_changed
-        self.FollowSet = follow
+        cg = self.compile()
+        masks = cg.follow_sets()
+        self.FollowSet = {A: set(cg.names(masks[cg.sym_id[A]])) for A in self.NT}
         return self.FollowSet
 
     def selectSet(self) -> dict[str, set]:
         if self.SelectSet:
             return self.SelectSet
-        first = self.firstSet()
-        follow = self.followSet()
+        cg = self.compile()
         select = {}
-
-        for A, beta in self.P:
-            first_rule = self.get_first(beta)
-            p = self.getPstr(A, beta)
-            if EPS not in first_rule:
-                select[p] = first_rule
-            else:
-                select[p] = first_rule | follow[A]
-        return select
+        for p, (mask, nullable) in zip(self.Pstr, cg.select_sets()):
+            select[p] = set(cg.names(mask)) | ({EPS} if nullable else set())
+        self.SelectSet = select
+        return self.SelectSet
 
     def LL1_table(self) -> dict[str, dict[str, int]]:
         if self.LL1_TABLE:
             return self.LL1_TABLE
-        select = self.selectSet()
+        cg = self.compile()
         table = {}
-        for i, (A, beta) in enumerate(self.P):
-            table.setdefault(A, {})
-            p = self.getPstr(A, beta)
-            for w in select[p] - {EPS}:
-                table[A][w] = i
-            if EPS in select[p]:
-                table[A][EOF] = i
+        for i, (mask, nullable) in enumerate(cg.select_sets()):
+            row = table.setdefault(self.P[i][0], {})
+            for a in bit_ids(mask):
+                row[cg.terminals[a]] = i
+            if nullable:
+                row[EOF] = i
         self.LL1_TABLE = table
         return table
 
@@ -146,25 +582,28 @@ class Grammar:
         hasLeftRecursion = any(beta[0] == A for A, beta in self.P)
         if hasLeftRecursion:
             return False, "含有直接左递归，不是LL(1)文法"
-        Aset = {A for A, beta in self.P}
-        select = self.selectSet().items()
-        for A in Aset:
-            sets = [ s  for Pstr, s in select if  self.getP(Pstr)[0] == A]
-            intersection = set()
-            isIntersect = False
-            for s in sets:
-                for x in s:
-                    if x in intersection:
-                        isIntersect = True
-                    else:
-                        intersection.add(x)
-            if isIntersect:
+        cg = self.compile()
+        select = cg.select_sets()
+        # 同一左部各产生式的 SELECT 集合两两不相交, ε 作为额外的一位参与比较
+        eps_bit = 1 << len(cg.symbols)
+        seen = {}
+        for i in cg.prod_id.values():
+            mask, nullable = select[i]
+            if nullable:
+                mask |= eps_bit
+            A = cg.lhs[i]
+            if seen.get(A, 0) & mask:
                 return False, "存在回溯，不是LL(1)文法"
+            seen[A] = seen.get(A, 0) | mask
         return True, "是LL(1)文法"
 
 
+    @Profiler.timed("LL1_analyze")
     def LL1_analyze(self, token: Token) -> tuple[Digraph, list, str]:
+        profile = Profiler.ACTIVE
         table = self.LL1_table()
+        cg = self.compile()
+        kind = lambda x: cg.kind[cg.sym_id[x]]
         stack = [EOF, self.S]
         queue = []
         type, word = token.peek()
@@ -181,7 +620,7 @@ class Grammar:
             node = syntaxStack[-1] if syntaxStack else {} 
             if focus == EOF and type == EOF:
                 break
-            elif focus in self.T or focus == EOF:
+            elif kind(focus) == TERMINAL:
                 if focus == type:
                     stack.pop()
                     syntaxStack.pop()
@@ -190,23 +629,26 @@ class Grammar:
                     queue.append(word)
                     processList.append((stack.copy(), token.get_types(), "→"))
                 else:
-                    exception_word = list(table[focus].keys())
+                    exception_word = [focus]
                     syntaxMsg = f'{" ".join(queue)}\nsyntax error: excepted {" ".join(exception_word)} but gave {type}'
                     processList.append((stack.copy(), token.get_types(), "error"))
-                    node[focus] = type + "error"
                     error = True
                     break
-            elif focus in self.NT:
+            elif kind(focus) == NONTERMINAL:
                 idx = table[focus].get(type)
+                if profile is not None:
+                    profile.count("LL1_analyze.predictions", (focus, type))
                 if idx is not None:
+                    if profile is not None:
+                        profile.count("LL1_analyze.productions", self.getPstr(*self.P[idx]))
                     stack.pop()
                     syntaxStack.pop()
                     stack.extend(reversed(self.P[idx][1]))
                     processList.append(([x for x in stack if x != EPS], token.get_types(), str(idx)))
-                    for k in reversed(self.P[idx][1]):
-                        t = k if k in self.T or k == EPS else {k: []}
-                        node[focus].append(t)
-                        syntaxStack.append(t)
+                    # 子结点按顺序加入, 按逆序压栈, 与符号栈一一对应
+                    children = [{k: []} if kind(k) == NONTERMINAL else k for k in self.P[idx][1]]
+                    node[focus].extend(children)
+                    syntaxStack.extend(reversed(children))
                 else:
                     exception_word = list(table[focus].keys())
                     syntaxMsg = f'{" ".join(queue)}\nsyntax error: excepted {" ".join(exception_word)} but gave {type}'
@@ -218,24 +660,26 @@ class Grammar:
                 stack.pop()
                 syntaxStack.pop()
 
-        def reverse(node):
-            if isinstance(node, str):
-                return
-            elif isinstance(node, list):
-                node.reverse()
-                for k in node:
-                    reverse(k)
-            else:
-                for key in node:
-                    reverse(node[key])
-
-        reverse(syntaxTree)
         dot = self.buildSyntaxTreeDot(syntaxTree)
         if not error:
             return dot, processList, "success"
         else:
             return dot, processList, syntaxMsg
 
+    def LL1_parse(self, token: Token, trace: list = None, arena: bool = False) -> tuple:
+        """不记录分析过程、不生成图的 LL(1) 分析, 返回 (语法树, "success" 或错误信息)
+
+        使用整数编码的分析表 (LLTable), 每个单词的代价为常数; 需要图时对语法树调用 buildSyntaxTreeDot。
+        arena 为真时语法树为数组存储的 SyntaxTree (不记录分析过程), 其 to_dict() 为原格式的语法树
+        """
+        if self.LL_TABLE is None:
+            with BUILD_LOCK:
+                if self.LL_TABLE is None:
+                    self.LL_TABLE = LLTable.build(self)
+        if arena:
+            return self.LL_TABLE.parse_tree(token)
+        return self.LL_TABLE.parse(token, trace)
+
     def closure(self, s: list) -> list:
         worklist = s.copy()
         while worklist:
@@ -266,23 +710,23 @@ class Grammar:
                 move.append(delta[0])
         return list(filter(lambda x: x in move, self.T)) + list(filter(lambda x: x in move, self.NT))
 
+    @Profiler.timed("build_CC")
     def build_CC(self) -> tuple[list[list], dict[str, dict[str, int]]]:
+        """LR(1) 项集规范族, 由 CompiledGrammar.lr1_states 转换为 (A, β, δ, a) 形式"""
         if self.CC and self.CC_dict:
             return self.CC, self.CC_dict
-        CC = [self.closure([(self.S, [], self.P[0][1], EOF)])]
-        CC_dict = {}
-        worklist = CC.copy()
-        while worklist:
-            s = worklist.pop(0)
-            CC_dict[CC.index(s)] = {}
-            for x in self.find_next(s):
-                s1 = self.goto(s, x)
-                if s1 not in CC:
-                    worklist.append(s1)
-                    CC.append(s1)
-                CC_dict[CC.index(s)][x] = CC.index(s1)
-        self.CC = CC
-        self.CC_dict = CC_dict
+        cg = self.compile()
+        states, trans = cg.lr1_states()
+
+        def item_tuples(s):
+            for c, mask in s:
+                A, beta = self.P[cg.core_prod[c]]
+                dot = cg.core_dot[c]
+                for a in bit_ids(mask):
+                    yield (A, beta[:dot], beta[dot:], cg.terminals[a])
+
+        self.CC = [sorted(item_tuples(s)) for s in states]
+        self.CC_dict = {u: {cg.symbols[x]: v for x, v in row.items()} for u, row in enumerate(trans)}
         return self.CC, self.CC_dict
 
     def CCstr(self) -> list[str]:
@@ -311,38 +755,41 @@ class Grammar:
         )
         return cc_dfa
 
+    def table_view(self, action: list[dict[int, int]], goto: list[dict[int, int]]) -> tuple[dict, dict]:
+        """整数分析表 -> {状态: {终结符: "s12" / "r3" / "acc"}}, {状态: {非终结符: "5"}}"""
+        cg = self.compile()
+        Action = {u: {cg.terminals[a]: cg.action_str(v) for a, v in row.items()} for u, row in enumerate(action)}
+        Goto = {u: {cg.symbols[A]: str(v) for A, v in row.items()} for u, row in enumerate(goto)}
+        return Action, Goto
+
     def LR1_table(self) -> tuple[dict[str, dict[str, str]], dict[str, dict[str, str]]]:
         if self.Action and self.Goto:
             return self.Action, self.Goto
-        CC, CC_dict = self.build_CC()
-        Action = {}
-        Goto = {}
-        for u, item in CC_dict.items():
-            Action.setdefault(u, {})
-            Goto.setdefault(u, {})
-            for w, v in item.items():
-                if w in self.T:
-                    if w in Action[u]:
-                        raise Exception(f"Error: Action.at[{u}, {w}] = {Action[u][w]} but reassgin to {f's{v}'}")
-                    Action[u][w] = f"s{v}"
-                else:
-                    Goto[u][w] = str(v)
-        for u in range(len(CC)):
-            for A, beta, delta, a in CC[u]:
-                if not delta:
-                    idx = self.Pstr.index(self.getPstr(A, beta))
-                    if a in Action[u]:
-                        raise Exception(f"Error: Action.at[{u}, {a}] = {Goto[u][a]} but reassgin to {f"r{idx}"}")
-                    if (A, beta) == (self.S, self.P[0][1]):
-                        Action[u][a] = "acc"
-                    else:
-                        Action[u][a] = f"r{idx}"
-        self.Action = Action
-        self.Goto = Goto
+        self.Action, self.Goto = self.table_view(*self.compile().lr_table())
         return self.Action, self.Goto
 
-    def LR1_analyze(self, token: Token)-> tuple[Digraph, list, str]:
-        Action, Goto = self.LR1_table()
+    def build_LR0(self) -> tuple[list[frozenset], dict[int, dict[str, int]]]:
+        """LR(0) 项集规范族: 项集为点位的 frozenset, 状态编号顺序与 build_CC 相同"""
+        cg = self.compile()
+        states, trans = cg.lr0_states()
+        return states, {u: {cg.symbols[x]: v for x, v in row.items()} for u, row in enumerate(trans)}
+
+    def LALR1_table(self) -> tuple[dict[str, dict[str, str]], dict[str, dict[str, str]]]:
+        """LALR(1) 分析表, 格式同 LR1_table
+
+        向前看集合在 LR(0) 项集族上用 DeRemer–Pennello 方法计算 (见 CompiledGrammar.lalr1_lookaheads);
+        合并同心状态可能引入 LR(1) 中没有的规约-规约冲突, 与其他冲突一样抛出异常
+        """
+        if self.LALR_Action and self.LALR_Goto:
+            return self.LALR_Action, self.LALR_Goto
+        self.LALR_Action, self.LALR_Goto = self.table_view(*self.compile().lr_table(lalr=True))
+        return self.LALR_Action, self.LALR_Goto
+
+    @Profiler.timed("LR1_analyze")
+    def LR1_analyze(self, token: Token, lalr: bool = False)-> tuple[Digraph, list, str]:
+        profile = Profiler.ACTIVE
+        cg = self.compile()
+        action, goto = cg.lr_table(lalr)
         stack = []
         queue = []
         stack.append((EOF, 0))
@@ -354,32 +801,36 @@ class Grammar:
         syntaxTree = []
         while True:
             _, state = stack[-1]
-            if type not in Action[state]:
+            act = action[state].get(cg.sym_id.get(type))
+            if profile is not None:
+                kind = "error" if act is None else "shift" if act > 0 else "reduce" if act < -1 else "accept"
+                profile.count("LR1_analyze.state_actions", (state, kind))
+                if act is not None and act < -1:
+                    profile.count("LR1_analyze.reductions", self.getPstr(*self.P[-act - 1]))
+            if act is None:
                 processList.append((state, type, stack.copy(), [], "error"))
-                exception_word = [k for k, v in Action[state].items() if v != "-"]
+                exception_word = [cg.terminals[a] for a in action[state]]
                 syntaxMsg = f'{" ".join(queue)}\nsyntax error: excepted {" ".join(exception_word)} but gave {type}'
                 error = True
                 break
-            action = Action[state][type]
-            if action.startswith("r"):
-                A, beta = self.P[int(action[1:])]
-                processList.append((state, type, [x[0] for x in stack], beta, action))
-                subTree = []
-                for i in range(len(beta)):
-                    stack.pop()
-                    subTree.insert(0, syntaxTree.pop())
+            if act < -1:
+                A, beta = self.P[-act - 1]
+                processList.append((state, type, [x[0] for x in stack], beta, cg.action_str(act)))
+                subTree = syntaxTree[len(syntaxTree) - len(beta) :]
+                del syntaxTree[len(syntaxTree) - len(beta) :]
+                del stack[len(stack) - len(beta) :]
                 syntaxTree.append({A: subTree})
                 newState = stack[-1][1]
-                stack.append((A, int(Goto[newState][A])))
-            elif action.startswith("s"):
-                processList.append((state, type, [x[0] for x in stack], [], action))
-                stack.append((type, int(action[1:])))
+                stack.append((A, goto[newState][cg.lhs[-act - 1]]))
+            elif act > 0:
+                processList.append((state, type, [x[0] for x in stack], [], cg.action_str(act)))
+                stack.append((type, act))
                 syntaxTree.append(type)
                 type, word = token.next()
                 queue.append(word)
-            elif action == "acc":
+            else:
                 syntaxTree = [{self.S: syntaxTree}]
-                processList.append((state, type, [x[0] for x in stack], self.P[0][1], action))
+                processList.append((state, type, [x[0] for x in stack], self.P[0][1], "acc"))
                 break
         dot = self.buildSyntaxTreeDot(syntaxTree)
         if not error:
@@ -387,31 +838,42 @@ class Grammar:
         else:
             return dot, processList, syntaxMsg
 
-    def buildSyntaxTreeDot(self, syntaxTree):
+    def LR1_parse(self, token: Token, actions: dict = None, lalr: bool = False, trace: list = None, arena: bool = False) -> tuple:
+        """不记录分析过程、不生成图的 LR 分析, 返回 (语法树或语义值, "success" 或错误信息)
+
+        使用压缩的整数分析表 (LRTable), 每个单词的代价为常数; actions 为 {产生式编号或产生式字符串: fn},
+        见 LRTable.parse。需要图时对语法树调用 buildSyntaxTreeDot。
+        arena 为真时语法树为数组存储的 SyntaxTree (忽略 actions 和 trace), 其 to_list() 为原格式的语法树
+        """
+        if lalr not in self.LR_TABLE:
+            with BUILD_LOCK:
+                if lalr not in self.LR_TABLE:
+                    self.LR_TABLE[lalr] = LRTable.build(self, lalr)
+        if arena:
+            return self.LR_TABLE[lalr].parse_tree(token)
+        if actions is not None:
+            actions = {self.compile().prod_id[p] if isinstance(p, str) else p: fn for p, fn in actions.items()}
+        return self.LR_TABLE[lalr].parse(token, actions, trace)
+
+    def Earley_parse(self, token: Token) -> tuple:
+        """适用于任意上下文无关文法的 Earley 分析 (不要求 LL(1) / LR(1)), 返回 (Forest 或 None, "success" 或错误信息)
+
+        Forest 为共享打包语法森林: count() 为语法树数目, tree() 任取一棵 (格式同 LR1_parse), trees() 逐个产生。
+        有歧义时结点数仍为多项式; 确定的部分 (如 LR(k) 文法) 耗时随输入线性增长
+        """
+        if self.EARLEY is None:
+            with BUILD_LOCK:
+                if self.EARLEY is None:
+                    self.EARLEY = EarleyParser(self)
+        return self.EARLEY.parse(token)
+
+    def buildSyntaxTreeDot(self, syntaxTree, max_depth: int = None, max_nodes: int = None) -> Digraph:
+        """语法树 (嵌套 dict / list 或 SyntaxTree) -> Digraph; 迭代遍历, 折叠参数见 DotWriter.emit_syntax_tree
+
+        很大的树用 DotWriter.write_syntax_tree 直接写入文件, 不在内存中构造 Digraph
+        """
         dot = Digraph()
-        idx = 0
-
-        def dfs(node, fa):
-            nonlocal idx
-            if isinstance(node, str):
-                cur = idx
-                idx += 1
-                dot.node(str(cur), node, shape="doublecircle")
-                if fa is not None:
-                    dot.edge(str(fa), str(cur))
-            elif isinstance(node, list):
-                for value in node:
-                    dfs(value, fa)
-            else:
-                for key, value in node.items():
-                    son = idx
-                    idx += 1
-                    dot.node(str(son), key, shape="circle")
-                    if fa is not None:
-                        dot.edge(str(fa), str(son))
-                    dfs(value, son)
-
-        dfs(syntaxTree, None)
+        emit_syntax_tree(dot, syntaxTree, max_depth, max_nodes)
         return dot
 
     def derivation(self, s: list[str]):
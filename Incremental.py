@@ -0,0 +1,263 @@
+import gc
+from bisect import bisect_left
+
+from Lexer import CompiledLexer, EOF
+from LRTable import LRTable
+
+
+class IncrementalLexer:
+    """可按编辑增量更新的单词流 (不含空白符号)
+
+    每个单词记录起点和识别时 DFA 读到的最远下标 reach (含其前面空白符号的 reach);
+    编辑只影响 reach 不小于编辑位置的单词, 从其前一个单词的末尾开始重新扫描,
+    直到新单词的起点与某个编辑之后的旧单词 (起点平移后) 重合, 此后的单词与原来相同
+    """
+
+    def __init__(self, lexer: CompiledLexer, text: str = ""):
+        self.lexer = lexer
+        self.text = ""
+        self.types, self.words, self.starts, self.reaches = [], [], [], []
+        # 词法错误的位置, 没有错误时为 None
+        self.error = None
+        # 所有单词 reach 超出单词末尾的最大距离, 用于限定向前查找受影响单词的范围
+        self.lookahead = 0
+        self.edit(0, 0, text)
+
+    @property
+    def tokens(self) -> list[tuple[str, str]]:
+        return list(zip(self.types, self.words))
+
+    def edit(self, offset: int, length: int, text: str) -> tuple[int, int, int]:
+        """把 [offset, offset + length) 替换为 text; 返回 (lo, old_hi, new_hi): 旧单词 [lo, old_hi) 被替换为新单词 [lo, new_hi)"""
+        if offset < 0 or offset + length > len(self.text):
+            raise Exception(f"Error: edit ({offset}, {length}) out of range 0..{len(self.text)}")
+        source = self.text[:offset] + text + self.text[offset + length :]
+        delta = len(text) - length
+        types, words, starts, reaches = self.types, self.words, self.starts, self.reaches
+
+        lo = bisect_left(starts, offset)
+        j = lo
+        while j > 0 and starts[j - 1] + len(words[j - 1]) + self.lookahead >= offset:
+            j -= 1
+            if reaches[j] >= offset:
+                lo = j
+        pos = starts[lo - 1] + len(words[lo - 1]) if lo else 0
+
+        old = bisect_left(starts, offset + length)
+        new_types, new_words, new_starts, new_reaches = [], [], [], []
+        pending = -1
+        end = pos
+        resync = False
+        for type, word, start, reach in self.lexer.scan(source, pos):
+            end = start + len(word)
+            pending = max(pending, reach)
+            if type == "whitespace":
+                continue
+            while old < len(starts) and starts[old] + delta < start:
+                old += 1
+            if old < len(starts) and starts[old] + delta == start:
+                resync = True
+                break
+            new_types.append(type)
+            new_words.append(word)
+            new_starts.append(start)
+            new_reaches.append(pending)
+            self.lookahead = max(self.lookahead, pending - end)
+            pending = -1
+        if resync:
+            reaches[old] = max(reaches[old], pending - delta)
+            if self.error is not None:
+                self.error += delta
+        else:
+            old = len(starts)
+            self.error = end if end < len(source) else None
+
+        hi = lo + len(new_types)
+        types[lo:old] = new_types
+        words[lo:old] = new_words
+        self.starts = starts[:lo] + new_starts + [s + delta for s in starts[old:]]
+        self.reaches = reaches[:lo] + new_reaches + [r + delta for r in reaches[old:]]
+        self.text = source
+        return lo, old, hi
+
+
+class Node(dict):
+    """语法树结点 {A: 子结点列表}, 与 LRTable.parse 生成的结点相等
+
+    另外记录覆盖的单词数 length 和规约时子结点左侧的状态 state, 供增量分析判断能否复用
+    """
+
+    __slots__ = ("kids", "symbol", "length", "state")
+
+    def __init__(self, name: str, kids: list, symbol: int, length: int, state: int):
+        super().__init__(((name, kids),))
+        self.kids = kids
+        self.symbol = symbol
+        self.length = length
+        self.state = state
+
+
+class TreeCursor:
+    """按单词位置从左到右遍历上一次分析得到的语法树 (或出错时栈中的子树序列)"""
+
+    def __init__(self, forest: list):
+        # 每层为 [子结点列表, 下标, 该子结点的起始位置]
+        self.frames = [[forest, 0, 0]]
+
+    def find(self, a: int, state: int, limit: int):
+        """起始于位置 a、左侧状态为 state、覆盖不超过 limit 个单词的最外层非空子树, 没有时返回 None
+
+        位置 a 只能单调不减
+        """
+        frames = self.frames
+        while frames:
+            frame = frames[-1]
+            kids, idx, pos = frame
+            if idx >= len(kids):
+                frames.pop()
+                continue
+            x = kids[idx]
+            n = x.length if isinstance(x, Node) else 1
+            if pos + n <= a:
+                frame[1], frame[2] = idx + 1, pos + n
+                continue
+            if pos > a:
+                return None
+            if pos == a:
+                # x 及其最左侧的非空后代都起始于 a, 由外向内查找
+                while isinstance(x, Node):
+                    if x.state == state and x.length <= limit:
+                        return x
+                    x = next(y for y in x.kids if not isinstance(y, Node) or y.length)
+                return None
+            frame[1], frame[2] = idx + 1, pos + n
+            frames.append([x.kids, 0, pos])
+        return None
+
+
+class IncrementalParser:
+    """LRTable 上的增量 LR 分析
+
+    分析到某个位置时, 若上一棵语法树中对应位置起始的子树未受编辑影响, 其后的向前看单词也未改变,
+    且当时其左侧的状态与当前状态相同, 则确定性的 LR 分析必然重新得到这棵子树, 直接移入该子树并按 Goto 转移
+    """
+
+    def __init__(self, table: LRTable):
+        self.table = table
+        # 上一次分析得到的子树序列: 成功时为产生式 0 右部的各子结点, 出错时为栈中的子树; None 表示没有可复用的结果
+        self.forest = None
+        self.reused = 0
+
+    def parse(self, types: list[str], words: list[str], lo: int = 0, old_hi: int = 0, new_hi: int = 0) -> tuple:
+        """分析单词序列, 返回值与 LRTable.parse (不带语义动作) 相同
+
+        上一次分析的单词 [lo, old_hi) 被替换为本次的 [lo, new_hi), 其余单词不变; 第一次分析时忽略这些参数
+        """
+        table = self.table
+        term_id, nonterminals = table.term_id, table.nonterminals
+        lhs, rhs_len, default, goto_default = table.lhs, table.rhs_len, table.default, table.goto_default
+        action_base, goto_base, value, check = table.action_base, table.goto_base, table.value, table.check
+        n_states = len(default)
+        eof = term_id[EOF]
+        cursor = TreeCursor(self.forest) if self.forest is not None else None
+        shift = old_hi - new_hi
+        n = len(types)
+        states = [0]
+        values = []
+        starts = []
+        self.reused = 0
+        i = 0
+        a = term_id.get(types[0], -1) if n else eof
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while True:
+                s = states[-1]
+                if cursor is not None and i < n and (i < lo or i >= new_hi):
+                    node = cursor.find(i, s, lo - 1 - i) if i < lo else cursor.find(i + shift, s, n)
+                    if node is not None:
+                        values.append(node)
+                        starts.append(i)
+                        states.append(table.goto(s, node.symbol))
+                        i += node.length
+                        a = term_id.get(types[i], -1) if i < n else eof
+                        self.reused += 1
+                        continue
+                if a >= 0:
+                    g = action_base[s] + a
+                    act = value[g] if check[g] == s else default[s]
+                else:
+                    act = default[s]
+                if act > 0:
+                    states.append(act)
+                    values.append(types[i])
+                    starts.append(i)
+                    i += 1
+                    a = term_id.get(types[i], -1) if i < n else eof
+                elif act < -1:
+                    p = -act - 1
+                    k = rhs_len[p]
+                    A = lhs[p]
+                    if k:
+                        start = starts[-k]
+                        children = values[-k:]
+                        del values[-k:]
+                        del states[-k:]
+                        del starts[-k:]
+                    else:
+                        start = i
+                        children = []
+                    s = states[-1]
+                    values.append(Node(nonterminals[A], children, A, i - start, s))
+                    starts.append(start)
+                    g = goto_base[s] + A
+                    states.append(value[g] if check[g] == n_states + s else goto_default[A])
+                elif act == -1:
+                    self.forest = values
+                    return [Node(nonterminals[lhs[0]], values, lhs[0], n, 0)], "success"
+                else:
+                    self.forest = values.copy()
+                    type, word = (types[i], words[i]) if i < n else (EOF, EOF)
+                    syntaxMsg = f"syntax error at token {i} '{word}': excepted {' '.join(table.expected(s))} but gave {type}"
+                    return values, syntaxMsg
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+class Document:
+    """编辑器中的一份源码: 每次编辑后增量地重新进行词法分析和 LR 分析"""
+
+    def __init__(self, lexer: CompiledLexer, table: LRTable, text: str = ""):
+        self.lexer = IncrementalLexer(lexer, text)
+        self.parser = IncrementalParser(table)
+        self.tree, self.syntaxMsg = self.parser.parse(self.lexer.types, self.lexer.words)
+
+    @property
+    def text(self) -> str:
+        return self.lexer.text
+
+    def edit(self, offset: int, length: int, text: str) -> tuple:
+        """把 [offset, offset + length) 替换为 text, 返回 (语法树, "success" 或错误信息)
+
+        词法错误之后的单词不参与语法分析, 与 CompiledLexer.get_token 一致
+        """
+        lo, old_hi, new_hi = self.lexer.edit(offset, length, text)
+        self.tree, self.syntaxMsg = self.parser.parse(self.lexer.types, self.lexer.words, lo, old_hi, new_hi)
+        return self.tree, self.syntaxMsg
+
+
+if __name__ == "__main__":
+    import json
+
+    from FA import DFA
+    from Grammar import Grammar
+    from Lexer import Lexer
+
+    dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
+    with open("./input/Lexer/Expr_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    table = LRTable.build(Grammar.load("./input/Grammar/Expr_G.txt"))
+    doc = Document(Lexer(dfa, config).compile(), table, "a + b * c")
+    print(doc.tree, doc.syntaxMsg)
+    print(doc.edit(4, 1, "(b - 1)"), f"reused={doc.parser.reused}")
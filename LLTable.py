@@ -0,0 +1,181 @@
+import gc
+from array import array
+
+from Lexer import Token
+from SyntaxTree import SyntaxTree
+
+EPS = "ε"
+
+
+class LLTable:
+    """整数编码的 LL(1) 预测分析表
+
+    终结符 (最后一个为 $) 编号为 0 .. m-1, 非终结符编号为 m, m+1, ..., ε 编号为 -1;
+    table[(A - m) * m + a] 为产生式编号, -1 表示出错; 各产生式右部按逆序保存, 展开时直接压栈
+    """
+
+    def __init__(self, terminals: list[str], nonterminals: list[str], start: str, table, rhs: list[tuple[int, ...]]):
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.names = terminals + nonterminals
+        self.term_id = {t: i for i, t in enumerate(terminals)}
+        self.start = len(terminals) + nonterminals.index(start)
+        self.table = array("i", table)
+        self.rhs = rhs
+        self.rhs_reversed = [tuple(reversed(beta)) for beta in rhs]
+
+    @classmethod
+    def build(cls, G):
+        """由 Grammar 编号后的 SELECT 集合 (CompiledGrammar.select_sets) 构造, 与 LL1_table 相同, 冲突时后面的产生式优先"""
+        cg = G.compile()
+        m = cg.m
+        table = [-1] * (len(cg.nonterminals) * m)
+        for p, (mask, nullable) in enumerate(cg.select_sets()):
+            row = (cg.lhs[p] - m) * m
+            for a in range(m):
+                if mask >> a & 1:
+                    table[row + a] = p
+            if nullable:
+                table[row + cg.eof] = p
+        rhs = [tuple(-1 if x == cg.eps else x for x in beta) for beta in cg.rhs]
+        return cls(cg.terminals, cg.nonterminals, G.S, table, rhs)
+
+    def name(self, x: int) -> str:
+        return self.names[x] if x >= 0 else EPS
+
+    def expected(self, x: int) -> list[str]:
+        m = len(self.terminals)
+        if x < m:
+            return [self.terminals[x]]
+        return [t for a, t in enumerate(self.terminals) if self.table[(x - m) * m + a] >= 0]
+
+    def parse(self, token: Token, trace: list = None) -> tuple:
+        """LL(1) 分析, 返回 (语法树, "success" 或错误信息), 语法树与 LL1_analyze 相同
+
+        语法树结点在从栈中弹出时追加到父结点的子结点列表末尾; 栈按最左推导的顺序弹出, 因此子结点天然有序, 不需要再逆序。
+        trace 为列表时按 LL1_analyze 的格式追加分析过程 (每步调用 token.get_types()), 否则不做任何记录;
+        与 LRTable.parse 一样, 分析期间暂停循环垃圾回收
+        """
+        term_id, names, table, rhs_reversed = self.term_id, self.names, self.table, self.rhs_reversed
+        m = len(self.terminals)
+        eof = m - 1
+        root = []
+        symbols = [eof, self.start]
+        parents = [None, root]
+        pos = 0
+        type, word = token.peek()
+        a = term_id.get(type, -1)
+        if trace is not None:
+            trace.append(([self.name(x) for x in symbols], token.get_types(), "-"))
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while True:
+                x = symbols[-1]
+                if x >= m:
+                    p = table[(x - m) * m + a] if a >= 0 else -1
+                    if p < 0:
+                        break
+                    symbols.pop()
+                    kids = []
+                    parents.pop().append({names[x]: kids})
+                    for y in rhs_reversed[p]:
+                        symbols.append(y)
+                        parents.append(kids)
+                    if trace is not None:
+                        trace.append(([self.name(y) for y in symbols if y >= 0], token.get_types(), str(p)))
+                elif x >= 0:
+                    if x != a:
+                        break
+                    if x == eof:
+                        return root[0], "success"
+                    symbols.pop()
+                    parents.pop().append(type)
+                    token.next()
+                    type, word = token.peek()
+                    a = term_id.get(type, -1)
+                    pos += 1
+                    if trace is not None:
+                        trace.append(([self.name(y) for y in symbols], token.get_types(), "→"))
+                else:
+                    symbols.pop()
+                    parents.pop().append(EPS)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if trace is not None:
+            trace.append(([self.name(y) for y in symbols], token.get_types(), "error"))
+        syntaxMsg = f"syntax error at token {pos} '{word}': excepted {' '.join(self.expected(x))} but gave {type}"
+        return (root[0] if root else {}), syntaxMsg
+
+    def parse_tree(self, token: Token) -> tuple[SyntaxTree, str]:
+        """与 parse 相同的分析过程, 语法树存入 SyntaxTree, 同时保存各单词; tree.to_dict() 与 parse 返回的语法树相同
+
+        结点在从栈中弹出时创建并接到父结点最后一个子结点之后, 子结点按从左到右的顺序链接
+        """
+        term_id, table, rhs_reversed = self.term_id, self.table, self.rhs_reversed
+        m = len(self.terminals)
+        eof = m - 1
+        tree = SyntaxTree(self.names)
+        first_child, next_sibling, words, roots = tree.first_child, tree.next_sibling, tree.words, tree.roots
+        add_symbol, add_prod, add_token = tree.symbol.append, tree.prod.append, tree.token.append
+        add_first, add_next = first_child.append, next_sibling.append
+        count = 0
+        # last[n]: 结点 n 当前的最后一个子结点
+        last = []
+        symbols = [eof, self.start]
+        parents = [-1, -1]
+        type, word = token.peek()
+        a = term_id.get(type, -1)
+        while True:
+            x = symbols[-1]
+            if x >= m:
+                p = table[(x - m) * m + a] if a >= 0 else -1
+                if p < 0:
+                    break
+                add_prod(p)
+                add_token(-1)
+            elif x >= 0:
+                if x != a:
+                    break
+                if x == eof:
+                    return tree, "success"
+                add_prod(-1)
+                add_token(len(words))
+                words.append(word)
+                token.next()
+                type, word = token.peek()
+                a = term_id.get(type, -1)
+            else:
+                add_prod(-1)
+                add_token(-1)
+            symbols.pop()
+            add_symbol(x)
+            add_first(-1)
+            add_next(-1)
+            last.append(-1)
+            parent = parents.pop()
+            if parent < 0:
+                roots.append(count)
+            else:
+                if last[parent] < 0:
+                    first_child[parent] = count
+                else:
+                    next_sibling[last[parent]] = count
+                last[parent] = count
+            if x >= m:
+                for y in rhs_reversed[p]:
+                    symbols.append(y)
+                    parents.append(count)
+            count += 1
+        syntaxMsg = f"syntax error at token {len(words)} '{word}': excepted {' '.join(self.expected(x))} but gave {type}"
+        return tree, syntaxMsg
+
+
+if __name__ == "__main__":
+    from Grammar import Grammar
+
+    G = Grammar.load("./input/Grammar/Expr_LL1_G.txt")
+    table = LLTable.build(G)
+    tokens = Token([("name", "a"), ("+", "+"), ("name", "b"), ("*", "*"), ("name", "c")])
+    print(table.parse(tokens))
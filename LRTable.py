@@ -0,0 +1,341 @@
+import gc
+import json
+import struct
+import sys
+from array import array
+
+from Lexer import Token, EOF
+from SyntaxTree import SyntaxTree
+
+MAGIC = b"LRT1"
+
+
+def pack_rows(rows: list[dict[int, int]], width: int) -> tuple[list[int], list[int], list[int]]:
+    """行位移压缩: 每行 {列: 值} 放到公共数组中互不重叠的位置, 返回 (各行起点, value, check)
+
+    check 记录该位置所属的行号, 数组末尾留出 width 个空位, 查表时不需要检查下标越界
+    """
+    value, check = [], []
+    base = [0] * len(rows)
+    free = 0
+    for r in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        cols = sorted(rows[r])
+        if not cols:
+            continue
+        b = max(free - cols[0], 0)
+        while any(b + c < len(check) and check[b + c] >= 0 for c in cols):
+            b += 1
+        need = b + cols[-1] + 1
+        if need > len(check):
+            value.extend([0] * (need - len(check)))
+            check.extend([-1] * (need - len(check)))
+        for c in cols:
+            value[b + c] = rows[r][c]
+            check[b + c] = r
+        base[r] = b
+        while free < len(check) and check[free] >= 0:
+            free += 1
+    value.extend([0] * width)
+    check.extend([-1] * width)
+    return base, value, check
+
+
+class LRTable:
+    """整数编码、行位移压缩的 LR 分析表
+
+    终结符 (最后一个为 $) 和非终结符分别编号为 0, 1, ...; 动作为整数: 0 出错, v > 0 移进并转到状态 v,
+    v < 0 按产生式 -v-1 规约, 产生式 0 的规约即接受。
+    有规约的状态以出现最多的规约 (接受除外) 作为默认动作, Goto 每列以出现最多的目标状态作为默认值, 都不再单独存储;
+    其余的 Action 行 (行号 s) 和 Goto 行 (行号 n + s) 压缩在同一组 value / check 数组中
+    """
+
+    def __init__(self, terminals: list[str], nonterminals: list[str], rhs: list[list[str]], lhs, rhs_len, default,
+                 goto_default, action_base, goto_base, value, check):
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.rhs = rhs
+        self.term_id = {t: i for i, t in enumerate(terminals)}
+        self.lhs = array("i", lhs)
+        self.rhs_len = array("i", rhs_len)
+        self.default = array("i", default)
+        self.goto_default = array("i", goto_default)
+        self.action_base = array("i", action_base)
+        self.goto_base = array("i", goto_base)
+        self.value = array("i", value)
+        self.check = array("i", check)
+
+    @classmethod
+    def build(cls, G, lalr: bool = False):
+        """由 Grammar 编号后的 LR(1) 或 LALR(1) 分析表 (CompiledGrammar.lr_table) 构造"""
+        cg = G.compile()
+        action, goto = cg.lr_table(lalr)
+        m = cg.m
+        n = len(action)
+
+        action_rows = []
+        default = [0] * n
+        for s in range(n):
+            row = action[s]
+            counts = {}
+            for v in row.values():
+                if v < -1:
+                    counts[v] = counts.get(v, 0) + 1
+            if counts:
+                default[s] = max(counts, key=counts.get)
+                row = {c: v for c, v in row.items() if v != default[s]}
+            action_rows.append(row)
+
+        goto_rows = [{A - m: v for A, v in goto[s].items()} for s in range(n)]
+        goto_default = [0] * len(cg.nonterminals)
+        for A in range(len(cg.nonterminals)):
+            counts = {}
+            for row in goto_rows:
+                if A in row:
+                    counts[row[A]] = counts.get(row[A], 0) + 1
+            if counts:
+                goto_default[A] = max(counts, key=counts.get)
+        goto_rows = [{A: v for A, v in row.items() if v != goto_default[A]} for row in goto_rows]
+
+        base, value, check = pack_rows(action_rows + goto_rows, max(len(cg.terminals), len(cg.nonterminals)))
+        return cls(
+            cg.terminals,
+            cg.nonterminals,
+            rhs=[beta for A, beta in G.P],
+            lhs=[A - m for A in cg.lhs],
+            rhs_len=[len(beta) for beta in cg.rhs],
+            default=default,
+            goto_default=goto_default,
+            action_base=base[:n],
+            goto_base=base[n:],
+            value=value,
+            check=check,
+        )
+
+    @property
+    def nstates(self) -> int:
+        return len(self.default)
+
+    def action(self, s: int, a: int) -> int:
+        i = self.action_base[s] + a
+        return self.value[i] if self.check[i] == s else self.default[s]
+
+    def goto(self, s: int, A: int) -> int:
+        i = self.goto_base[s] + A
+        return self.value[i] if self.check[i] == self.nstates + s else self.goto_default[A]
+
+    def expected(self, s: int) -> list[str]:
+        return [t for a, t in enumerate(self.terminals) if self.action(s, a)]
+
+    def parse(self, token: Token, actions: dict = None, trace: list = None) -> tuple:
+        """LR 分析, 返回 (结果, "success" 或错误信息)
+
+        actions 为 None 时结果为与 LR1_analyze 相同的语法树; 否则为语义动作 {产生式编号: fn},
+        规约时以各子结点的值调用 fn(*values), 终结符的值为单词本身, 没有动作的产生式得到 {A: values},
+        产生式 0 的值即为结果。trace 为列表时按 LR1_analyze 的格式追加分析过程, 否则不做任何记录。
+        分析过程只产生树状结构, 不会形成循环引用, 期间暂停循环垃圾回收, 避免每次回收都遍历整棵已建好的树;
+        使用默认规约时, 错误可能在若干次规约之后才被发现, 但不会移进错误的单词
+        """
+        term_id, nonterminals = self.term_id, self.nonterminals
+        lhs, rhs_len, default, goto_default = self.lhs, self.rhs_len, self.default, self.goto_default
+        action_base, goto_base, value, check = self.action_base, self.goto_base, self.value, self.check
+        n = len(default)
+        fns = [None] * len(lhs)
+        for p, fn in (actions or {}).items():
+            fns[p] = fn
+        tree_mode = actions is None
+        symbols = [EOF]
+        states = [0]
+        values = []
+        pos = 0
+        type, word = token.next()
+        a = term_id.get(type, -1)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            while True:
+                s = states[-1]
+                if a >= 0:
+                    i = action_base[s] + a
+                    act = value[i] if check[i] == s else default[s]
+                else:
+                    act = default[s]
+                if act > 0:
+                    if trace is not None:
+                        trace.append((s, type, symbols.copy(), [], f"s{act}"))
+                        symbols.append(type)
+                    states.append(act)
+                    values.append(type if tree_mode else word)
+                    type, word = token.next()
+                    a = term_id.get(type, -1)
+                    pos += 1
+                elif act < -1:
+                    p = -act - 1
+                    k = rhs_len[p]
+                    A = lhs[p]
+                    if trace is not None:
+                        trace.append((s, type, symbols.copy(), self.rhs[p], f"r{p}"))
+                        if k:
+                            del symbols[-k:]
+                        symbols.append(nonterminals[A])
+                    if k:
+                        children = values[-k:]
+                        del values[-k:]
+                        del states[-k:]
+                    else:
+                        children = []
+                    fn = fns[p]
+                    values.append(fn(*children) if fn is not None else {nonterminals[A]: children})
+                    s = states[-1]
+                    i = goto_base[s] + A
+                    states.append(value[i] if check[i] == n + s else goto_default[A])
+                elif act == -1:
+                    if trace is not None:
+                        trace.append((s, type, symbols.copy(), self.rhs[0], "acc"))
+                    if tree_mode:
+                        return [{nonterminals[lhs[0]]: values}], "success"
+                    fn = fns[0]
+                    return (fn(*values) if fn is not None else {nonterminals[lhs[0]]: values}), "success"
+                else:
+                    if trace is not None:
+                        trace.append((s, type, symbols.copy(), [], "error"))
+                    syntaxMsg = f"syntax error at token {pos} '{word}': excepted {' '.join(self.expected(s))} but gave {type}"
+                    return values, syntaxMsg
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def parse_tree(self, token: Token) -> tuple[SyntaxTree, str]:
+        """与不带语义动作的 parse 相同的分析过程, 语法树存入 SyntaxTree, 同时保存各单词
+
+        tree.to_list() 与 parse 返回的语法树相同; 出错时 tree.roots 为栈中的各子树。
+        子结点总是先于父结点创建, 父结点创建时即可填入第一个子结点
+        """
+        term_id = self.term_id
+        lhs, rhs_len, default, goto_default = self.lhs, self.rhs_len, self.default, self.goto_default
+        action_base, goto_base, value, check = self.action_base, self.goto_base, self.value, self.check
+        n = len(default)
+        m = len(self.terminals)
+        tree = SyntaxTree(self.terminals + self.nonterminals)
+        next_sibling, words = tree.next_sibling, tree.words
+        add_symbol, add_prod, add_token = tree.symbol.append, tree.prod.append, tree.token.append
+        add_first, add_next = tree.first_child.append, next_sibling.append
+        count = 0
+        nodes = []
+        states = [0]
+        type, word = token.next()
+        a = term_id.get(type, -1)
+        while True:
+            s = states[-1]
+            if a >= 0:
+                i = action_base[s] + a
+                act = value[i] if check[i] == s else default[s]
+            else:
+                act = default[s]
+            if act > 0:
+                states.append(act)
+                add_symbol(a)
+                add_prod(-1)
+                add_token(len(words))
+                add_first(-1)
+                add_next(-1)
+                nodes.append(count)
+                count += 1
+                words.append(word)
+                type, word = token.next()
+                a = term_id.get(type, -1)
+            elif act < -1 or act == -1 and not nodes:
+                p = -act - 1 if act < -1 else 0
+                k = rhs_len[p] if act < -1 else 0
+                A = lhs[p]
+                add_symbol(m + A)
+                add_prod(p)
+                add_token(-1)
+                add_next(-1)
+                if k:
+                    add_first(nodes[-k])
+                    prev = nodes[-k]
+                    for c in nodes[len(nodes) - k + 1 :]:
+                        next_sibling[prev] = prev = c
+                    del nodes[-k:]
+                    del states[-k:]
+                else:
+                    add_first(-1)
+                nodes.append(count)
+                count += 1
+                if act == -1:
+                    tree.roots = nodes
+                    return tree, "success"
+                s = states[-1]
+                i = goto_base[s] + A
+                states.append(value[i] if check[i] == n + s else goto_default[A])
+            elif act == -1:
+                # 接受: 栈中各子树为产生式 0 的右部
+                add_symbol(m + lhs[0])
+                add_prod(0)
+                add_token(-1)
+                add_first(nodes[0])
+                add_next(-1)
+                prev = nodes[0]
+                for c in nodes[1:]:
+                    next_sibling[prev] = prev = c
+                tree.roots = [count]
+                return tree, "success"
+            else:
+                tree.roots = nodes
+                syntaxMsg = f"syntax error at token {len(words)} '{word}': excepted {' '.join(self.expected(s))} but gave {type}"
+                return tree, syntaxMsg
+
+    def to_bytes(self) -> bytes:
+        """序列化为单个二进制块: 文件头 + 符号表 (JSON) + 各 int32 数组 (小端)"""
+        names = json.dumps([self.terminals, self.nonterminals, self.rhs], ensure_ascii=False).encode("utf-8")
+        arrays = [self.lhs, self.rhs_len, self.default, self.goto_default, self.action_base, self.goto_base, self.value, self.check]
+        header = MAGIC + struct.pack("<I", len(names)) + struct.pack(f"<{len(arrays)}I", *map(len, arrays))
+        body = []
+        for arr in arrays:
+            if sys.byteorder == "big":
+                arr = array("i", arr)
+                arr.byteswap()
+            body.append(arr.tobytes())
+        return header + names + b"".join(body)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        if data[:4] != MAGIC:
+            raise Exception("Error: not an LR table blob")
+        pos = 4
+        (names_len,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        sizes = struct.unpack_from("<8I", data, pos)
+        pos += 32
+        terminals, nonterminals, rhs = json.loads(data[pos : pos + names_len].decode("utf-8"))
+        pos += names_len
+        arrays = []
+        for size in sizes:
+            arr = array("i")
+            arr.frombytes(data[pos : pos + size * arr.itemsize])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            arrays.append(arr)
+            pos += size * arr.itemsize
+        return cls(terminals, nonterminals, rhs, *arrays)
+
+    def save(self, filename: str):
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, filename: str):
+        with open(filename, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+if __name__ == "__main__":
+    from Grammar import Grammar
+
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    table = LRTable.build(G)
+    blob = table.to_bytes()
+    print(f"states={table.nstates} comb={len(table.value)} blob={len(blob)} bytes")
+    table = LRTable.from_bytes(blob)
+    tokens = Token([("name", "a"), ("+", "+"), ("name", "b"), ("*", "*"), ("name", "c")])
+    print(table.parse(tokens))
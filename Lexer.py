@@ -1,5 +1,7 @@
 import json
+import threading
 from FA import DFA
+import Profiler
 
 
 EOF = "$"
@@ -29,27 +31,66 @@ class Token:
         return self.types[: self.pos] + ["↑"] + self.types[self.pos :]
 
 
+class TokenStream:
+    """与 Token 接口一致的惰性单词流, 只保留一个前瞻单词"""
+
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.lookahead = next(self.tokens, (EOF, EOF))
+        self.pos = 0
+
+    def next(self):
+        word = self.lookahead
+        if word != (EOF, EOF):
+            self.lookahead = next(self.tokens, (EOF, EOF))
+            self.pos += 1
+        return word
+
+    def peek(self):
+        return self.lookahead
+
+    def get_types(self):
+        return ["↑", self.lookahead[0]]
+
+
+def read_chunks(filename: str, chunk_size: int = 1 << 16):
+    with open(filename, "r", encoding="utf-8") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
 class CharStream:
+    """字符流, 直接在原输入上移动下标; bytes 输入通过 memoryview 访问, 不复制"""
+
     def __init__(self, input_string):
-        self.input = input_string + EOF
+        self.is_bytes = isinstance(input_string, (bytes, bytearray, memoryview))
+        self.input = memoryview(input_string) if self.is_bytes else input_string
         self.pos = 0
 
     def has_next(self):
-        return self.pos < len(self.input) - 1
+        return self.pos < len(self.input)
 
     def next_char(self):
         if self.pos < len(self.input):
             char = self.input[self.pos]
             self.pos += 1
-            return char
+            return chr(char) if self.is_bytes else char
         else:
             self.pos += 1
             return EOF
 
-    def roll_back(self):
-        if self.pos > 0:
+    def roll_back(self, pos=None):
+        """回退一个字符, 或直接回退到下标 pos"""
+        if pos is not None:
+            self.pos = pos
+        elif self.pos > 0:
             self.pos -= 1
 
+    def slice(self, start, end):
+        if self.is_bytes:
+            return bytes(self.input[start:end]).decode("utf-8")
+        return self.input[start:end]
+
 
 class Lexer:
 
@@ -64,37 +105,65 @@ class Lexer:
         self.Type = config["Type"]
         self.charCat = config["charCat"]
         self.keyword = config["keyword"]
+        self.dfa = dfa
+        self.config = config
         self.char_stream = None
+        self.compiled = None
+        self.lock = threading.Lock()
 
     def analyze(self, input_string):
+        """返回独立的分析游标 LexerCursor, 同一个 Lexer 可以同时分析多个输入
+
+        游标的字符流同时保存在 self.char_stream 中, 兼容 lexer.analyze(s); lexer.get_token() 的用法 (这种用法不可并发)
+        """
         self.char_stream = CharStream(input_string)
-        return self
+        return LexerCursor(self, self.char_stream)
 
-    def next_word(self):
-        if not self.char_stream.has_next():
+    def scan(self, char_stream: CharStream):
+        """从 char_stream 中识别一个单词; 只读取 DFA 和配置, 不修改 Lexer"""
+        profile = Profiler.ACTIVE
+        if profile is None:
+            return self._scan(char_stream, None)
+        with profile.phase("Lexer.next_word"):
+            return self._scan(char_stream, profile)
+
+    def _scan(self, char_stream: CharStream, profile):
+        """profile 不为 None 时统计各 DFA 状态的访问次数, 以及在哪个状态出错后回退了多少字符"""
+        if not char_stream.has_next():
             return EOF, EOF
+        # 只记录单词起点和最近的接受状态及其位置, 回退时直接跳回, 单词最后一次性切片
+        start = char_stream.pos
         state = self.s0
-        lexem = ""
-        stack = []
-        stack.append("bad")
+        last, last_state = start, "bad"
+        prev = state
         while state != "err":
-            char = self.char_stream.next_char()
-            lexem += char
+            if profile is not None:
+                profile.count("Lexer.state_visits", state)
             if state in self.A:
-                stack.clear()
-            stack.append(state)
+                last, last_state = char_stream.pos, state
+            if not char_stream.has_next():
+                # 输入结束, 不再把 EOF 当作字符送入 DFA
+                break
+            char = char_stream.next_char()
             try:
                 cat = next(filter(lambda x: char in self.charCat[x], self.charCat.keys()))
             except StopIteration:
                 cat = "other"
+            prev = state
             if state in self.delta and cat in self.delta[state]:
                 state = self.delta[state][cat]
             else:
                 state = "err"
-        while state not in self.A and state != "bad":
-            state = stack.pop()
-            lexem = lexem[:-1]
-            self.char_stream.roll_back()
+        if profile is not None:
+            # 出错时多读的一个字符是正常的向前看, 超出部分才是回溯
+            extra = char_stream.pos - last - (state == "err")
+            if extra > 0:
+                where = prev if state == "err" else state
+                profile.count("Lexer.rollbacks", where)
+                profile.count("Lexer.rollback_chars", where, extra)
+        state = last_state
+        char_stream.roll_back(last)
+        lexem = char_stream.slice(start, last)
         if state in self.A:
             if state in self.Type:
                 if lexem not in self.keyword:
@@ -103,6 +172,39 @@ class Lexer:
         else:
             return EOF, EOF
 
+    def next_word(self):
+        return self.scan(self.char_stream)
+
+    def get_token(self):
+        return LexerCursor(self, self.char_stream).get_token()
+
+    def compile(self):
+        return CompiledLexer(self.dfa, self.config)
+
+    def stream(self, chunks):
+        """流式词法分析: chunks 为文本块的可迭代对象, 惰性产生非空白的 (type, word)"""
+        if self.compiled is None:
+            with self.lock:
+                if self.compiled is None:
+                    self.compiled = self.compile()
+        for token in self.compiled.stream(chunks):
+            if token[0] != "whitespace":
+                yield token
+
+    def stream_file(self, filename: str, chunk_size: int = 1 << 16):
+        return self.stream(read_chunks(filename, chunk_size))
+
+
+class LexerCursor:
+    """一次词法分析的状态: 自己的字符流, 加上只读共享的 Lexer"""
+
+    def __init__(self, lexer: Lexer, char_stream: CharStream):
+        self.lexer = lexer
+        self.char_stream = char_stream
+
+    def next_word(self):
+        return self.lexer.scan(self.char_stream)
+
     def get_token(self):
         tokens = []
         while True:
@@ -114,6 +216,151 @@ class Lexer:
         return Token(tokens)
 
 
+class CompiledLexer:
+    """表驱动词法分析器: 字符类查表 + 整数状态编号 + 扁平转移数组"""
+
+    def __init__(self, dfa: DFA, config: dict):
+        lexer = Lexer(dfa, config)
+        # 字符类编号: charCat 中的类别按顺序编号, 最后一个为 other
+        self.classes = list(lexer.charCat.keys()) + ["other"]
+        other = len(self.classes) - 1
+        ascii_map = [other] * 128
+        unicode_map = {}
+        for cid, cat in enumerate(self.classes[:-1]):
+            for char in lexer.charCat[cat]:
+                # 与 Lexer.next_word 一致: 取第一个包含该字符的类别
+                if ord(char) < 128:
+                    if ascii_map[ord(char)] == other:
+                        ascii_map[ord(char)] = cid
+                else:
+                    unicode_map.setdefault(char, cid)
+        self.ascii_map = ascii_map
+        self.unicode_map = unicode_map
+        self.other = other
+
+        # 状态编号: 起始状态为 0, 其余按 S 中顺序编号
+        self.states = [lexer.s0] + [s for s in lexer.S if s != lexer.s0]
+        state_id = {s: i for i, s in enumerate(self.states)}
+        ncls = len(self.classes)
+        trans = [-1] * (len(self.states) * ncls)
+        class_id = {cat: i for i, cat in enumerate(self.classes)}
+        for s, items in lexer.delta.items():
+            for c, t in items.items():
+                if s in state_id and c in class_id and t in state_id:
+                    trans[state_id[s] * ncls + class_id[c]] = state_id[t]
+        self.ncls = ncls
+        self.trans = trans
+        self.accept = [s in lexer.A for s in self.states]
+        self.kind = [lexer.Type.get(s) if s in lexer.A else None for s in self.states]
+        self.keyword = frozenset(lexer.keyword)
+
+    def tokens(self, input_string: str):
+        """逐个产生 (type, word), 包含空白符号, 遇到词法错误时停止"""
+        return self.stream((input_string,))
+
+    def stream(self, chunks):
+        """从文本块序列中惰性产生 (type, word), 包含空白符号
+
+        只扫描当前块, 下标相对于当前块; 未完成单词在之前各块中的部分保存在 pending 中 (对应负下标),
+        只在产生跨块的单词或回退到之前的块时拼接一次, 跨 k 块的单词代价与其长度成正比
+        """
+        ascii_map, unicode_map, other = self.ascii_map, self.unicode_map, self.other
+        trans, ncls, accept, kind, keyword = self.trans, self.ncls, self.accept, self.kind, self.keyword
+        chunks = iter(chunks)
+        buffer = ""
+        pending = []
+        n = pos = 0
+        state, i, last, last_state = 0, 0, 0, -1
+        final = False
+        while not final:
+            chunk = next(chunks, None)
+            if chunk is None:
+                final = True
+            else:
+                # 当前块中未完成的部分移入 pending, 下标按新块平移
+                if pos < 0:
+                    pending.append(buffer)
+                elif pos < n:
+                    pending = [buffer[pos:]]
+                else:
+                    pending = []
+                i -= n
+                pos -= n
+                last -= n
+                buffer = chunk
+                n = len(buffer)
+            while pos < n:
+                while True:
+                    if accept[state]:
+                        last, last_state = i, state
+                    if i >= n:
+                        break
+                    o = ord(buffer[i])
+                    c = ascii_map[o] if o < 128 else unicode_map.get(buffer[i], other)
+                    state = trans[state * ncls + c]
+                    if state < 0:
+                        break
+                    i += 1
+                if state >= 0 and not final:
+                    # 扫描到块末尾且 DFA 仍可继续, 等待下一块
+                    break
+                if last <= pos:
+                    return
+                if pos >= 0:
+                    lexem = buffer[pos:last]
+                else:
+                    prefix = "".join(pending)
+                    k = len(prefix)
+                    lexem = prefix[k + pos : k + last] if last <= 0 else prefix[k + pos :] + buffer[:last]
+                    if last < 0:
+                        # 回退到之前的块: 从 last 起的文本合并为当前块重新扫描
+                        buffer = prefix[k + last :] + buffer
+                        n = len(buffer)
+                        last = 0
+                    pending = []
+                type = kind[last_state]
+                if type is not None and lexem not in keyword:
+                    yield type, lexem
+                else:
+                    yield lexem, lexem
+                pos = last
+                state, i, last_state = 0, pos, -1
+
+    def scan(self, text: str, pos: int = 0):
+        """从下标 pos 开始逐个产生 (type, word, start, reach), 包含空白符号, 遇到词法错误时停止
+
+        reach 为识别该单词时 DFA 读到的最远字符下标 (读到末尾时为 len(text)), 该单词只取决于 text[start : reach + 1]
+        """
+        ascii_map, unicode_map, other = self.ascii_map, self.unicode_map, self.other
+        trans, ncls, accept, kind, keyword = self.trans, self.ncls, self.accept, self.kind, self.keyword
+        n = len(text)
+        while pos < n:
+            state, i, last, last_state = 0, pos, -1, -1
+            while True:
+                if accept[state]:
+                    last, last_state = i, state
+                if i >= n:
+                    break
+                o = ord(text[i])
+                c = ascii_map[o] if o < 128 else unicode_map.get(text[i], other)
+                state = trans[state * ncls + c]
+                if state < 0:
+                    break
+                i += 1
+            if last <= pos:
+                return
+            lexem = text[pos:last]
+            type = kind[last_state]
+            if type is not None and lexem not in keyword:
+                yield type, lexem, pos, i
+            else:
+                yield lexem, lexem, pos, i
+            pos = last
+
+    def get_token(self, input_string: str) -> Token:
+        return Token([token for token in self.tokens(input_string) if token[0] != "whitespace"])
+
+
 if __name__ == "__main__":
     # 使用 DFA 、 charCat分类器 和 状态转移表 构造词法分析器
     dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
@@ -0,0 +1,151 @@
+import functools
+import json
+import time
+from contextlib import nullcontext
+
+# 当前启用的 Profiler; 为 None 时各处的统计代码只做一次 "is not None" 判断
+ACTIVE = None
+
+_NULL = nullcontext()
+
+
+class Phase:
+    """累计一个阶段的调用次数和耗时 (含嵌套的其他阶段)"""
+
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats: list):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats[0] += 1
+        self.stats[1] += time.perf_counter() - self.start
+
+
+class Profiler:
+    """可选的分析统计: 词法分析器、LL / LR 分析过程和自动机、项集族构造的各阶段耗时与计数
+
+    用作上下文管理器, 期间执行的 (所有线程中的) 分析都计入本对象:
+        with Profiler() as prof:
+            G.LR1_analyze(tokens)
+        print(prof.report())
+        prof.save("./output/profile.json")
+    phases: {阶段: [调用次数, 秒]}; counters: {分组: {键: 次数}}, 键为元组时导出为嵌套字典;
+    sizes: {分组: [次数, 总和, 最大值]}, 如每次 closure 得到的项集大小
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.sizes = {}
+        self.prev = None
+
+    def __enter__(self):
+        global ACTIVE
+        self.prev = ACTIVE
+        ACTIVE = self
+        return self
+
+    def __exit__(self, *exc):
+        global ACTIVE
+        ACTIVE = self.prev
+
+    def phase(self, name: str) -> Phase:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = [0, 0.0]
+        return Phase(stats)
+
+    def count(self, group: str, key, n: int = 1):
+        counter = self.counters.get(group)
+        if counter is None:
+            counter = self.counters[group] = {}
+        counter[key] = counter.get(key, 0) + n
+
+    def size(self, group: str, n: int):
+        stats = self.sizes.get(group)
+        if stats is None:
+            self.sizes[group] = [1, n, n]
+        else:
+            stats[0] += 1
+            stats[1] += n
+            if n > stats[2]:
+                stats[2] = n
+
+    def to_dict(self) -> dict:
+        counters = {}
+        for group, counter in self.counters.items():
+            result = counters[group] = {}
+            for key, n in sorted(counter.items(), key=lambda item: -item[1]):
+                if isinstance(key, tuple):
+                    d = result
+                    for k in key[:-1]:
+                        d = d.setdefault(str(k), {})
+                    d[str(key[-1])] = n
+                else:
+                    result[str(key)] = n
+        return {
+            "phases": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self.phases.items()},
+            "counters": counters,
+            "sizes": {group: {"count": c, "total": t, "max": m, "mean": t / c} for group, (c, t, m) in self.sizes.items()},
+        }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def save(self, filename: str):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def report(self, top: int = 10) -> str:
+        """文本摘要: 各阶段耗时, 以及每个计数分组中次数最多的 top 项"""
+        lines = ["phase                              calls    seconds"]
+        for name, (calls, seconds) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<32} {calls:>7} {seconds:>10.4f}")
+        for group, (c, t, m) in self.sizes.items():
+            lines.append(f"{group}: count={c} mean={t / c:.1f} max={m}")
+        for group, counter in self.counters.items():
+            items = sorted(counter.items(), key=lambda item: -item[1])
+            lines.append(f"{group} ({len(items)} keys, total {sum(counter.values())}):")
+            for key, n in items[:top]:
+                lines.append(f"    {n:>9}  {key}")
+        return "\n".join(lines)
+
+
+def phase(name: str):
+    """当前 Profiler 中名为 name 的计时阶段; 未启用时为空的上下文管理器"""
+    return _NULL if ACTIVE is None else ACTIVE.phase(name)
+
+
+def timed(name: str):
+    """装饰器: 启用 Profiler 时把函数的每次调用计入阶段 name, 未启用时只多一次判断"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = ACTIVE
+            if profile is None:
+                return fn(*args, **kwargs)
+            with profile.phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    # 直接运行时本文件是 __main__ 模块, 须通过 import 使用其他模块所引用的同一个 Profiler 模块
+    import Profiler as profiler
+    from Grammar import Grammar
+    from Lexer import Token
+
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    tokens = [("name", "a"), ("+", "+"), ("name", "b"), ("*", "*"), ("name", "c")]
+    with profiler.Profiler() as prof:
+        G.build_CC()
+        G.LR1_analyze(Token(tokens))
+    print(prof.report())
@@ -0,0 +1,293 @@
+import json
+
+from FA import NFA, DFA, EPS
+from Lexer import Lexer
+
+ESCAPE = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "0": "\0"}
+CLASS_ESCAPE = {
+    "d": "0123456789",
+    "w": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_",
+    "s": " \t\n\r\f\v",
+}
+
+
+class RegexParser:
+    """正则表达式 -> 语法树
+
+    节点: ("set", chars, negated) | ("cat", [nodes]) | ("alt", [nodes]) | ("star", node) | ("plus", node) | ("opt", node)
+    支持 | * + ? ( ) . [...] [^...] 以及 \\n \\t \\d \\w \\s 等转义
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+
+    @classmethod
+    def parse(cls, pattern: str):
+        parser = cls(pattern)
+        node = parser.alt()
+        if parser.pos < len(pattern):
+            raise Exception(f"Error: unexpected '{pattern[parser.pos]}' at {parser.pos} in /{pattern}/")
+        return node
+
+    def peek(self):
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def next(self):
+        char = self.peek()
+        if char is None:
+            raise Exception(f"Error: unexpected end of /{self.pattern}/")
+        self.pos += 1
+        return char
+
+    def alt(self):
+        nodes = [self.cat()]
+        while self.peek() == "|":
+            self.pos += 1
+            nodes.append(self.cat())
+        return nodes[0] if len(nodes) == 1 else ("alt", nodes)
+
+    def cat(self):
+        nodes = []
+        while self.peek() not in (None, "|", ")"):
+            nodes.append(self.repeat())
+        return nodes[0] if len(nodes) == 1 else ("cat", nodes)
+
+    def repeat(self):
+        node = self.atom()
+        while self.peek() in ("*", "+", "?"):
+            node = ({"*": "star", "+": "plus", "?": "opt"}[self.next()], node)
+        return node
+
+    def atom(self):
+        char = self.next()
+        if char == "(":
+            node = self.alt()
+            if self.next() != ")":
+                raise Exception(f"Error: missing ')' in /{self.pattern}/")
+            return node
+        if char == "[":
+            return self.char_class()
+        if char == ".":
+            return ("set", frozenset("\n"), True)
+        if char == "\\":
+            chars, negated = self.escape()
+            return ("set", frozenset(chars), negated)
+        if char in "*+?)":
+            raise Exception(f"Error: unexpected '{char}' at {self.pos - 1} in /{self.pattern}/")
+        return ("set", frozenset(char), False)
+
+    def escape(self) -> tuple[str, bool]:
+        char = self.next()
+        if char in CLASS_ESCAPE:
+            return CLASS_ESCAPE[char], False
+        if char.lower() in CLASS_ESCAPE:
+            return CLASS_ESCAPE[char.lower()], True
+        return ESCAPE.get(char, char), False
+
+    def char_class(self):
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        chars = set()
+        first = True
+        while first or self.peek() != "]":
+            first = False
+            char = self.next()
+            if char == "\\":
+                escaped, escaped_negated = self.escape()
+                if escaped_negated:
+                    raise Exception(f"Error: negated escape inside [...] in /{self.pattern}/")
+                if len(escaped) > 1:
+                    chars.update(escaped)
+                    continue
+                char = escaped
+            if self.peek() == "-" and self.pos + 1 < len(self.pattern) and self.pattern[self.pos + 1] != "]":
+                self.pos += 1
+                high = self.next()
+                if high == "\\":
+                    high = self.escape()[0]
+                if ord(high) < ord(char):
+                    raise Exception(f"Error: bad range {char}-{high} in /{self.pattern}/")
+                chars.update(chr(c) for c in range(ord(char), ord(high) + 1))
+            else:
+                chars.add(char)
+        self.pos += 1
+        return ("set", frozenset(chars), negated)
+
+
+def set_nodes(node):
+    """依次产生语法树中的字符集合节点"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node[0] == "set":
+            yield node
+        elif node[0] in ("cat", "alt"):
+            stack.extend(node[1])
+        else:
+            stack.append(node[1])
+
+
+class LexerSpec:
+    """由 (单词类别, 正则表达式) 规则表生成词法分析器
+
+    规则按顺序决定优先级; 类别为 None 的规则以单词本身作为类别 (如运算符)
+    """
+
+    def __init__(self, rules: list[tuple[str, str]], keyword: list[str] = None):
+        self.rules = rules
+        self.keyword = keyword or []
+        self.trees = [RegexParser.parse(pattern) for _, pattern in rules]
+        self.charCat, self.classes = self.partition()
+
+    @classmethod
+    def load(cls, filename: str):
+        with open(filename, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls([tuple(rule) for rule in spec["rules"]], spec.get("keyword", []))
+
+    def partition(self) -> tuple[dict[str, str], dict[frozenset, list[str]]]:
+        """字符类划分: 属于完全相同的字符集合的字符归为一类, 未出现的字符归入 other"""
+        sets = list(dict.fromkeys(node[1] for tree in self.trees for node in set_nodes(tree)))
+        signature = {}
+        for i, s in enumerate(sets):
+            for char in s:
+                signature.setdefault(char, []).append(i)
+        groups = {}
+        for char in sorted(signature):
+            groups.setdefault(tuple(signature[char]), []).append(char)
+        charCat = {}
+        for i, chars in enumerate(groups.values()):
+            name = chars[0] if len(chars) == 1 and chars[0] != EPS else f"c{i}"
+            charCat[name] = "".join(chars)
+        names_of = {char: name for name, chars in charCat.items() for char in chars}
+        classes = {s: sorted({names_of[char] for char in s}) for s in sets}
+        return charCat, classes
+
+    def to_nfa(self) -> tuple[NFA, dict[str, int]]:
+        """Thompson 构造, 各规则的 NFA 由新的起始状态经 ε 边并联; 返回 NFA 和 接受状态 -> 规则编号"""
+        all_classes = list(self.charCat)
+        delta = []
+        n = 0
+
+        def new_state():
+            nonlocal n
+            n += 1
+            return str(n - 1)
+
+        def edges(node, u, v):
+            chars, negated = node[1], node[2]
+            names = self.classes[chars]
+            if negated:
+                names = [c for c in all_classes if c not in names] + ["other"]
+            delta.extend((u, c, v) for c in names)
+
+        def build(node) -> tuple[str, str]:
+            # 显式栈: 任务为 (节点, 入口, 出口), 在入口和出口之间连出节点对应的片段
+            s, t = new_state(), new_state()
+            stack = [(node, s, t)]
+            while stack:
+                node, u, v = stack.pop()
+                kind = node[0]
+                if kind == "set":
+                    edges(node, u, v)
+                elif kind == "cat":
+                    prev = u
+                    for i, child in enumerate(node[1]):
+                        nxt = v if i == len(node[1]) - 1 else new_state()
+                        stack.append((child, prev, nxt))
+                        prev = nxt
+                    if not node[1]:
+                        delta.append((u, EPS, v))
+                elif kind == "alt":
+                    for child in node[1]:
+                        a, b = new_state(), new_state()
+                        delta.extend([(u, EPS, a), (b, EPS, v)])
+                        stack.append((child, a, b))
+                else:
+                    a, b = new_state(), new_state()
+                    delta.extend([(u, EPS, a), (b, EPS, v)])
+                    if kind in ("star", "opt"):
+                        delta.append((u, EPS, v))
+                    if kind in ("star", "plus"):
+                        delta.append((b, EPS, a))
+                    stack.append((node[1], a, b))
+            return s, t
+
+        s0 = new_state()
+        accept = {}
+        for i, tree in enumerate(self.trees):
+            s, t = build(tree)
+            delta.append((s0, EPS, s))
+            accept[t] = i
+        negated = any(node[2] for tree in self.trees for node in set_nodes(tree))
+        sigma = all_classes + (["other"] if negated else [])
+        nfa = NFA([str(i) for i in range(n)], sigma, delta, s0, list(accept))
+        return nfa, accept
+
+    def to_dfa(self) -> tuple[DFA, dict]:
+        """NFA -> 子集构造 -> 按规则区分接受状态的最小化 -> 删除死状态; 返回 DFA 和 Lexer 配置"""
+        nfa, accept = self.to_nfa()
+        dfa, Q, T = nfa.subset_construction()
+        # DFA 状态接受的规则: 子集中编号最小 (优先级最高) 的规则
+        rule = {}
+        for i, q in enumerate(Q):
+            matched = [accept[x] for x in q if x in accept]
+            if matched:
+                rule[str(i)] = min(matched)
+        min_dfa, _ = dfa.minimize(label=rule)
+        rule = {s: rule[s] for s in min_dfa.S if s in rule}
+
+        # 删除不可达和无法到达接受状态的状态, 词法分析器在转移缺失时立即回退
+        forward = {min_dfa.s0}
+        stack = [min_dfa.s0]
+        while stack:
+            u = stack.pop()
+            for targets in min_dfa.G[u].values():
+                for v in targets:
+                    if v not in forward:
+                        forward.add(v)
+                        stack.append(v)
+        pred = {s: [] for s in min_dfa.S}
+        for u, w, v in min_dfa.delta:
+            pred[v].append(u)
+        live = set(min_dfa.A)
+        stack = list(live)
+        while stack:
+            v = stack.pop()
+            for u in pred[v]:
+                if u not in live:
+                    live.add(u)
+                    stack.append(u)
+        keep = [s for s in min_dfa.S if s in forward and s in live]
+        if min_dfa.s0 not in keep:
+            keep.insert(0, min_dfa.s0)
+        keep.sort(key=lambda s: s != min_dfa.s0)
+        name = {s: str(i) for i, s in enumerate(keep)}
+        lexer_dfa = DFA(
+            S=[name[s] for s in keep],
+            sigma=min_dfa.sigma,
+            delta=[(name[u], w, name[v]) for u, w, v in min_dfa.delta if u in name and v in name],
+            s0=name[min_dfa.s0],
+            A=[name[s] for s in keep if s in rule],
+        )
+        config = {
+            "Type": {name[s]: self.rules[r][0] for s, r in rule.items() if s in name and self.rules[r][0] is not None},
+            "charCat": self.charCat,
+            "keyword": self.keyword,
+        }
+        return lexer_dfa, config
+
+    def build(self) -> Lexer:
+        return Lexer(*self.to_dfa())
+
+
+if __name__ == "__main__":
+    spec = LexerSpec.load("./input/Lexer/C_regex.json")
+    dfa, config = spec.to_dfa()
+    print(dfa)
+    print(config)
+    lexer = spec.build()
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        print(lexer.analyze(f.read()).get_token().tokens)
@@ -0,0 +1,114 @@
+import sys
+from array import array
+
+EPS = "ε"
+
+
+class SyntaxTree:
+    """数组存储的语法树, 结点 n 的各属性分别保存在平行数组的第 n 项
+
+    symbol: 符号编号 (names 中的下标, 终结符在前, ε 为 -1); prod: 非终结符结点所用的产生式编号, 其余为 -1;
+    token: 终结符结点对应的单词下标 (单词本身保存在 words 中), 其余为 -1;
+    first_child / next_sibling: 第一个子结点和下一个兄弟结点, 没有时为 -1。
+    roots 为顶层结点: 分析成功时只有根结点; LR 分析出错时为栈中的各子树
+    """
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        self.symbol = array("i")
+        self.prod = array("i")
+        self.token = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.words = []
+        self.roots = []
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    @property
+    def root(self) -> int:
+        return self.roots[0] if self.roots else -1
+
+    def add(self, symbol: int, prod: int = -1, token: int = -1) -> int:
+        self.symbol.append(symbol)
+        self.prod.append(prod)
+        self.token.append(token)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        return len(self.symbol) - 1
+
+    def name(self, n: int) -> str:
+        x = self.symbol[n]
+        return self.names[x] if x >= 0 else EPS
+
+    def word(self, n: int):
+        """终结符结点的单词, 其余结点为 None"""
+        i = self.token[n]
+        return self.words[i] if i >= 0 else None
+
+    def is_leaf(self, n: int) -> bool:
+        return self.prod[n] < 0
+
+    def children(self, n: int):
+        c = self.first_child[n]
+        while c >= 0:
+            yield c
+            c = self.next_sibling[c]
+
+    def preorder(self, n: int = None):
+        """先序遍历, 产生 (结点, 深度); 用显式栈, 树的深度不受递归深度限制"""
+        first_child, next_sibling = self.first_child, self.next_sibling
+        stack = [(r, 0) for r in reversed(self.roots)] if n is None else [(n, 0)]
+        while stack:
+            n, depth = stack.pop()
+            yield n, depth
+            kids = []
+            c = first_child[n]
+            while c >= 0:
+                kids.append((c, depth + 1))
+                c = next_sibling[c]
+            stack.extend(reversed(kids))
+
+    def leaves(self):
+        """从左到右的叶结点"""
+        for n, depth in self.preorder():
+            if self.prod[n] < 0:
+                yield n
+
+    def to_dict(self, n: int = None):
+        """转换为 {A: [子结点]} 与字符串嵌套的旧格式, 供 buildSyntaxTreeDot 使用; 默认转换根结点"""
+        n = self.root if n is None else n
+        if n < 0:
+            return {}
+        first_child, next_sibling, prod = self.first_child, self.next_sibling, self.prod
+        result = {}
+        # 自底向上: 结点按编号逆序处理时子结点不一定已处理, 因此用显式栈后序遍历
+        stack = [(n, False)]
+        while stack:
+            m, done = stack.pop()
+            if prod[m] < 0:
+                result[m] = self.name(m)
+            elif done:
+                kids = []
+                c = first_child[m]
+                while c >= 0:
+                    kids.append(result.pop(c))
+                    c = next_sibling[c]
+                result[m] = {self.name(m): kids}
+            else:
+                stack.append((m, True))
+                c = first_child[m]
+                while c >= 0:
+                    stack.append((c, False))
+                    c = next_sibling[c]
+        return result[n]
+
+    def to_list(self) -> list:
+        """各顶层结点的旧格式, 与 LRTable.parse 返回的语法树相同"""
+        return [self.to_dict(r) for r in self.roots]
+
+    def nbytes(self) -> int:
+        """各数组与单词列表本身占用的字节数 (单词字符串与单词流共享, 不计入)"""
+        arrays = (self.symbol, self.prod, self.token, self.first_child, self.next_sibling)
+        return sum(a.itemsize * len(a) for a in arrays) + sys.getsizeof(self.words)
@@ -0,0 +1,11 @@
+import time
+
+
+def best_of(fn, repeat: int = 3):
+    """重复执行 fn, 返回 (最短耗时, 最后一次结果)"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
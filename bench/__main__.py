@@ -0,0 +1,242 @@
+"""各阶段在合成输入上的规模测试, 结果输出为 JSON, 用于比较不同版本
+
+python -m bench [--quick] [--only 阶段 ...] [--repeat N] [--out results.json] [--compare old.json]
+
+进度表格输出到 stderr; 未指定 --out 时 JSON 输出到 stdout。--compare 与旧结果逐项比较,
+耗时增加超过 --threshold (默认 25%) 的项记为退化, 此时退出码为 1
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from Grammar import Grammar
+from Lexer import Token
+from Regex import LexerSpec
+from bench import best_of
+from bench.earley import AMBIGUOUS_EXPR, ambiguous_tokens
+from bench.gen import (
+    chain_grammar_text,
+    expr_grammar_text,
+    expr_tokens,
+    keyword_nfa,
+    keyword_rules,
+    keyword_text,
+    random_nfa,
+    stmt_grammar_text,
+    stmt_tokens,
+)
+
+# 语句文法的语句种类数, LL1_analyze / LR1_analyze 使用
+STMT_KINDS = 20
+# 比较时低于此耗时的项只作参考, 不判断退化
+NOISE_FLOOR = 0.005
+
+
+def grammar_file(d: str, name: str, text: str) -> str:
+    filename = os.path.join(d, f"{name}.txt")
+    if not os.path.exists(filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(text)
+    return filename
+
+
+@functools.lru_cache(maxsize=None)
+def keyword_lexer(rules: int):
+    spec_rules = keyword_rules(rules)
+    return spec_rules, LexerSpec(spec_rules).build()
+
+
+# 每个阶段: setup(n, d) -> (被测函数, 描述规模的参数); 被测函数每次调用都从头计算, 不使用上一次的缓存
+
+
+def subset(nfa):
+    def run():
+        # eps_closure 的结果缓存在 NFA 上, 每次清除
+        nfa.E = None
+        return nfa.subset_construction()
+
+    return run
+
+
+def subset_random(n: int, d: str):
+    nfa = random_nfa(n)
+    return subset(nfa), {"nfa_states": len(nfa.S), "dfa_states": len(nfa.subset_construction()[0].S)}
+
+
+def subset_keyword(n: int, d: str):
+    nfa = keyword_nfa(n)
+    return subset(nfa), {"nfa_states": len(nfa.S), "dfa_states": len(nfa.subset_construction()[0].S), "keywords": n}
+
+
+def hopcroft1(n: int, d: str):
+    dfa, Q, T = keyword_nfa(n).subset_construction()
+    return dfa.hopcroft1, {"dfa_states": len(dfa.S), "keywords": n}
+
+
+def lexer_get_token(n: int, d: str):
+    rules, lexer = keyword_lexer(200)
+    text = keyword_text(rules, n)
+    return (lambda: lexer.analyze(text).get_token()), {"tokens": n, "chars": len(text), "rules": len(rules)}
+
+
+def first_follow(n: int, d: str):
+    filename = grammar_file(d, f"chain{n}", chain_grammar_text(n))
+
+    def run():
+        G = Grammar.load(filename)
+        return G.firstSet(), G.followSet()
+
+    return run, {"nonterminals": n + 1}
+
+
+def expr_grammar(n: int, d: str) -> tuple[str, dict]:
+    filename = grammar_file(d, f"expr{n}", expr_grammar_text(n))
+    return filename, {"levels": n, "productions": 2 * n + 4}
+
+
+def stmt_grammar(n: int, d: str) -> tuple[str, dict]:
+    filename = grammar_file(d, f"stmt{n}", stmt_grammar_text(n))
+    return filename, {"kinds": n, "productions": n + 15}
+
+
+def build_cc(grammar):
+    def setup(n: int, d: str):
+        filename, params = grammar(n, d)
+        return (lambda: Grammar.load(filename).build_CC()), params
+
+    return setup
+
+
+def lr1_table(grammar):
+    def setup(n: int, d: str):
+        filename, params = grammar(n, d)
+        return (lambda: Grammar.load(filename).LR1_table()), params
+
+    return setup
+
+
+def ll1_analyze(n: int, d: str):
+    G = Grammar.load(stmt_grammar(STMT_KINDS, d)[0])
+    G.LL1_table()
+    tokens = stmt_tokens(n, STMT_KINDS)
+    return (lambda: G.LL1_analyze(Token(tokens))), {"tokens": len(tokens)}
+
+
+def lr1_analyze(n: int, d: str):
+    G = Grammar.load(stmt_grammar(STMT_KINDS, d)[0])
+    G.LR1_table()
+    tokens = stmt_tokens(n, STMT_KINDS)
+    return (lambda: G.LR1_analyze(Token(tokens))), {"tokens": len(tokens)}
+
+
+def lr1_analyze_expr(n: int, d: str):
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    G.LR1_table()
+    tokens = expr_tokens(n)
+    return (lambda: G.LR1_analyze(Token(tokens))), {"tokens": len(tokens)}
+
+
+def earley_expr(n: int, d: str):
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    tokens = expr_tokens(n)
+    return (lambda: G.Earley_parse(Token(tokens))), {"tokens": len(tokens)}
+
+
+def earley_ambiguous(n: int, d: str):
+    tokens = ambiguous_tokens(n)
+    return (lambda: AMBIGUOUS_EXPR.Earley_parse(Token(tokens))), {"tokens": len(tokens), "operators": n}
+
+
+# (阶段, 输入, setup, 规模, --quick 时的规模)
+STAGES = [
+    ("subset_construction", "random_nfa", subset_random, [2000, 8000, 32000], [1000]),
+    ("subset_construction", "keyword_nfa", subset_keyword, [250, 1000, 4000], [100]),
+    ("hopcroft1", "keyword_nfa", hopcroft1, [50, 100, 200], [25]),
+    ("Lexer.get_token", "keyword_rules", lexer_get_token, [2000, 8000, 32000], [500]),
+    ("firstSet/followSet", "chain_grammar", first_follow, [500, 2000, 8000], [200]),
+    ("build_CC", "expr_grammar", build_cc(expr_grammar), [5, 10, 20], [5]),
+    ("build_CC", "stmt_grammar", build_cc(stmt_grammar), [20, 80, 320], [10]),
+    ("LR1_table", "expr_grammar", lr1_table(expr_grammar), [5, 10, 20], [5]),
+    ("LR1_table", "stmt_grammar", lr1_table(stmt_grammar), [20, 80, 320], [10]),
+    ("LL1_analyze", "stmt_tokens", ll1_analyze, [500, 1000, 2000], [200]),
+    ("LR1_analyze", "stmt_tokens", lr1_analyze, [500, 1000, 2000], [200]),
+    ("LR1_analyze", "expr_tokens", lr1_analyze_expr, [500, 1000, 2000], [200]),
+    ("Earley_parse", "expr_tokens", earley_expr, [500, 1000, 2000], [200]),
+    ("Earley_parse", "ambiguous_expr", earley_ambiguous, [20, 40, 80], [10]),
+]
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run(only: list[str] = None, quick: bool = False, repeat: int = 3) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        for stage, input_name, setup, sizes, quick_sizes in STAGES:
+            if only and stage not in only:
+                continue
+            for n in quick_sizes if quick else sizes:
+                fn, params = setup(n, d)
+                seconds, _ = best_of(fn, repeat)
+                results.append({"stage": stage, "input": input_name, "n": n, "seconds": seconds, **params})
+                detail = " ".join(f"{k}={v}" for k, v in params.items())
+                print(f"{stage:<20} {input_name:<14} n={n:<6} {seconds:9.4f}s  {detail}", file=sys.stderr)
+    return {"meta": metadata(), "results": results}
+
+
+def compare(new: dict, old: dict, threshold: float) -> list[dict]:
+    """逐项比较两次结果, 返回退化的项"""
+    before = {(r["stage"], r["input"], r["n"]): r["seconds"] for r in old["results"]}
+    regressions = []
+    print(f"\ncompare with {old['meta'].get('commit')} ({old['meta'].get('time')}):", file=sys.stderr)
+    for r in new["results"]:
+        key = (r["stage"], r["input"], r["n"])
+        if key not in before:
+            continue
+        ratio = r["seconds"] / before[key] if before[key] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold and r["seconds"] >= NOISE_FLOOR:
+            flag = "  REGRESSION"
+            regressions.append({**r, "before": before[key], "ratio": ratio})
+        print(f"{key[0]:<20} {key[1]:<14} n={key[2]:<6} {before[key]:9.4f}s -> {r['seconds']:9.4f}s  x{ratio:5.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m bench", description="各阶段在合成输入上的规模测试")
+    parser.add_argument("--quick", action="store_true", help="每个阶段只测一个小规模")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help=f"只测这些阶段: {', '.join(dict.fromkeys(s[0] for s in STAGES))}")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数, 取最短耗时")
+    parser.add_argument("--out", help="JSON 结果写入的文件 (默认输出到 stdout)")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="与之前保存的结果比较")
+    parser.add_argument("--threshold", type=float, default=0.25, help="判断退化的耗时增长比例")
+    args = parser.parse_args()
+
+    result = run(args.only, args.quick, args.repeat)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.threshold)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if result.get("regressions"):
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""批量分析的多进程扩展性: python -m bench.batch [最大进程数] [输入个数]"""
+import json
+import os
+import sys
+import tempfile
+
+from Batch import BatchParser
+from FA import DFA
+from Grammar import Grammar
+from Lexer import Lexer
+from bench import best_of
+from bench.gen import expr_tokens
+
+
+def check_files(batch: BatchParser, texts: list[str]):
+    """files=True 时无法读取的文件只使该输入未被接受, 同一批中其他文件照常得到结果"""
+    with tempfile.TemporaryDirectory() as d:
+        paths = []
+        for i, text in enumerate(texts):
+            paths.append(os.path.join(d, f"{i}.txt"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+        paths.insert(1, os.path.join(d, "missing.txt"))
+        expected = batch.run_all(texts, workers=1)
+        results = batch.run_all(paths, workers=2, files=True)
+        assert results[:1] + results[2:] == expected
+        assert results[1][:2] == ([], False) and results[1][2].startswith("cannot read")
+
+
+def snippets(count: int, size: int = 200) -> list[str]:
+    """count 个约 size 个单词的表达式源码, 每 10 个中有一个语法错误"""
+    texts = []
+    for i in range(count):
+        text = " ".join(word for type, word in expr_tokens(size, seed=i))
+        texts.append(text + " +" if i % 10 == 9 else text)
+    return texts
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
+    with open("./input/Lexer/Expr_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    batch = BatchParser.build(Lexer(dfa, config), Grammar.load("./input/Grammar/Expr_G.txt"))
+    texts = snippets(count)
+    check_files(batch, texts[:20])
+    size = sum(map(len, texts)) / 1024 / 1024
+    print(f"{count} inputs, {size:.2f} MB, cpu_count={os.cpu_count()}")
+
+    t1, expected = best_of(lambda: batch.run_all(texts, workers=1), repeat=1)
+    assert sum(ok for tokens, ok, msg in expected) == count - count // 10
+    print(f"  workers= 1  {t1:.3f}s  {count / t1:8.0f} inputs/s")
+    workers = 2
+    while workers <= max(max_workers, 2):
+        t, results = best_of(lambda: batch.run_all(texts, workers=workers), repeat=1)
+        assert results == expected, "多进程结果与单进程不一致"
+        print(f"  workers={workers:>2}  {t:.3f}s  {count / t:8.0f} inputs/s  ({t1 / t:.2f}x)")
+        workers *= 2
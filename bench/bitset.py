@@ -0,0 +1,34 @@
+"""位集表示与 FA 类对比: python -m bench.bitset"""
+import tracemalloc
+
+from FA import BitFA
+from bench import best_of
+from bench.gen import keyword_nfa
+
+
+def measure(fn):
+    """返回 (耗时, 结果对象分配的内存)"""
+    t, _ = best_of(fn)
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return t, size, result
+
+
+if __name__ == "__main__":
+    for n_words in [500, 2000, 4000]:
+        nfa = keyword_nfa(n_words)
+        _, m_nfa, _ = measure(lambda: keyword_nfa(n_words))
+        _, m_bit, bit = measure(lambda: BitFA.from_fa(nfa))
+        t1, m1, (dfa, Q, T) = measure(nfa.subset_construction)
+        t2, m2, bit_dfa = measure(bit.subset_construction)
+        assert sorted(bit_dfa.to_fa().delta) == sorted(dfa.delta)
+        print(f"NFA |S|={len(nfa.S)}  DFA |S|={len(dfa.S)}")
+        print(f"  memory  NFA {m_nfa / 1024:>8.0f} KiB  BitFA {m_bit / 1024:>8.0f} KiB")
+        print(f"  subset  NFA {t1:>8.3f}s {m1 / 1024:>6.0f} KiB  BitFA {t2:>8.3f}s {m2 / 1024:>6.0f} KiB")
+        if len(dfa.S) <= 1500:
+            t3, _, (min_dfa, PI) = measure(dfa.hopcroft1)
+            print(f"  hopcroft1 {t3:>8.3f}s")
+        t4, _, bit_min = measure(bit_dfa.minimize)
+        print(f"  BitFA.minimize {t4:>8.3f}s  |S|={len(bit_min.names)}")
@@ -0,0 +1,28 @@
+"""LR(1) 规范项集族: python -m bench.build_cc"""
+import glob
+import os
+import tempfile
+
+from Grammar import Grammar
+from bench import best_of
+from bench.gen import expr_grammar_text
+
+
+def fresh(G: Grammar):
+    G.CC, G.CC_dict = None, None
+    return G.build_CC()
+
+
+if __name__ == "__main__":
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        t, (CC, CC_dict) = best_of(lambda: fresh(G), repeat=1)
+        print(f"{os.path.basename(filename):>16}  |CC|={len(CC):>5}  {t:.3f}s")
+    with tempfile.TemporaryDirectory() as d:
+        for levels in [5, 10, 20, 40]:
+            filename = os.path.join(d, f"expr{levels}.txt")
+            with open(filename, "w") as f:
+                f.write(expr_grammar_text(levels))
+            G = Grammar.load(filename)
+            t, (CC, CC_dict) = best_of(lambda: fresh(G), repeat=1)
+            print(f"{'expr' + str(levels):>16}  |CC|={len(CC):>5}  {t:.3f}s")
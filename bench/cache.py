@@ -0,0 +1,20 @@
+"""编译结果缓存: 冷启动构造与命中缓存的加载时间, python -m bench.cache"""
+import tempfile
+
+from Cache import Cache
+from bench import best_of
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        cache = Cache(directory)
+        jobs = [
+            ("min_dfa test1_FA", lambda: cache.load_min_dfa("./input/FA/test1_FA.txt")),
+            ("lexer C", lambda: cache.load_lexer("./input/Lexer/C_DFA.txt", "./input/Lexer/C_config.json")),
+            ("grammar Expr", lambda: cache.load_grammar("./input/Grammar/Expr_G.txt")),
+            ("grammar C", lambda: cache.load_grammar("./input/Grammar/C_G.txt")),
+        ]
+        for name, load in jobs:
+            cold, _ = best_of(load, repeat=1)
+            warm, _ = best_of(load, repeat=5)
+            print(f"{name:>18}  build {cold * 1000:>9.1f}ms  cached {warm * 1000:>7.1f}ms")
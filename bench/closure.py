@@ -0,0 +1,16 @@
+"""ε 闭包: python -m bench.closure"""
+from bench import best_of
+from bench.gen import eps_chain_nfa, random_nfa
+
+
+if __name__ == "__main__":
+    for name, make in [
+        ("eps ring", lambda n: eps_chain_nfa(n)),
+        ("eps chain", lambda n: eps_chain_nfa(n // 50, cycle=False)),
+        ("random", lambda n: random_nfa(n, out_degree=2, eps_ratio=0.5)),
+    ]:
+        for n in [10000, 100000, 200000]:
+            nfa = make(n)
+            # 每次计时前清除缓存
+            t, E = best_of(lambda: (setattr(nfa, "E", None), nfa.eps_closure())[1])
+            print(f"{name:>10} |S|={len(nfa.S):>7}  {t:.3f}s  distinct closures={len({id(x) for x in E.values()})}")
@@ -0,0 +1,175 @@
+"""生成的词法 / 语法分析器模块: 与解释执行的 Lexer、LL1_analyze、LR1_analyze 比较结果并测速
+
+python -m bench.codegen
+"""
+import glob
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from CodeGen import lexer_module, ll1_module, lr_module, load_module
+from Grammar import Grammar
+from LLTable import LLTable
+from LRTable import LRTable
+from Lexer import Token
+from bench import best_of
+from bench.gen import expr_tokens, sentence, mutate
+from bench.lexer import load_c_lexer
+
+
+def standalone(source: str, name: str):
+    """在仓库之外的空目录中导入生成的模块, 确认不依赖本项目的模块和 pandas / graphviz"""
+    with tempfile.TemporaryDirectory() as d:
+        with open(os.path.join(d, name + ".py"), "w", encoding="utf-8") as f:
+            f.write(source)
+        code = (
+            f"import sys; sys.path.insert(0, '.'); import {name}; "
+            "bad = {'FA', 'Lexer', 'Grammar', 'LRTable', 'LLTable', 'pandas', 'graphviz'} & set(sys.modules); "
+            "sys.exit(1 if bad else 0)"
+        )
+        subprocess.run([sys.executable, "-I", "-c", code], cwd=d, check=True)
+
+
+def check_lexer():
+    lexer = load_c_lexer()
+    compiled = lexer.compile()
+    source = lexer_module(compiled)
+    standalone(source, "c_lexer")
+    generated = load_module(source)
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        text = f.read()
+    rng = random.Random(0)
+    samples = [text] + ["".join(rng.choice(text + "#@é\t") for _ in range(200)) for _ in range(200)]
+    for sample in samples:
+        assert generated.get_token(sample) == lexer.analyze(sample).get_token().tokens, "生成的词法分析器与 Lexer 不一致"
+
+    text = (text + "\n") * 200
+    t1, tokens = best_of(lambda: lexer.analyze(text).get_token().tokens, repeat=1)
+    t2, _ = best_of(lambda: compiled.get_token(text))
+    t3, result = best_of(lambda: generated.get_token(text))
+    assert result == tokens
+    size = len(text) / 1024 / 1024
+    print(f"lexer ({len(tokens)} tokens, {len(samples)} samples identical):")
+    print(f"  Lexer          {size / t1:7.2f} MB/s")
+    print(f"  CompiledLexer  {size / t2:7.2f} MB/s")
+    print(f"  generated      {size / t3:7.2f} MB/s  ({t2 / t3:.1f}x CompiledLexer)")
+
+
+def samples(G: Grammar, rng: random.Random, count: int = 100) -> list[list[tuple[str, str]]]:
+    result = []
+    for _ in range(count):
+        types = sentence(G, rng)
+        if rng.random() < 0.5:
+            types = mutate(types, G.T, rng)
+        result.append([(t, t) for t in types])
+    return result
+
+
+def preorder(tree) -> list:
+    """语法树的先序标记序列, 用显式栈遍历, 用于比较很深的语法树 (== 会超出递归深度)"""
+    result = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, kids in node.items():
+                result.append((key, len(kids)))
+                stack.extend(reversed(kids))
+        else:
+            result.append(node)
+    return result
+
+
+def nested_tokens(depth: int) -> list[tuple[str, str]]:
+    """( ( ... ( x ) ... ) ): 非尾递归的嵌套, 递归下降的调用深度与 depth 成正比"""
+    return [("(", "(")] * depth + [("name", "x")] + [(")", ")")] * depth
+
+
+def check_ll1_deep():
+    """嵌套深度超出递归深度时, 生成的分析器与 LL1_parse 的结果仍然相同"""
+    G = Grammar.load("./input/Grammar/Expr_LL1_G.txt")
+    parser = load_module(ll1_module(G))
+    for depth in [10, 340, 3000]:
+        tokens = nested_tokens(depth)
+        for sample in [tokens, tokens[:-1], tokens[: depth + 1] + [("+", "+")] + tokens[depth + 1 :]]:
+            tree, msg = parser.parse(sample)
+            ref_tree, ref_msg = G.LL1_parse(Token(sample))
+            assert msg == ref_msg, (depth, msg, ref_msg)
+            if msg == "success":
+                assert preorder(tree) == preorder(ref_tree), depth
+    print("LL(1) recursive descent: nesting depth up to 3000 identical to LL1_parse")
+
+
+def check_ll1():
+    count = 0
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        if not G.isLL1()[0]:
+            continue
+        source = ll1_module(G)
+        parser = load_module(source)
+        table = LLTable.build(G)
+        for tokens in samples(G, random.Random(filename)):
+            tree, msg = parser.parse(tokens)
+            dot, processList, analyze_msg = G.LL1_analyze(Token(tokens))
+            assert (msg == "success") == (analyze_msg == "success"), filename
+            if msg == "success":
+                assert G.buildSyntaxTreeDot(tree).source == dot.source, filename
+            ref_tree, ref_msg = table.parse(Token(tokens))
+            assert msg == ref_msg and (msg != "success" or tree == ref_tree), filename
+            count += 1
+    standalone(source, "ll1_parser")
+
+    G = Grammar.load("./input/Grammar/Expr_LL1_G.txt")
+    parser = load_module(ll1_module(G))
+    tokens = expr_tokens(100000)
+    t1, (tree1, msg1) = best_of(lambda: G.LL1_parse(Token(tokens)))
+    t2, (tree2, msg2) = best_of(lambda: parser.parse(tokens))
+    # 右递归的语法树深度与输入长度相当, 逐结点比较会超出递归深度, 大输入只比较分析结果
+    assert msg1 == msg2 == "success"
+    print(f"LL(1) recursive descent ({count} inputs identical to LL1_analyze / LL1_parse):")
+    print(f"  {len(tokens)} tokens  LL1_parse {t1:.3f}s  generated {t2:.3f}s  ({t1 / t2:.1f}x)")
+
+
+def check_lr():
+    count = 0
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        try:
+            G.LR1_table()
+        except Exception:
+            continue
+        source = lr_module(G)
+        parser = load_module(source)
+        table = LRTable.build(G)
+        for tokens in samples(G, random.Random(filename)):
+            result, msg = parser.parse(tokens)
+            dot, processList, analyze_msg = G.LR1_analyze(Token(tokens))
+            assert (msg == "success") == (analyze_msg == "success"), filename
+            if msg == "success":
+                assert G.buildSyntaxTreeDot(result).source == dot.source, filename
+            assert (result, msg) == table.parse(Token(tokens)), filename
+            count += 1
+    standalone(source, "lr_parser")
+
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    parser = load_module(lr_module(G))
+    tokens = expr_tokens(100000)
+    small = expr_tokens(2000)
+    t1, (dot, _, msg1) = best_of(lambda: G.LR1_analyze(Token(small)), repeat=1)
+    t2, (tree2, msg2) = best_of(lambda: G.LR1_parse(Token(tokens)))
+    t3, (tree3, msg3) = best_of(lambda: parser.parse(tokens))
+    assert msg1 == msg2 == msg3 == "success"
+    print(f"LR(1) ({count} inputs identical to LR1_analyze / LRTable.parse):")
+    print(f"  LR1_analyze {t1 / len(small) * 1e6:7.2f} us/token")
+    print(f"  LR1_parse   {t2 / len(tokens) * 1e6:7.2f} us/token")
+    print(f"  generated   {t3 / len(tokens) * 1e6:7.2f} us/token  ({t2 / t3:.1f}x LR1_parse, {t1 / len(small) / (t3 / len(tokens)):.0f}x LR1_analyze)")
+
+
+if __name__ == "__main__":
+    check_lexer()
+    check_ll1()
+    check_ll1_deep()
+    check_lr()
@@ -0,0 +1,129 @@
+"""迭代、流式的 DOT 导出 (DotWriter) 与原递归实现的对比: python -m bench.dot"""
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from graphviz import Digraph
+
+from DotWriter import write_fa, write_syntax_tree
+from FA import DFA
+from Grammar import Grammar
+from LRTable import LRTable
+from Lexer import Token
+from bench.gen import sentence
+
+
+def recursive_dot(syntaxTree):
+    """原 Grammar.buildSyntaxTreeDot 的递归实现, 作为对照"""
+    dot = Digraph()
+    idx = 0
+
+    def dfs(node, fa):
+        nonlocal idx
+        if isinstance(node, str):
+            cur = idx
+            idx += 1
+            dot.node(str(cur), node, shape="doublecircle")
+            if fa is not None:
+                dot.edge(str(fa), str(cur))
+        elif isinstance(node, list):
+            for value in node:
+                dfs(value, fa)
+        else:
+            for key, value in node.items():
+                son = idx
+                idx += 1
+                dot.node(str(son), key, shape="circle")
+                if fa is not None:
+                    dot.edge(str(fa), str(son))
+                dfs(value, son)
+
+    dfs(syntaxTree, None)
+    return dot
+
+
+def check():
+    """随机句子的语法树 (嵌套格式和 SyntaxTree) 与自动机, 导出的 DOT 文本与原实现相同"""
+    count = 0
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        try:
+            table = LRTable.build(G)
+        except Exception:
+            continue
+        rng = random.Random(filename)
+        for _ in range(100):
+            tokens = [(t, t) for t in sentence(G, rng)]
+            tree, msg = table.parse(Token(tokens))
+            arena, _ = table.parse_tree(Token(tokens))
+            expected = recursive_dot(tree).source
+            assert G.buildSyntaxTreeDot(tree).source == expected, filename
+            for t in (tree, arena):
+                out = io.StringIO()
+                write_syntax_tree(out, t)
+                assert out.getvalue() == expected, filename
+            count += 1
+    for filename in sorted(glob.glob("./input/Lexer/*_DFA.txt")):
+        dfa = DFA.load(filename)
+        dot = Digraph("dfa")
+        for u in dfa.S:
+            dot.node(u, u, shape="circle")
+        for u in dfa.A:
+            dot.node(u, u, shape="doublecircle")
+        for u, w, v in dfa.delta:
+            dot.edge(u, v, label=w)
+        out = io.StringIO()
+        write_fa(out, dfa, "dfa")
+        assert out.getvalue() == dot.source, filename
+        count += 1
+    print(f"DotWriter output identical to the recursive Digraph version on {count} trees / automata")
+
+
+def chain_tokens(n: int) -> list[tuple[str, str]]:
+    """x + x + ... + x: Expr_G 中左递归的 Expr 链, 语法树深度与单词数成正比"""
+    tokens = [("name", "x")]
+    for _ in range(n):
+        tokens += [("+", "+"), ("name", "x")]
+    return tokens
+
+
+def export(tree, **kwargs):
+    """写入 os.devnull, 返回 (结点数, 耗时, tracemalloc 峰值); 耗时不开启 tracemalloc 单独测量"""
+    start = time.perf_counter()
+    nodes = write_syntax_tree(os.devnull, tree, **kwargs)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    write_syntax_tree(os.devnull, tree, **kwargs)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nodes, elapsed, peak
+
+
+if __name__ == "__main__":
+    check()
+    table = LRTable.build(Grammar.load("./input/Grammar/Expr_G.txt"))
+    tokens = chain_tokens(200000)
+    tree, msg = table.parse(Token(tokens))
+    arena, _ = table.parse_tree(Token(tokens))
+    assert msg == "success"
+    print(f"x + x + ... ({len(tokens)} tokens, depth ~{len(tokens) // 2}), recursion limit {sys.getrecursionlimit()}")
+    try:
+        recursive_dot(tree)
+        print("  recursive buildSyntaxTreeDot: ok")
+    except RecursionError:
+        print("  recursive buildSyntaxTreeDot: RecursionError")
+    start = time.perf_counter()
+    dot = Grammar.load("./input/Grammar/Expr_G.txt").buildSyntaxTreeDot(arena)
+    print(f"  iterative buildSyntaxTreeDot (in-memory Digraph): {len(dot.body)} lines {time.perf_counter() - start:.2f}s")
+    del dot
+    for name, t in [("dict/list", tree), ("SyntaxTree", arena)]:
+        nodes, elapsed, peak = export(t)
+        print(f"  write_syntax_tree {name:10}: {nodes} nodes {elapsed:.2f}s, peak {peak / 1024 / 1024:.2f} MB")
+    for kwargs in [{"max_depth": 50}, {"max_nodes": 10000}]:
+        nodes, elapsed, peak = export(arena, **kwargs)
+        print(f"  write_syntax_tree {json.dumps(kwargs)}: {nodes} nodes {elapsed:.2f}s, peak {peak / 1024 / 1024:.2f} MB")
@@ -0,0 +1,134 @@
+"""Earley 分析 (Grammar.Earley_parse): 与 LR / LL 分析结果的一致性, 歧义文法的森林规模, 与 LR 分析的耗时对比
+
+python -m bench.earley
+"""
+import glob
+import os
+import random
+import re
+import tempfile
+
+from Earley import EarleyParser
+from Grammar import Grammar
+from Lexer import Token
+from LRTable import LRTable
+from bench import best_of
+from bench.gen import expr_tokens, mutate, sentence, stmt_grammar_text, stmt_tokens
+
+# 无优先级的表达式文法, n 个运算符的句子有 Catalan(n) 棵语法树
+AMBIGUOUS_EXPR = Grammar(["+", "*", "(", ")", "id"], ["E"], "E", [
+    ("E", ["E", "+", "E"]),
+    ("E", ["E", "*", "E"]),
+    ("E", ["(", "E", ")"]),
+    ("E", ["id"]),
+])
+
+# 右递归: 没有 Leo 优化时每个单词都要沿整条链补全, 耗时为平方
+RIGHT_RECURSIVE = Grammar(["a"], ["S", "L"], "S", [("S", ["L"]), ("L", ["a", "L"]), ("L", ["a"])])
+
+
+def error_pos(msg: str) -> int:
+    return int(re.search(r"at token (\d+)", msg).group(1))
+
+
+def lr_parse(table: LRTable, tokens: list) -> tuple:
+    # LR 分析的语法树为 [根], 与 LL1_parse 一致起见取出根
+    tree, msg = table.parse(Token(tokens))
+    return (tree[0] if msg == "success" else tree), msg
+
+
+def check(samples: int = 200):
+    """随机句子及其变异: 是否接受、出错位置和语法树与 LR1_parse (LR(1) 文法) 或 LL1_parse (LL(1) 文法) 相同
+
+    LR 分析表对 ε 产生式的处理有误, 含 ε 的文法只与 LL(1) 分析比较; If_G 也不是 LL(1) 文法, 只在 Earley 分析中使用
+    """
+    count = 0
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        if any(beta == ["ε"] for A, beta in G.P):
+            if not G.isLL1()[0]:
+                continue
+            parse = lambda tokens: G.LL1_parse(Token(tokens))
+        else:
+            if sum(A == G.S for A, beta in G.P) > 1:
+                # LR 分析把第一个产生式当作拓广文法的开始产生式, 开始符号有多个产生式时 (如 If_G) 只接受其中一个
+                continue
+            try:
+                table = LRTable.build(G)
+            except Exception:
+                continue
+            parse = lambda tokens, table=table: lr_parse(table, tokens)
+        rng = random.Random(filename)
+        for _ in range(samples):
+            s = sentence(G, rng)
+            for words in (s, mutate(s, G.T, rng)):
+                tokens = [(t, t) for t in words]
+                tree, msg = parse(tokens)
+                forest, earley_msg = G.Earley_parse(Token(tokens))
+                assert (msg == "success") == (forest is not None), (filename, words, msg, earley_msg)
+                if forest is None:
+                    assert error_pos(msg) == error_pos(earley_msg), (filename, words, msg, earley_msg)
+                else:
+                    assert forest.count() == 1 and tree == forest.tree(), (filename, words)
+                count += 1
+    print(f"Earley_parse agrees with LR1_parse / LL1_parse on {count} inputs")
+
+
+def catalan(n: int) -> int:
+    c = 1
+    for i in range(n):
+        c = c * 2 * (2 * i + 1) // (i + 2)
+    return c
+
+
+def ambiguous_tokens(n: int) -> list[tuple[str, str]]:
+    tokens = [("id", "x0")]
+    for i in range(n):
+        tokens += [("+*"[i % 2], "+*"[i % 2]), ("id", f"x{i + 1}")]
+    return tokens
+
+
+if __name__ == "__main__":
+    check()
+
+    parser = EarleyParser(AMBIGUOUS_EXPR)
+    print("ambiguous E -> E + E | E * E | ( E ) | id:")
+    for n in [5, 10, 20, 40, 80]:
+        tokens = ambiguous_tokens(n)
+        t, (forest, msg) = best_of(lambda: parser.parse(Token(tokens)), repeat=1)
+        trees = forest.count()
+        assert trees == catalan(n)
+        print(f"  {n:>3} operators  {t:7.3f}s  {forest.node_count():>6} forest nodes  {trees:.3e} trees")
+    dangling = "if e then if e then a else a".split()
+    D = Grammar(["if", "then", "else", "e", "a"], ["S"], "S",
+                [("S", ["if", "e", "then", "S"]), ("S", ["if", "e", "then", "S", "else", "S"]), ("S", ["a"])])
+    forest, msg = D.Earley_parse(Token([(t, t) for t in dangling]))
+    assert forest.count() == 2 and len(list(forest.trees())) == 2
+
+    print("right recursion L -> a L | a:")
+    for leo in (True, False):
+        parser = EarleyParser(RIGHT_RECURSIVE, leo)
+        for n in [500, 1000, 2000] + ([4000, 8000] if leo else []):
+            t, (forest, msg) = best_of(lambda: parser.parse(Token([("a", "a")] * n)), repeat=1)
+            assert forest.count() == 1
+            print(f"  leo={leo!s:5} {n:>5} tokens  {t:7.3f}s  {t / n * 1e6:8.2f} us/token")
+
+    with tempfile.TemporaryDirectory() as d:
+        filename = os.path.join(d, "stmt20.txt")
+        with open(filename, "w") as f:
+            f.write(stmt_grammar_text(20))
+        inputs = [
+            ("Expr_G", Grammar.load("./input/Grammar/Expr_G.txt"), expr_tokens),
+            ("stmt_grammar", Grammar.load(filename), lambda n: stmt_tokens(n, 20)),
+        ]
+        for name, G, gen in inputs:
+            G.LR1_table()
+            print(f"{name} (LR(1)):")
+            for n in [1000, 2000, 4000]:
+                tokens = gen(n)
+                t1, (dot, processList, msg) = best_of(lambda: G.LR1_analyze(Token(tokens)), repeat=1)
+                t2, (tree, msg) = best_of(lambda: G.LR1_parse(Token(tokens)))
+                t3, (forest, msg) = best_of(lambda: G.Earley_parse(Token(tokens)))
+                assert [forest.tree()] == tree
+                print(f"  {len(tokens):>5} tokens  LR1_analyze {t1:6.3f}s  LR1_parse {t2:6.3f}s  "
+                      f"Earley_parse {t3:6.3f}s ({t3 / len(tokens) * 1e6:.1f} us/token)")
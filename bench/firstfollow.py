@@ -0,0 +1,22 @@
+"""FIRST / FOLLOW / SELECT 集合: python -m bench.firstfollow"""
+import os
+import tempfile
+
+from Grammar import Grammar
+from bench import best_of
+from bench.gen import chain_grammar_text
+
+
+def sets(filename: str):
+    G = Grammar.load(filename)
+    return G.firstSet(), G.followSet(), G.selectSet()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        for n in [500, 1000, 2000, 4000, 8000]:
+            filename = os.path.join(d, f"chain{n}.txt")
+            with open(filename, "w") as f:
+                f.write(chain_grammar_text(n))
+            t, (first, follow, select) = best_of(lambda: sets(filename))
+            print(f"|NT|={n + 1:>5}  |P|={len(select):>6}  {t:.3f}s")
@@ -0,0 +1,226 @@
+"""合成输入生成器"""
+import random
+
+from FA import NFA, EPS
+
+
+def keyword_nfa(n_words: int, length: int = 8, sigma: str = "abcdefgh", seed: int = 0) -> NFA:
+    """n_words 个随机关键字的并: 起始状态经 ε 连向每个关键字的链"""
+    rng = random.Random(seed)
+    S, delta, A = ["s"], [], []
+    for i in range(n_words):
+        word = "".join(rng.choice(sigma) for _ in range(rng.randint(1, length)))
+        prev = f"k{i}_0"
+        S.append(prev)
+        delta.append(("s", EPS, prev))
+        for j, c in enumerate(word, 1):
+            cur = f"k{i}_{j}"
+            S.append(cur)
+            delta.append((prev, c, cur))
+            prev = cur
+        A.append(prev)
+    return NFA(S, list(sigma), delta, "s", A)
+
+
+def random_nfa(n: int, sigma: str = "ab", out_degree: float = 1.2, eps_ratio: float = 0.2, seed: int = 0) -> NFA:
+    """n 个状态的随机 NFA, 每个状态平均 out_degree 条边, 其中 eps_ratio 为 ε 边, 边只连向附近的状态"""
+    rng = random.Random(seed)
+    S = [str(i) for i in range(n)]
+    delta = set()
+    for u in range(n):
+        for _ in range(int(out_degree) + (rng.random() < out_degree % 1)):
+            v = min(n - 1, max(0, u + rng.randint(-3, 8)))
+            w = EPS if rng.random() < eps_ratio else rng.choice(sigma)
+            delta.add((str(u), w, str(v)))
+    A = [str(i) for i in range(n) if rng.random() < 0.05] or [str(n - 1)]
+    return NFA(S, list(sigma), sorted(delta), "0", A)
+
+
+def eps_chain_nfa(n: int, cycle: bool = True) -> NFA:
+    """n 个状态的 ε 链, cycle 为真时末尾有 ε 边连回起点, 整条链成为一个 ε 环"""
+    S = [str(i) for i in range(n)]
+    delta = [(str(i), EPS, str(i + 1)) for i in range(n - 1)]
+    delta += [(str(i), "a", str(i)) for i in range(0, n, 10)]
+    if cycle:
+        delta.append((str(n - 1), EPS, "0"))
+    return NFA(S, ["a"], delta, "0", [str(n - 1)])
+
+
+def keyword_rules(n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """n 条关键字规则加上标识符、数字、字符串、空白规则的词法规格"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))))
+    rules = [(f"kw_{w}", w) for w in sorted(words)]
+    rules += [
+        ("name", "[a-zA-Z_][a-zA-Z0-9_]*"),
+        ("num", "[0-9]+(\\.[0-9]+)?([eE][+\\-]?[0-9]+)?"),
+        ("string", '"([^"\\\\\\n]|\\\\.)*"'),
+        ("whitespace", "[ \\t\\n\\r]+"),
+        (None, "[-+*/%=<>!&|]=?|&&|\\|\\||[()\\[\\]{},;]"),
+    ]
+    return rules
+
+
+def expr_grammar_text(levels: int) -> str:
+    """levels 层优先级的左递归表达式文法, 格式同 input/Grammar/*_G.txt"""
+    T = [f"op{i}" for i in range(levels)] + ["(", ")", "num", "name"]
+    NT = ["Goal"] + [f"E{i}" for i in range(levels + 1)]
+    P = ["Goal -> E0"]
+    for i in range(levels):
+        P += [f"E{i} -> E{i} op{i} E{i + 1}", f"E{i} -> E{i + 1}"]
+    P += [f"E{levels} -> ( E0 )", f"E{levels} -> num", f"E{levels} -> name"]
+    return "\n\n".join([" ".join(T), " ".join(NT), "Goal", "\n".join(P)])
+
+
+def expr_tokens(n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """约 n 个单词的随机算术表达式, 单词类别同 input/Grammar/Expr_G.txt"""
+    rng = random.Random(seed)
+    tokens = []
+    depth = 0
+    while True:
+        if rng.random() < 0.2 and len(tokens) < n:
+            tokens.append(("(", "("))
+            depth += 1
+            continue
+        tokens.append(("num", str(rng.randint(1, 9))) if rng.random() < 0.5 else ("name", "x"))
+        while depth and (rng.random() < 0.3 or len(tokens) >= n):
+            tokens.append((")", ")"))
+            depth -= 1
+        if len(tokens) >= n and not depth:
+            return tokens
+        op = rng.choice("+-*/")
+        tokens.append((op, op))
+
+
+def chain_grammar_text(n: int) -> str:
+    """n 个非终结符依次引用的文法, FIRST 沿链反向、FOLLOW 沿链正向传播, 每隔几个非终结符可空"""
+    T = [f"t{i}" for i in range(8)]
+    NT = ["Goal"] + [f"N{i}" for i in range(n)]
+    P = ["Goal -> N0"]
+    for i in range(n - 1):
+        P += [f"N{i} -> N{i + 1} t{i % 8}", f"N{i} -> t{(i + 1) % 8} N{i + 1} N{i}"]
+        if i % 5 == 0:
+            P.append(f"N{i} -> eps")
+    P.append(f"N{n - 1} -> t0")
+    return "\n\n".join([" ".join(T), " ".join(NT), "Goal", "\n".join(P)])
+
+
+def sentence(G, rng: random.Random, depth: int = 8) -> list[str]:
+    """由文法 G 随机推导出的句子 (单词类别序列); 深度超过 depth 后总选推导出的句子最短的产生式"""
+    # 各非终结符推导出的最短句子长度, 及达到该长度的产生式
+    shortest = {A: None for A in G.NT}
+    best = {}
+    changed = True
+    while changed:
+        changed = False
+        for A, beta in G.P:
+            symbols = [x for x in beta if x != "ε"]
+            if any(x in shortest and shortest[x] is None for x in symbols):
+                continue
+            n = sum(shortest[x] if x in shortest else 1 for x in symbols)
+            if shortest[A] is None or n < shortest[A]:
+                shortest[A], best[A] = n, beta
+                changed = True
+    productions = {}
+    for A, beta in G.P:
+        productions.setdefault(A, []).append(beta)
+
+    result = []
+    stack = [(G.S, 0)]
+    while stack:
+        x, d = stack.pop()
+        if x == "ε":
+            continue
+        if x not in shortest:
+            result.append(x)
+            continue
+        beta = rng.choice(productions[x]) if d < depth else best[x]
+        stack.extend((y, d + 1) for y in reversed(beta))
+    return result
+
+
+def mutate(tokens: list[str], terminals: list[str], rng: random.Random) -> list[str]:
+    """随机删除、插入或替换一个单词, 通常得到有语法错误的输入"""
+    tokens = tokens.copy()
+    i = rng.randint(0, len(tokens))
+    r = rng.random()
+    if r < 0.3 and i < len(tokens):
+        del tokens[i]
+    elif r < 0.6:
+        tokens.insert(i, rng.choice(terminals))
+    elif i < len(tokens):
+        tokens[i] = rng.choice(terminals)
+    return tokens
+
+
+def keyword_text(rules: list[tuple[str, str]], n: int, seed: int = 0) -> str:
+    """keyword_rules 词法规格下约 n 个单词的随机输入: 关键字、标识符、数字、字符串和运算符, 以空白分隔"""
+    rng = random.Random(seed)
+    keywords = [pattern for kind, pattern in rules if kind and kind.startswith("kw_")]
+    operators = ["+", "-", "*", "/", "=", "==", "<=", "&&", "||", "(", ")", "{", "}", ";", ","]
+    words = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.4:
+            words.append(rng.choice(keywords))
+        elif r < 0.6:
+            # 以关键字为前缀的标识符, 最长匹配需要越过关键字的接受状态
+            words.append(rng.choice(keywords) + rng.choice("xyz_0123"))
+        elif r < 0.75:
+            words.append(str(rng.randint(0, 10 ** rng.randint(1, 6))))
+        elif r < 0.8:
+            words.append('"' + "".join(rng.choice("abc d") for _ in range(rng.randint(0, 12))) + '"')
+        else:
+            words.append(rng.choice(operators))
+    return "".join(w + rng.choice([" ", " ", "\n", "\t"]) for w in words)
+
+
+def stmt_grammar_text(kinds: int) -> str:
+    """kinds 种以不同关键字开头的赋值语句组成的语句块文法, 共 kinds + 15 个产生式
+
+    没有 ε 产生式的 LL(1) 文法 (也是 LR(1)): 语句块以 "}" 结束, 表达式的右递归以 ";" 或 ")" 结束
+    """
+    T = [f"kw{i}" for i in range(kinds)] + ["name", "num", "=", ";", "{", "}", "+", "*", "(", ")"]
+    NT = ["Goal", "Stmts", "Stmt", "Expr", "Tail", "Factor", "Inner", "InnerTail"]
+    P = ["Goal -> { Stmts", "Stmts -> Stmt Stmts", "Stmts -> }"]
+    P += [f"Stmt -> kw{i} name = Expr" for i in range(kinds)]
+    P += [
+        "Stmt -> { Stmts",
+        "Expr -> Factor Tail",
+        "Tail -> + Expr",
+        "Tail -> * Expr",
+        "Tail -> ;",
+        "Factor -> name",
+        "Factor -> num",
+        "Factor -> ( Inner",
+        "Inner -> Factor InnerTail",
+        "InnerTail -> + Inner",
+        "InnerTail -> * Inner",
+        "InnerTail -> )",
+    ]
+    return "\n\n".join([" ".join(T), " ".join(NT), "Goal", "\n".join(P)])
+
+
+def stmt_tokens(n: int, kinds: int, seed: int = 0) -> list[tuple[str, str]]:
+    """stmt_grammar_text(kinds) 的约 n 个单词的随机程序"""
+    rng = random.Random(seed)
+    # 文法中只有 + 和 *
+    ops = {"-": ("+", "+"), "/": ("*", "*")}
+    tokens = [("{", "{")]
+    depth = 1
+    while depth:
+        if len(tokens) < n and rng.random() < 0.1:
+            tokens.append(("{", "{"))
+            depth += 1
+            continue
+        if len(tokens) >= n or depth > 1 and rng.random() < 0.1:
+            tokens.append(("}", "}"))
+            depth -= 1
+            continue
+        kw = f"kw{rng.randrange(kinds)}"
+        tokens += [(kw, kw), ("name", "x"), ("=", "=")]
+        tokens += [ops.get(t[0], t) for t in expr_tokens(rng.randint(1, 9), rng.random())]
+        tokens.append((";", ";"))
+    return tokens
@@ -0,0 +1,31 @@
+"""DFA 最小化: python -m bench.hopcroft"""
+import contextlib
+import io
+
+from bench import best_of
+from bench.gen import keyword_nfa
+
+
+def quiet(fn):
+    """hopcroft 会打印划分过程, 计时时屏蔽输出"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapper
+
+
+if __name__ == "__main__":
+    print(f"{'DFA |S|':>8} {'min |S|':>8} {'hopcroft':>10} {'hopcroft1':>10} {'minimize':>10}")
+    for n_words in [100, 250, 500, 2000, 8000]:
+        dfa, Q, T = keyword_nfa(n_words).subset_construction()
+        t3, (min_dfa, _) = best_of(dfa.minimize)
+        row = [f"{len(dfa.S):>8}", f"{len(min_dfa.S):>8}"]
+        if len(dfa.S) <= 1500:
+            t1, _ = best_of(quiet(dfa.hopcroft), repeat=1)
+            t2, (min_dfa1, _) = best_of(dfa.hopcroft1, repeat=1)
+            assert len(set(min_dfa1.S)) == len(min_dfa.S)
+            row += [f"{t1:>9.3f}s", f"{t2:>9.3f}s"]
+        else:
+            row += [f"{'-':>10}", f"{'-':>10}"]
+        row.append(f"{t3:>9.3f}s")
+        print(" ".join(row))
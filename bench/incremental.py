@@ -0,0 +1,71 @@
+"""增量词法 + 语法分析的单次编辑延迟: python -m bench.incremental [函数个数]"""
+import random
+import sys
+import time
+
+from Grammar import Grammar
+from Incremental import Document
+from LRTable import LRTable
+from Lexer import Token
+from bench.lexer import load_c_lexer
+
+
+def c_source(n: int) -> str:
+    """把 input/Lexer/C_input.txt 中的 main 函数重复 n 次 (依次改名), 得到一个大的 C 文件"""
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        body = f.read()
+    return "\n".join(body.replace("main", f"f{i}") for i in range(n))
+
+
+def edits(text: str, rng: random.Random):
+    """模拟编辑器中的操作: 改标识符、改数字、插入语句、逐字符输入一条语句 (中间状态有语法错误)、删除函数"""
+    mid = text.index("int a = 1;", len(text) // 2)
+    yield "rename", (mid + 4, 1, "alpha")
+    yield "number", (mid + 12, 1, "42")
+    stmt = "\n    b = alpha * (c[2] + 7);"
+    pos = text.index("{", mid) + 1
+    yield "insert", (pos, 0, stmt)
+    for k, char in enumerate(stmt):
+        yield "type", (pos + k, 0, char)
+    start = text.index("int f", mid)
+    end = text.index("int f", start + 1)
+    yield "delete", (start, end - start, "")
+    for _ in range(20):
+        p = rng.randrange(len(text))
+        yield "random", (p, 0, rng.choice(["x", " ", ";", "1", "}"]))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    lexer = load_c_lexer().compile()
+    table = LRTable.build(Grammar.load("./input/Grammar/C_G.txt"), lalr=True)
+    text = c_source(n)
+
+    start = time.perf_counter()
+    doc = Document(lexer, table, text)
+    t0 = time.perf_counter() - start
+    assert doc.syntaxMsg == "success"
+    print(f"C file: {len(text)} chars, {len(doc.lexer.types)} tokens, initial parse {t0 * 1e3:.1f} ms")
+
+    rng = random.Random(0)
+    stats = {}
+    for kind, (offset, length, ins) in list(edits(text, rng)):
+        if offset + length > len(doc.text):
+            continue
+        start = time.perf_counter()
+        tree, msg = doc.edit(offset, length, ins)
+        t1 = time.perf_counter() - start
+        reused = doc.parser.reused
+
+        start = time.perf_counter()
+        tokens = lexer.get_token(doc.text)
+        full = table.parse(Token(tokens.tokens))
+        t2 = time.perf_counter() - start
+        assert doc.lexer.tokens == tokens.tokens and (tree, msg) == full, f"{kind} 增量结果与完整分析不一致"
+
+        incr, whole, count, reuse = stats.get(kind, (0, 0, 0, 0))
+        stats[kind] = (incr + t1, whole + t2, count + 1, reuse + reused)
+
+    print(f"{'edit':>8} {'count':>6} {'incremental':>12} {'full':>10} {'speedup':>8} {'reused subtrees':>16}")
+    for kind, (incr, whole, count, reuse) in stats.items():
+        print(f"{kind:>8} {count:>6} {incr / count * 1e3:>9.2f} ms {whole / count * 1e3:>7.2f} ms {whole / incr:>7.1f}x {reuse / count:>16.0f}")
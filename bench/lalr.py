@@ -0,0 +1,47 @@
+"""LALR(1) 与 LR(1) 分析表: python -m bench.lalr"""
+import glob
+import os
+import tempfile
+
+from Grammar import Grammar
+from Lexer import Token
+from bench import best_of
+from bench.lexer import load_c_lexer
+
+# LR(1) 但不是 LALR(1): 合并同心状态 {A -> c., B -> c.} 后出现规约-规约冲突
+NOT_LALR = "a b c d e\n\nGoal S A B\n\nGoal\n\nGoal -> S\nS -> a A d\nS -> b B d\nS -> a B e\nS -> b A e\nA -> c\nB -> c"
+
+
+def fresh(G: Grammar, lalr: bool):
+    G.CC, G.CC_dict, G.Action, G.Goto = None, None, None, None
+    G.LALR_Action, G.LALR_Goto = None, None
+    return G.LALR1_table() if lalr else G.LR1_table()
+
+
+if __name__ == "__main__":
+    print(f"{'grammar':>16}  {'LR(1)':>16}  {'LALR(1)':>16}")
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        t1, (Action1, Goto1) = best_of(lambda: fresh(G, False), repeat=1)
+        t2, (Action2, Goto2) = best_of(lambda: fresh(G, True), repeat=1)
+        print(f"{os.path.basename(filename):>16}  {len(Action1):>5} {t1:>8.3f}s  {len(Action2):>5} {t2:>8.3f}s")
+
+    # 两种分析表对同一输入的分析结果一致
+    G = Grammar.load("./input/Grammar/C_G.txt")
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        tokens = load_c_lexer().compile().get_token(f.read()).tokens
+    dot1, process1, msg1 = G.LR1_analyze(Token(tokens))
+    dot2, process2, msg2 = G.LR1_analyze(Token(tokens), lalr=True)
+    assert dot1.source == dot2.source and msg1 == msg2 == "success"
+    print(f"C_input.txt: {len(tokens)} tokens, LR(1) {len(process1)} steps, LALR(1) {len(process2)} steps")
+
+    with tempfile.TemporaryDirectory() as d:
+        filename = os.path.join(d, "not_lalr.txt")
+        with open(filename, "w") as f:
+            f.write(NOT_LALR)
+        G = Grammar.load(filename)
+        G.LR1_table()
+        try:
+            G.LALR1_table()
+        except Exception as e:
+            print(f"not_lalr: LR(1) ok, {e}")
@@ -0,0 +1,31 @@
+"""词法分析吞吐量: python -m bench.lexer [放大倍数]"""
+import json
+import sys
+
+from FA import DFA
+from Lexer import Lexer
+from bench import best_of
+
+
+def load_c_lexer() -> Lexer:
+    dfa = DFA.load("./input/Lexer/C_DFA.txt")
+    with open("./input/Lexer/C_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return Lexer(dfa, config)
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        input_string = (f.read() + "\n") * scale
+
+    lexer = load_c_lexer()
+    compiled = lexer.compile()
+    t1, tokens1 = best_of(lambda: lexer.analyze(input_string).get_token().tokens, repeat=1)
+    t2, tokens2 = best_of(lambda: compiled.get_token(input_string).tokens)
+    assert tokens1 == tokens2, "CompiledLexer 与 Lexer 输出不一致"
+
+    size = len(input_string) / 1024 / 1024
+    print(f"input: {len(input_string)} chars, {len(tokens1)} tokens")
+    print(f"Lexer:         {t1:.3f}s  {size / t1:.3f} MB/s")
+    print(f"CompiledLexer: {t2:.3f}s  {size / t2:.3f} MB/s  ({t1 / t2:.1f}x)")
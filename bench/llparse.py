@@ -0,0 +1,21 @@
+"""LL(1) 分析驱动: python -m bench.llparse"""
+from Grammar import Grammar
+from Lexer import Token
+from bench import best_of
+from bench.gen import expr_tokens
+
+
+if __name__ == "__main__":
+    G = Grammar.load("./input/Grammar/Expr_LL1_G.txt")
+    print("LL1_analyze (记录过程并生成图):")
+    for n in [500, 1000, 2000, 4000]:
+        tokens = expr_tokens(n)
+        t, (dot, processList, msg) = best_of(lambda: G.LL1_analyze(Token(tokens)), repeat=1)
+        assert msg == "success"
+        print(f"  {len(tokens):>7} tokens  {t:.3f}s  {t / len(tokens) * 1e6:8.2f} us/token")
+    print("LL1_parse:")
+    for n in [1000, 10000, 100000, 200000]:
+        tokens = expr_tokens(n)
+        t, (tree, msg) = best_of(lambda: G.LL1_parse(Token(tokens)))
+        assert msg == "success"
+        print(f"  {len(tokens):>7} tokens  {t:.3f}s  {t / len(tokens) * 1e6:8.2f} us/token")
@@ -0,0 +1,24 @@
+"""超长单词的线性扩展: python -m bench.longtoken"""
+from bench import best_of
+from bench.lexer import load_c_lexer
+
+
+def long_tokens(n: int) -> dict[str, str]:
+    return {
+        "word": "a" * n,
+        "stringR": '"' + "ab 12 " * (n // 6) + '"',
+        "whitespace": "x" + " " * n + "x",
+        "rollback": '"' + "ab 12 " * (n // 6),  # 未闭合的字符串, 需整体回退
+    }
+
+
+if __name__ == "__main__":
+    lexer = load_c_lexer()
+    print(f"{'n':>8} " + " ".join(f"{name:>12}" for name in long_tokens(0)))
+    for n in [2000, 4000, 8000, 16000, 32000]:
+        row = []
+        for name, text in long_tokens(n).items():
+            t, _ = best_of(lambda: lexer.analyze(text).get_token())
+            row.append(f"{t * 1e6 / n:>9.2f}us")
+        print(f"{n:>8} " + " ".join(f"{x:>12}" for x in row))
+    print("(每字符耗时, 应随 n 基本不变)")
@@ -0,0 +1,36 @@
+"""LR 分析驱动: python -m bench.lrparse"""
+from Grammar import Grammar
+from Lexer import Token
+from bench import best_of
+from bench.gen import expr_tokens
+
+# 语义动作: 构造元组形式的抽象语法树
+ACTIONS = {
+    "Goal -> Expr": lambda e: e,
+    "Expr -> Expr + Term": lambda a, op, b: (op, a, b),
+    "Expr -> Expr - Term": lambda a, op, b: (op, a, b),
+    "Expr -> Term": lambda a: a,
+    "Term -> Term * Factor": lambda a, op, b: (op, a, b),
+    "Term -> Term / Factor": lambda a, op, b: (op, a, b),
+    "Term -> Factor": lambda a: a,
+    "Factor -> ( Expr )": lambda l, e, r: e,
+    "Factor -> num": lambda x: int(x),
+    "Factor -> name": lambda x: x,
+}
+
+
+if __name__ == "__main__":
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    print("LR1_analyze (记录过程并生成图):")
+    for n in [1000, 2000, 4000]:
+        tokens = expr_tokens(n)
+        t, (dot, processList, msg) = best_of(lambda: G.LR1_analyze(Token(tokens)), repeat=1)
+        assert msg == "success"
+        print(f"  {len(tokens):>7} tokens  {t:.3f}s  {t / len(tokens) * 1e6:6.2f} us/token")
+    for mode, actions in [("tree", None), ("actions", ACTIONS)]:
+        print(f"LR1_parse ({mode}):")
+        for n in [1000, 10000, 100000, 200000]:
+            tokens = expr_tokens(n)
+            t, (value, msg) = best_of(lambda: G.LR1_parse(Token(tokens), actions))
+            assert msg == "success"
+            print(f"  {len(tokens):>7} tokens  {t:.3f}s  {t / len(tokens) * 1e6:6.2f} us/token")
@@ -0,0 +1,50 @@
+"""压缩 LR 分析表: python -m bench.lrtable [放大倍数]"""
+import sys
+
+from Grammar import Grammar
+from Lexer import Token
+from LRTable import LRTable
+from bench import best_of
+from bench.lexer import load_c_lexer
+
+
+def deep_size(obj, seen=None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(x, seen) for x in obj)
+    return size
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1300
+    G = Grammar.load("./input/Grammar/C_G.txt")
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        tokens = load_c_lexer().compile().get_token(f.read()).tokens
+
+    for lalr in (False, True):
+        Action, Goto = G.LALR1_table() if lalr else G.LR1_table()
+        table = LRTable.build(G, lalr)
+        arrays = [table.lhs, table.rhs_len, table.default, table.goto_default,
+                  table.action_base, table.goto_base, table.value, table.check]
+        print(f"{'LALR(1)' if lalr else 'LR(1)'}: {len(Action)} states")
+        print(f"  dict tables:  {deep_size((Action, Goto)) / 1024:>9.1f} KB")
+        print(f"  LRTable:      {sum(deep_size(x) for x in arrays) / 1024:>9.1f} KB  blob {len(table.to_bytes()) / 1024:.1f} KB")
+
+        # LR1_analyze 每步复制栈, 只在小输入上比较
+        small = tokens * 20
+        t1, (dot, processList, msg1) = best_of(lambda: G.LR1_analyze(Token(small), lalr=lalr), repeat=1)
+        t2, (tree, msg2) = best_of(lambda: table.parse(Token(small)))
+        assert msg1 == msg2 == "success" and G.buildSyntaxTreeDot(tree).source == dot.source
+        steps = len(processList)
+        print(f"  {len(small)} tokens: LR1_analyze {steps / t1:>10.0f} steps/s  LRTable.parse {steps / t2:>10.0f} steps/s")
+
+        large = tokens * scale
+        t3, (tree, msg3) = best_of(lambda: table.parse(Token(large)))
+        assert msg3 == "success"
+        print(f"  {len(large)} tokens: LRTable.parse {steps * scale / 20 / t3:>10.0f} steps/s  {t3:.3f}s")
@@ -0,0 +1,58 @@
+"""Profiler 关闭与开启时的耗时, 以及各项统计的摘要: python -m bench.profiler"""
+import json
+import os
+import tempfile
+
+import Profiler
+from FA import DFA
+from Grammar import Grammar
+from Lexer import Lexer, Token
+from bench import best_of
+from bench.gen import expr_grammar_text, expr_tokens, keyword_nfa
+
+
+def workloads(d: str) -> list:
+    dfa = DFA.load("./input/Lexer/C_DFA.txt")
+    with open("./input/Lexer/C_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        text = f.read() * 20
+    lexer = Lexer(dfa, config)
+    G = Grammar.load("./input/Grammar/Expr_G.txt")
+    G_LL = Grammar.load("./input/Grammar/Expr_LL1_G.txt")
+    # 先构造分析表, 分析阶段只计分析本身
+    G.LR1_table()
+    G_LL.LL1_table()
+    tokens = expr_tokens(3000)
+    filename = os.path.join(d, "expr20.txt")
+    with open(filename, "w") as f:
+        f.write(expr_grammar_text(20))
+    nfa = keyword_nfa(300)
+    dfa = nfa.subset_construction()[0]
+    return [
+        ("Lexer.get_token", lambda: lexer.analyze(text).get_token()),
+        ("LR1_analyze", lambda: G.LR1_analyze(Token(tokens))),
+        ("LL1_analyze", lambda: G_LL.LL1_analyze(Token(tokens))),
+        # 每次重新读入文法, 项集族不使用缓存
+        ("build_CC", lambda: Grammar.load(filename).build_CC()),
+        ("subset_construction", nfa.subset_construction),
+        ("hopcroft1", dfa.hopcroft1),
+    ]
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as d:
+        print(f"{'':20} {'disabled':>9} {'enabled':>9}")
+        profiles = []
+        for name, fn in workloads(d):
+            t1, _ = best_of(fn)
+            prof = Profiler.Profiler()
+            with prof:
+                t2, _ = best_of(fn, repeat=1)
+            profiles.append(prof)
+            print(f"{name:20} {t1:8.3f}s {t2:8.3f}s")
+    for prof in profiles:
+        print()
+        print(prof.report(top=5))
+    # 导出的 JSON 可直接读回
+    assert json.loads(profiles[1].to_json())["counters"]["LR1_analyze.state_actions"]
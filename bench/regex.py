@@ -0,0 +1,14 @@
+"""正则规格 -> 词法分析器的构造时间: python -m bench.regex"""
+from Regex import LexerSpec
+from bench import best_of
+from bench.gen import keyword_rules
+
+
+if __name__ == "__main__":
+    print(f"{'rules':>6} {'NFA |S|':>8} {'DFA |S|':>8} {'classes':>8} {'parse':>8} {'nfa':>8} {'dfa':>8}")
+    for n in [50, 100, 200, 400, 800]:
+        rules = keyword_rules(n)
+        t1, spec = best_of(lambda: LexerSpec(rules))
+        t2, (nfa, _) = best_of(spec.to_nfa)
+        t3, (dfa, config) = best_of(spec.to_dfa, repeat=1)
+        print(f"{len(rules):>6} {len(nfa.S):>8} {len(dfa.S):>8} {len(config['charCat']):>8} {t1:>7.3f}s {t2:>7.3f}s {t3:>7.3f}s")
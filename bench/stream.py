@@ -0,0 +1,60 @@
+"""流式词法分析内存占用: python -m bench.stream [放大倍数]"""
+import random
+import sys
+import time
+import tracemalloc
+
+from bench import best_of
+from bench.lexer import load_c_lexer
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+
+def check_chunks(compiled, text: str, trials: int = 500):
+    """任意切分 (含空块和单字符块) 得到的单词序列与整块输入相同, 包括回退跨越块边界和词法错误的情况"""
+    rng = random.Random(0)
+    for trial in range(trials):
+        t = text if trial % 5 == 0 else "".join(rng.choice(text + "#@é\t") for _ in range(rng.randint(0, 300)))
+        chunks, p = [], 0
+        while p < len(t):
+            k = rng.choice([0, 1, 1, 2, 3, 8, 50])
+            chunks.append(t[p : p + k])
+            p += k
+        assert list(compiled.stream(chunks)) == list(compiled.stream([t]))
+
+
+def long_token(compiled, size: int, chunk_size: int = 1024) -> float:
+    """跨 size / chunk_size 个块的单个标识符, 耗时应与 size 成正比"""
+    text = "a" * size + " b"
+    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+    start = time.perf_counter()
+    tokens = list(compiled.stream(chunks))
+    assert len(tokens[0][1]) == size
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with open("./input/Lexer/C_input.txt", "r", encoding="utf-8") as f:
+        text = f.read() + "\n"
+    chunks = lambda: (text for _ in range(scale))
+
+    lexer = load_c_lexer()
+    compiled = lexer.compile()
+    m1, n1 = peak_memory(lambda: len(compiled.get_token("".join(chunks())).tokens))
+    m2, n2 = peak_memory(lambda: sum(1 for _ in lexer.stream(chunks())))
+    assert n1 == n2
+    t, _ = best_of(lambda: sum(1 for _ in lexer.stream(chunks())))
+    print(f"input: {len(text) * scale} chars, {n1} tokens")
+    print(f"get_token peak: {m1 / 1024:.0f} KiB")
+    print(f"stream    peak: {m2 / 1024:.0f} KiB  ({t:.3f}s)")
+    check_chunks(compiled, text)
+    for size in [1 << 20, 4 << 20]:
+        print(f"one {size}-char token over 1 KiB chunks: {long_token(compiled, size):.3f}s")
+
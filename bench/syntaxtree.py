@@ -0,0 +1,71 @@
+"""数组存储的语法树 (SyntaxTree) 与嵌套 dict / list 语法树的内存和耗时: python -m bench.syntaxtree"""
+import gc
+import glob
+import random
+import tracemalloc
+
+from Grammar import Grammar
+from LLTable import LLTable
+from LRTable import LRTable
+from Lexer import Token
+from bench import best_of
+from bench.gen import expr_tokens, sentence, mutate
+
+
+def check():
+    """各文法随机句子 (一半有错误) 上, SyntaxTree 转回旧格式后与原分析结果相同, 且保存了各单词"""
+    count = 0
+    for filename in sorted(glob.glob("./input/Grammar/*_G.txt")):
+        G = Grammar.load(filename)
+        tables = []
+        try:
+            tables.append(("LR", LRTable.build(G)))
+        except Exception:
+            pass
+        if G.isLL1()[0]:
+            tables.append(("LL", LLTable.build(G)))
+        rng = random.Random(filename)
+        for _ in range(200):
+            types = sentence(G, rng)
+            if rng.random() < 0.5:
+                types = mutate(types, G.T, rng)
+            tokens = [(t, f"w{i}") for i, t in enumerate(types)]
+            for kind, table in tables:
+                tree, msg = table.parse(Token(tokens))
+                arena, arena_msg = table.parse_tree(Token(tokens))
+                assert msg == arena_msg, filename
+                assert (arena.to_list() if kind == "LR" else arena.to_dict()) == tree, filename
+                words = [arena.word(n) for n in arena.leaves() if arena.word(n) is not None]
+                assert words == [w for t, w in tokens[: len(words)]], filename
+                count += 1
+    print(f"SyntaxTree.to_dict / to_list identical to parse on {count} inputs")
+
+
+def measure(build):
+    """(耗时, 结果保留的内存): 耗时不开启 tracemalloc 单独测量, 内存为 tracemalloc 在构造后仍占用的字节数"""
+    elapsed, result = best_of(build)
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, result
+
+
+if __name__ == "__main__":
+    check()
+    for name, filename, table_cls in [("LR", "./input/Grammar/Expr_G.txt", LRTable), ("LL", "./input/Grammar/Expr_LL1_G.txt", LLTable)]:
+        table = table_cls.build(Grammar.load(filename))
+        print(f"{name}:")
+        for n in [10000, 100000]:
+            tokens = expr_tokens(n)
+            t1, m1, (tree, msg1) = measure(lambda: table.parse(Token(tokens)))
+            del tree
+            t2, m2, (arena, msg2) = measure(lambda: table.parse_tree(Token(tokens)))
+            assert msg1 == msg2 == "success"
+            print(
+                f"  {len(tokens):>7} tokens  dict/list {m1 / 1024 / 1024:7.2f} MB {t1:6.3f}s"
+                f"  SyntaxTree {m2 / 1024 / 1024:6.2f} MB {t2:6.3f}s ({len(arena)} nodes, {arena.nbytes() / 1024 / 1024:.2f} MB arrays)"
+                f"  {m1 / m2:4.1f}x smaller"
+            )
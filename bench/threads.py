@@ -0,0 +1,84 @@
+"""多线程共享 Lexer / Grammar 的压力测试: python -m bench.threads [线程数] [每线程输入数]
+
+1. 多个线程同时首次使用同一个未构造分析表的 Grammar, 检查分析表只构造一次;
+2. 多个线程共享同一个 Lexer 和 freeze 后的 Grammar 分析不同输入, 结果必须与单线程逐个分析相同
+"""
+import json
+import sys
+import threading
+
+from FA import DFA
+from Grammar import Grammar
+from Lexer import Lexer, Token
+from bench import best_of
+from bench.gen import expr_tokens
+
+
+def run_threads(n: int, target):
+    errors = []
+
+    def wrapper(i):
+        try:
+            target(i)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapper, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+def parse_all(lexer: Lexer, G: Grammar, LL: Grammar, text: str) -> tuple:
+    tokens = lexer.analyze(text).get_token().tokens
+    lr = G.LR1_parse(lexer.analyze(text).get_token())
+    lalr = G.LR1_parse(lexer.analyze(text).get_token(), lalr=True)
+    ll = LL.LL1_parse(lexer.analyze(text).get_token())
+    return tokens, lr, lalr, ll
+
+
+if __name__ == "__main__":
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    # 频繁切换线程, 尽量暴露竞争
+    sys.setswitchinterval(1e-6)
+
+    for round in range(20):
+        G = Grammar.load("./input/Grammar/Expr_G.txt")
+        barrier = threading.Barrier(n_threads)
+        seen = [None] * n_threads
+
+        def first_use(i):
+            barrier.wait()
+            G.LR1_parse(Token(expr_tokens(20, seed=i)), lalr=i % 2 == 1)
+            seen[i] = (id(G.compile()), id(G.LR_TABLE[i % 2 == 1]), id(G.compile().tables[i % 2 == 1]))
+
+        run_threads(n_threads, first_use)
+        for lalr in (0, 1):
+            assert len({seen[i] for i in range(lalr, n_threads, 2)}) == 1, "分析表被重复构造"
+    print(f"first use: {n_threads} threads x 20 rounds, tables built once")
+
+    dfa = DFA.load("./input/Lexer/Expr_DFA.txt")
+    with open("./input/Lexer/Expr_config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    lexer = Lexer(dfa, config)
+    G = Grammar.load("./input/Grammar/Expr_G.txt").freeze()
+    LL = Grammar.load("./input/Grammar/Expr_LL1_G.txt").freeze()
+    texts = []
+    for i in range(n_threads * per_thread):
+        text = " ".join(word for type, word in expr_tokens(40, seed=i))
+        texts.append(text + " )" if i % 7 == 6 else text)
+
+    t1, expected = best_of(lambda: [parse_all(lexer, G, LL, text) for text in texts], repeat=1)
+    results = [None] * len(texts)
+
+    def work(i):
+        for j in range(i, len(texts), n_threads):
+            results[j] = parse_all(lexer, G, LL, texts[j])
+
+    t2, _ = best_of(lambda: run_threads(n_threads, work), repeat=1)
+    assert results == expected, "多线程结果与单线程不一致"
+    print(f"shared lexer + frozen grammar: {len(texts)} inputs, 1 thread {t1:.3f}s, {n_threads} threads {t2:.3f}s, results identical")
@@ -166,7 +166,7 @@ class Grammar {
                             trailer.forEach(x => follow[beta[i]].add(x));
                         }
                         if (first[beta[i]].includes(EPS)) {
-                            trailer = new Set([...trailer, ...first[A]]);
+                            trailer = new Set([...trailer, ...first[beta[i]]]);
                             trailer.delete(EPS);
                         } else {
                             trailer = new Set(first[beta[i]]);